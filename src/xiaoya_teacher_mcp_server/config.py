@@ -5,6 +5,7 @@ MCP服务器配置模块
 支持两种认证方式:直接设置token或通过账号密码登录.
 """
 
+import hashlib
 import os
 import random
 import string
@@ -153,6 +154,29 @@ def headers() -> dict:
     raise ValueError(f"{transport} 缺少认证(Authorization 或 x-xiaoya-account/x-xiaoya-password)")
 
 
+def _login_account(token: str) -> str | None:
+    """令牌由账号密码登录得到时返回该账号; 直接传入的令牌返回 None。"""
+    if auth_state.request_transport.get() == "stdio":
+        return None if os.getenv("XIAOYA_AUTH_TOKEN") else os.getenv("XIAOYA_ACCOUNT")
+    account = auth_state.request_account.get()
+    with auth_state.account_tokens_lock:
+        return account if account and auth_state.account_tokens.get(account) == token else None
+
+
+def auth_scope() -> str | None:
+    """当前认证身份的稳定标识(账号或令牌的摘要), 用于按账号隔离缓存; 未认证时返回 None。
+
+    账号密码登录时按账号计算, 令牌刷新或进程重启后不变, 可用于持久化缓存。
+    """
+    try:
+        token = headers()["Authorization"]
+    except ValueError:
+        return None
+    account = _login_account(token)
+    identity = f"account:{account}" if account else f"token:{token}"
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()[:16]
+
+
 def initialize_auth() -> None:
     if auth_state.cached_token:
         return
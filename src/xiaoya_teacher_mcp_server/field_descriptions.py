@@ -35,11 +35,28 @@ RESOURCE_ID_LIST_ORDER_DESC = "按所需顺序排列的资源id列表"
 # ── 名称 / 文件 ───────────────────────────────────────────────────────────────
 RESOURCE_NAME_DESC = "资源名称"
 RESOURCE_NEW_NAME_DESC = "资源的新名称"
+RESOURCE_TREE_DESC = "要创建的资源树（同级节点按列表顺序排序），每个节点含 name/type/children"
+RESOURCE_TREE_CHILDREN_DESC = "子资源列表（仅文件夹可填）"
+RESOURCE_LAYOUT_DESC = "parent_id 下期望的资源布局（同级按列表顺序排序），可嵌套 children"
+LAYOUT_NODE_ID_DESC = "已有资源id（填写后可改名或移动到此位置；不填则按名称+类型匹配同级资源）"
+LAYOUT_VISIBILITY_DESC = "期望的可见性（1=学生不可见 2=学生可见，不填则不修改）"
+LAYOUT_DOWNLOAD_DESC = "期望的下载权限（1=禁止 2=允许，不填则不修改）"
+LAYOUT_CHILDREN_DESC = "期望的子资源列表（仅文件夹可填；不填则不管理该文件夹内部）"
+DRY_RUN_DESC = "true 只返回操作计划与预计请求数，不实际修改；false 执行计划"
+DELETE_MISSING_DESC = (
+    "是否删除布局中未列出的已有资源（仅作用于填写了 children 的文件夹和 parent_id）"
+)
 FILENAME_DESC = "资源文件名（通过 query_course_resources 获取）"
 FILE_PATH_DESC = "本地磁盘文件路径"
 SAVE_PATH_DESC = (
     "文件保存路径：文件绝对路径 / 已存在的目录（将用原文件名拼）/ 不填则存到系统临时目录"
 )
+MIRROR_FOLDER_ID_DESC = "要镜像的文件夹id（整门课程填 group_id）"
+SAVE_DIR_DESC = "本地镜像根目录（不填则存到系统临时目录）；重复镜像到同一目录时跳过未变化的文件"
+DOWNLOAD_WORKERS_DESC = "并发下载的最大线程数"
+SYNC_DOWNLOAD_FILES_DESC = "是否同时把文件/视频下载到本地镜像（只下载有变化或缺失的文件）"
+MARKDOWN_SOURCES_DESC = "待转换文件列表，每项传 file_path，或同时传 paper_id 与 filename"
+CONVERSION_TIMEOUT_DESC = "单个文件的转换超时秒数，超时的文件记为失败，不影响其它文件"
 ROLE_DESC = "角色类型（3=教师）"
 
 # ── 分值 / 必答 ───────────────────────────────────────────────────────────────
@@ -59,11 +76,33 @@ NEED_DETAIL_DESC = "是否在返回中包含完整题目内容（选项、答案
 RETURN_PARSE_DESC = "true 返回纯文本（plain），false 返回原始富文本结构（raw）"
 PARSE_MODE_DESC = "富文本解析模式：plain=纯文本，raw=原始结构，markdown=标准 Markdown + assets"
 PAPER_DETAIL_LEVEL_DESC = "试卷粒度：summary=仅元信息，full=含全部题目"
+PAPER_REFRESH_DESC = "是否跳过本地缓存重新拉取试卷(试卷在网页端等其他地方被修改过时使用)"
 RESOURCE_DETAIL_LEVEL_DESC = "资源粒度：summary=名称/类型，full=全字段，raw=原始 API 数据"
 RESOURCE_VIEW_MODE_DESC = "资源视图：tree=树形结构，flat=平铺列表"
+MARKDOWN_VIEW_DESC = (
+    "Markdown 视图：full=全文，outline=标题大纲（含字节偏移/页码），"
+    "page=按页，section=按标题章节，range=按字节区间；大文档先用 outline 再按需读取"
+)
+MARKDOWN_PAGE_DESC = "页码（从 1 开始，view=page 时必填；PDF 按页、PPTX 按幻灯片）"
+MARKDOWN_SECTION_DESC = "章节序号（outline 返回的 index，view=section 时必填）"
+MARKDOWN_OFFSET_DESC = "起始字节偏移（view=range 时使用，可传上次返回的 next_offset）"
+MARKDOWN_LENGTH_DESC = "读取的最大字节数（view=range 时使用）"
 TASK_DETAIL_LEVEL_DESC = "任务粒度：summary=基础信息，full=含时间/任务id"
 ANSWER_DETAIL_LEVEL_DESC = "答题粒度：summary=得分/状态，full=含答题内容"
 RESOURCE_TYPE_DESC = "资源类型"
+RESOURCE_TYPE_FILTER_DESC = "按资源类型过滤（不填则不限类型）"
+RESOURCE_SEARCH_KEYWORD_DESC = (
+    "搜索关键词，匹配资源名称和所在路径（支持中文、前缀和拼写相近的英文）"
+)
+SEARCH_LIMIT_DESC = "最多返回的结果数量"
+BANK_SEARCH_KEYWORD_DESC = "搜索关键词, 匹配题干和选项/答案文本(多个词需全部命中)"
+BANK_QUESTION_TYPE_FILTER_DESC = (
+    "只返回该题型（1=单选 2=多选 4=填空 5=判断 6=简答 7=附件 10=编程）, 不传则不限"
+)
+BANK_FULL_REFRESH_DESC = (
+    "是否忽略 updated_at 重新拉取全部试卷(网页端改过题目但作业时间未变化时使用)"
+)
+BANK_INDEX_WORKERS_DESC = "并发拉取试卷的最大线程数"
 DOWNLOAD_TYPE_DESC = "下载权限（1=禁止 2=允许）"
 VISIBILITY_TYPE_DESC = "资源可见性（1=隐藏 2=可见）"
 
@@ -128,6 +167,17 @@ BLANK_ANSWER_COUNT_DESC = "空白答案项数量"
 
 # ── 题目类型 ──────────────────────────────────────────────────────────────────
 QUESTION_LIST_DESC = "题目列表"
+BATCH_GROUP_ID_DESC = (
+    "试卷所在课程组id；传入后各题并发创建，最后一次性恢复题目顺序（不传则逐题顺序创建）"
+)
+QUESTION_WORKERS_DESC = "并发创建题目的最大线程数"
+CLONE_SOURCE_GROUP_ID_DESC = "源试卷所在课程组id"
+CLONE_SOURCE_PAPER_ID_DESC = "源试卷id(复制题目的来源)"
+CLONE_TARGET_PAPER_ID_DESC = "目标试卷id(题目追加到该试卷末尾, 可属于其他课程)"
+CLONE_QUESTION_IDS_DESC = "只复制这些题目id(按源试卷顺序); 不传则复制全部题目"
+PREFER_IMPORT_DESC = (
+    "是否把纯文本题目合并为一次官方导入请求（编程题、Markdown/原始富文本题仍逐题创建）"
+)
 SINGLE_CHOICE_QUESTION_DESC = "单选题"
 MULTIPLE_CHOICE_QUESTION_DESC = "多选题"
 FILL_BLANK_QUESTION_DESC = "填空题"
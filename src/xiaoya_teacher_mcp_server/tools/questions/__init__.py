@@ -1,3 +1,3 @@
 """题目管理模块"""
 
-from . import create, delete, query, update  # noqa: F401
+from . import bank, create, delete, query, update  # noqa: F401
@@ -0,0 +1,343 @@
+"""课程组题库: 把所有试卷的题目纯文本存入本地 SQLite FTS5 索引, 供跨试卷搜索旧题。
+
+试卷来自课程资源中带 paper_id 的作业; 作业资源的 updated_at 未变化且已建过索引的
+试卷不再拉取编辑缓冲区。只改题目时作业资源的 updated_at 不一定变化, 因此另记下
+建索引时编辑缓冲区自身的 updated_at, 搜索结果据此说明题目文本的新旧; 需要确保
+拿到最新题目时用 full_refresh 重建。中文按二元组(另收录单字)、拉丁字母和数字按词预先切分后
+写入 FTS5, 与课程资源搜索的切词方式一致。
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from contextvars import copy_context
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Annotated, Any
+
+from pydantic import Field
+
+from ... import field_descriptions as desc
+from ...config import MCP
+from ...types.enums import QuestionType
+from ...types.resource_models import ResourceType
+from ...utils.client import APIRequestError
+from ...utils.response import ResponseUtil
+from ..resources.mirror import _safe_name
+from ..resources.mirror_db import mirror_root
+from ..resources.query import _load_course_resource_index
+from ..resources.search import CJK_RE, tokenize
+from .normalize import parse_question
+from .query import _load_paper_edit_buffer
+
+BANK_INDEX_WORKERS = 4
+TITLE_WEIGHT = 3.0
+OPTIONS_WEIGHT = 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    paper_id TEXT PRIMARY KEY,
+    resource_id TEXT NOT NULL,
+    name TEXT,
+    file_path TEXT,
+    updated_at TEXT,
+    paper_updated_at TEXT,
+    indexed_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS questions (
+    id TEXT PRIMARY KEY,
+    paper_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    type INTEGER NOT NULL,
+    score REAL,
+    title TEXT NOT NULL,
+    options TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS questions_paper ON questions (paper_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS question_fts USING fts5(
+    question_id UNINDEXED, title, options
+);
+"""
+
+
+def _option_text(option: dict[str, Any]) -> str:
+    value = option.get("value")
+    if isinstance(value, str) and value:
+        return value
+    answer = option.get("answer")
+    return answer if isinstance(answer, str) else ""
+
+
+def question_bank_entry(question: dict[str, Any]) -> dict[str, Any]:
+    """题库只保存纯文本题干和选项/答案文本, 以及题型和分值。"""
+    parsed = parse_question(question, parse_mode="plain")
+    return {
+        "id": str(question["id"]),
+        "type": question["type"],
+        "score": question.get("score"),
+        "title": parsed.get("title") or "",
+        "options": [text for text in map(_option_text, parsed.get("options") or []) if text],
+    }
+
+
+def _fts_text(text: str) -> str:
+    return " ".join(tokenize(text, with_unigrams=True))
+
+
+def _match_expression(query: str) -> str | None:
+    """所有词都要命中; 拉丁字母/数字按前缀匹配。"""
+    terms = []
+    for token in dict.fromkeys(tokenize(query)):
+        quoted = '"' + token.replace('"', '""') + '"'
+        terms.append(quoted if CJK_RE.match(token) else f"{quoted}*")
+    return " ".join(terms) or None
+
+
+class QuestionBankDB:
+    """单个课程组的题库索引; 每份试卷的题目在一个事务内整体替换。"""
+
+    def __init__(self, group_id: str, root: Path | None = None):
+        self.dir = (root or mirror_root()) / _safe_name(group_id)
+        self.db_path = self.dir / "question-bank.sqlite3"
+
+    def _connect(self) -> sqlite3.Connection:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.db_path)
+        connection.row_factory = sqlite3.Row
+        connection.executescript(_SCHEMA)
+        columns = {row["name"] for row in connection.execute("PRAGMA table_info(papers)")}
+        if "paper_updated_at" not in columns:
+            connection.execute("ALTER TABLE papers ADD COLUMN paper_updated_at TEXT")
+        return connection
+
+    def exists(self) -> bool:
+        return self.db_path.exists()
+
+    def papers(self) -> dict[str, dict[str, Any]]:
+        with closing(self._connect()) as connection:
+            return {
+                row["paper_id"]: dict(row) for row in connection.execute("SELECT * FROM papers")
+            }
+
+    def question_count(self) -> int:
+        with closing(self._connect()) as connection:
+            return connection.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+
+    def replace_paper(self, paper: dict[str, Any], questions: list[dict[str, Any]]) -> None:
+        indexed_at = datetime.now(UTC).isoformat(timespec="seconds")
+        with closing(self._connect()) as connection, connection:
+            self._delete_paper(connection, paper["paper_id"])
+            connection.execute(
+                "INSERT INTO papers (paper_id, resource_id, name, file_path, updated_at,"
+                " paper_updated_at, indexed_at) VALUES (:paper_id, :resource_id, :name,"
+                " :file_path, :updated_at, :paper_updated_at, :indexed_at)",
+                {**paper, "indexed_at": indexed_at},
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO questions (id, paper_id, position, type, score, title, options)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        question["id"],
+                        paper["paper_id"],
+                        position,
+                        question["type"],
+                        question["score"],
+                        question["title"],
+                        json.dumps(question["options"], ensure_ascii=False),
+                    )
+                    for position, question in enumerate(questions)
+                ],
+            )
+            # 题目 id 若曾记在别的试卷下(题目被移动), 先清掉旧的全文索引行
+            connection.executemany(
+                "DELETE FROM question_fts WHERE question_id = ?",
+                [(question["id"],) for question in questions],
+            )
+            connection.executemany(
+                "INSERT INTO question_fts (question_id, title, options) VALUES (?, ?, ?)",
+                [
+                    (
+                        question["id"],
+                        _fts_text(question["title"]),
+                        _fts_text("\n".join(question["options"])),
+                    )
+                    for question in questions
+                ],
+            )
+
+    def remove_papers(self, paper_ids: list[str]) -> None:
+        with closing(self._connect()) as connection, connection:
+            for paper_id in paper_ids:
+                self._delete_paper(connection, paper_id)
+
+    @staticmethod
+    def _delete_paper(connection: sqlite3.Connection, paper_id: str) -> None:
+        connection.execute(
+            "DELETE FROM question_fts WHERE question_id IN"
+            " (SELECT id FROM questions WHERE paper_id = ?)",
+            (paper_id,),
+        )
+        connection.execute("DELETE FROM questions WHERE paper_id = ?", (paper_id,))
+        connection.execute("DELETE FROM papers WHERE paper_id = ?", (paper_id,))
+
+    def search(
+        self, query: str, *, question_type: int | None = None, limit: int = 20
+    ) -> list[dict[str, Any]]:
+        expression = _match_expression(query)
+        if expression is None:
+            return []
+        sql = (
+            "SELECT q.*, p.name AS paper_name, p.file_path, p.paper_updated_at,"
+            f" bm25(question_fts, 0, {TITLE_WEIGHT}, {OPTIONS_WEIGHT}) AS rank"
+            " FROM question_fts"
+            " JOIN questions q ON q.id = question_fts.question_id"
+            " JOIN papers p ON p.paper_id = q.paper_id"
+            " WHERE question_fts MATCH ?"
+        )
+        params: list[Any] = [expression]
+        if question_type is not None:
+            sql += " AND q.type = ?"
+            params.append(int(question_type))
+        sql += " ORDER BY rank, p.file_path, q.position LIMIT ?"
+        params.append(limit)
+        with closing(self._connect()) as connection:
+            rows = connection.execute(sql, params).fetchall()
+        return [
+            {
+                "question_id": row["id"],
+                "paper_id": row["paper_id"],
+                "paper_name": row["paper_name"],
+                "file_path": row["file_path"],
+                "paper_updated_at": row["paper_updated_at"],
+                "position": row["position"] + 1,
+                "type": QuestionType.get(row["type"]),
+                "score": row["score"],
+                "title": row["title"],
+                "options": json.loads(row["options"]),
+                "relevance": round(-row["rank"], 3),
+            }
+            for row in rows
+        ]
+
+
+def _fetch_bank_questions(group_id: str, paper_id: str) -> tuple[str | None, list[dict[str, Any]]]:
+    """绕过试卷缓存拉取最新编辑缓冲区, 返回其 updated_at 与题库条目。"""
+    data = _load_paper_edit_buffer(group_id, paper_id, refresh=True)
+    return data.get("updated_at"), [
+        question_bank_entry(question) for question in data.get("questions") or []
+    ]
+
+
+@MCP.tool()
+def index_question_bank(
+    group_id: Annotated[str, Field(description=desc.GROUP_ID_DESC)],
+    full_refresh: Annotated[bool, Field(description=desc.BANK_FULL_REFRESH_DESC)] = False,
+    max_workers: Annotated[
+        int, Field(description=desc.BANK_INDEX_WORKERS_DESC, ge=1, le=16)
+    ] = BANK_INDEX_WORKERS,
+) -> dict:
+    """把课程组内所有作业试卷的题目建成本地全文题库, 供 search_question_bank 搜索
+
+    增量更新: 只拉取新增或作业资源 updated_at 变化的试卷, 已删除的作业从题库移除。
+    只改题目时作业资源的 updated_at 可能不变, 需要最新题目时传 full_refresh=true。
+    """
+    try:
+        resources = _load_course_resource_index(group_id)
+        bank = QuestionBankDB(group_id)
+        indexed = bank.papers()
+        papers = {}
+        for resource_id, item in resources.by_id.items():
+            paper_id = item.get("quote_id")
+            if item.get("type") != ResourceType.ASSIGNMENT or not paper_id:
+                continue
+            papers[str(paper_id)] = {
+                "paper_id": str(paper_id),
+                "resource_id": resource_id,
+                "name": item.get("name"),
+                "file_path": resources.file_path(resource_id),
+                "updated_at": item.get("updated_at"),
+            }
+
+        removed = sorted(set(indexed) - set(papers))
+        bank.remove_papers(removed)
+        pending = [
+            paper
+            for paper_id, paper in papers.items()
+            if full_refresh
+            or paper_id not in indexed
+            or indexed[paper_id]["updated_at"] != paper["updated_at"]
+        ]
+        failed_items = []
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+                futures = [
+                    (
+                        paper,
+                        executor.submit(
+                            copy_context().run, _fetch_bank_questions, group_id, paper["paper_id"]
+                        ),
+                    )
+                    for paper in pending
+                ]
+                for paper, future in futures:
+                    try:
+                        paper_updated_at, questions = future.result()
+                        bank.replace_paper(
+                            {**paper, "paper_updated_at": paper_updated_at}, questions
+                        )
+                    except (APIRequestError, KeyError, ValueError) as e:
+                        failed_items.append(
+                            {
+                                "paper_id": paper["paper_id"],
+                                "name": paper["name"],
+                                "message": str(e),
+                            }
+                        )
+        question_count = bank.question_count()
+    except (APIRequestError, OSError, sqlite3.Error) as e:
+        return ResponseUtil.error("建立题库索引时发生异常", e)
+
+    data = {
+        "db_path": str(bank.db_path),
+        "paper_count": len(papers),
+        "indexed_count": len(pending) - len(failed_items),
+        "skipped_count": len(papers) - len(pending),
+        "removed_count": len(removed),
+        "failed_count": len(failed_items),
+        "question_count": question_count,
+        "failed_items": failed_items,
+    }
+    message = (
+        f"题库索引完成: 更新{data['indexed_count']}份试卷, 跳过{data['skipped_count']}份, "
+        f"移除{data['removed_count']}份, 失败{data['failed_count']}份"
+    )
+    if failed_items:
+        return ResponseUtil.error(message, data=data)
+    return ResponseUtil.success(data, message)
+
+
+@MCP.tool()
+def search_question_bank(
+    group_id: Annotated[str, Field(description=desc.GROUP_ID_DESC)],
+    keyword: Annotated[str, Field(description=desc.BANK_SEARCH_KEYWORD_DESC, min_length=1)],
+    question_type: Annotated[
+        QuestionType | None, Field(description=desc.BANK_QUESTION_TYPE_FILTER_DESC)
+    ] = None,
+    limit: Annotated[int, Field(description=desc.SEARCH_LIMIT_DESC, ge=1, le=200)] = 20,
+) -> dict:
+    """在本地题库中按题干/选项文本搜索旧题, 返回题目及其所在试卷(找可复用的题时优先使用)
+
+    只读本地索引, 不访问小雅; 题库不存在或过期时先调用 index_question_bank。
+    """
+    bank = QuestionBankDB(group_id)
+    if not bank.exists():
+        return ResponseUtil.error("该课程组还没有题库索引, 请先调用 index_question_bank")
+    try:
+        matches = bank.search(keyword, question_type=question_type, limit=limit)
+    except sqlite3.Error as e:
+        return ResponseUtil.error("搜索题库时发生异常", e)
+    return ResponseUtil.success(matches, f"题库搜索完成,命中{len(matches)}题")
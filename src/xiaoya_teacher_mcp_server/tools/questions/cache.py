@@ -0,0 +1,222 @@
+"""试卷编辑缓冲区(queryPaperEditBuffer)的进程内缓存。
+
+修改类工具把接口返回的最新题目/答案项/题目顺序直接写回缓存副本, 之后的试卷查询
+不必再请求小雅。写回时若发现缓存与返回数据对不上(题目不在缓存中、题目或答案项
+集合不同), 说明缓存已偏离服务端, 直接丢弃该试卷, 下次查询重新拉取。
+新建题目/答案项、导入、调整选项顺序等结构性修改只做失效。
+
+每次修改(无论试卷是否在缓存中)都会推进该试卷的版本号, 修改前已发出的拉取
+不会把旧数据写入缓存; 只知道题目 id、查不到所属试卷的修改推进整个账号的版本号。
+"""
+
+from __future__ import annotations
+
+import copy
+import os
+import time
+from collections import Counter
+from collections.abc import Callable
+from threading import RLock
+from typing import Any
+
+from ...config import auth_scope
+
+PAPER_CACHE_TTL_ENV = "XIAOYA_PAPER_CACHE_TTL"
+DEFAULT_PAPER_CACHE_TTL = 120.0
+
+
+def paper_cache_ttl() -> float:
+    """缓存有效期(秒), 兜底其他客户端(如网页端)对试卷的修改; 设为 0 关闭缓存。"""
+    try:
+        return max(float(os.getenv(PAPER_CACHE_TTL_ENV, DEFAULT_PAPER_CACHE_TTL)), 0.0)
+    except ValueError:
+        return DEFAULT_PAPER_CACHE_TTL
+
+
+class PaperCache:
+    """按 (账号, 试卷) 缓存编辑缓冲区; 账号取自当前请求的认证令牌, 不同账号互不可见。"""
+
+    def __init__(self):
+        self._papers: dict[tuple[str, str], dict[str, Any]] = {}
+        self._question_papers: dict[tuple[str, str], str] = {}
+        self._generations: Counter[tuple[str, str]] = Counter()
+        # 所属试卷未知的题目修改次数, 按账号计
+        self._unlocated_writes: Counter[str] = Counter()
+        self._lock = RLock()
+        self.stats: Counter[str] = Counter()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._papers.clear()
+            self._question_papers.clear()
+            self._generations.clear()
+            self._unlocated_writes.clear()
+
+    def load(
+        self, paper_id: str, fetch: Callable[[], dict[str, Any]], *, refresh: bool = False
+    ) -> dict[str, Any]:
+        """命中时返回缓存副本, 否则调用 fetch 拉取并缓存。
+
+        拉取期间若有修改使该试卷失效, 拉到的数据可能已过期, 只返回不缓存。
+        """
+        scope = auth_scope()
+        ttl = paper_cache_ttl()
+        if scope is None or ttl <= 0:
+            return fetch()
+        key = (scope, str(paper_id))
+        with self._lock:
+            entry = self._papers.get(key)
+            if entry and not refresh and time.monotonic() - entry["fetched_at"] < ttl:
+                self.stats["hits"] += 1
+                return copy.deepcopy(entry["data"])
+            self.stats["misses"] += 1
+            version = self._version(key)
+
+        data = fetch()
+        with self._lock:
+            if self._version(key) == version:
+                self._store(key, copy.deepcopy(data))
+        return data
+
+    def _version(self, key: tuple[str, str]) -> tuple[int, int]:
+        return self._generations[key], self._unlocated_writes[key[0]]
+
+    def _mark_write(self, scope: str, paper_id: str | None) -> None:
+        """缓存里没有可写回的副本时, 仍要让进行中的拉取作废。"""
+        if paper_id is None:
+            self._unlocated_writes[scope] += 1
+        else:
+            self._generations[(scope, str(paper_id))] += 1
+
+    def _store(self, key: tuple[str, str], data: dict[str, Any]) -> None:
+        self._drop(key)
+        self._papers[key] = {"data": data, "fetched_at": time.monotonic()}
+        for question in data.get("questions") or []:
+            self._question_papers[(key[0], str(question.get("id")))] = key[1]
+
+    def _drop(self, key: tuple[str, str]) -> None:
+        self._generations[key] += 1
+        entry = self._papers.pop(key, None)
+        if entry is None:
+            return
+        self.stats["invalidations"] += 1
+        for question in entry["data"].get("questions") or []:
+            self._question_papers.pop((key[0], str(question.get("id"))), None)
+
+    def invalidate(self, paper_id: str) -> None:
+        scope = auth_scope()
+        if scope is None:
+            return
+        with self._lock:
+            self._drop((scope, str(paper_id)))
+
+    def invalidate_question(self, question_id: str) -> None:
+        scope = auth_scope()
+        if scope is None:
+            return
+        with self._lock:
+            paper_id = self._question_papers.get((scope, str(question_id)))
+            if paper_id is None:
+                self._mark_write(scope, None)
+            else:
+                self._drop((scope, paper_id))
+
+    def _cached_question(self, scope: str, question_id: str) -> tuple[tuple[str, str], dict] | None:
+        paper_id = self._question_papers.get((scope, question_id))
+        if paper_id is None:
+            return None
+        key = (scope, paper_id)
+        for question in self._papers[key]["data"]["questions"]:
+            if str(question.get("id")) == question_id:
+                return key, question
+        self._drop(key)
+        return None
+
+    def apply_question(self, question: dict[str, Any]) -> None:
+        """写回 updateQuestion 返回的题目; 返回中没有的字段保留缓存值。"""
+        scope = auth_scope()
+        if scope is None or not question.get("id"):
+            return
+        with self._lock:
+            located = self._cached_question(scope, str(question["id"]))
+            if located is None:
+                self._mark_write(scope, question.get("paper_id"))
+                return
+            key, cached = located
+            if question.get("paper_id") not in (None, key[1]):
+                self._drop(key)
+                self._mark_write(scope, question["paper_id"])
+                return
+            cached.update(copy.deepcopy(question))
+            self._generations[key] += 1
+            self.stats["write_through"] += 1
+
+    def apply_answer_items(self, question_id: str, items: list[dict[str, Any]]) -> None:
+        """写回 updateAnswerItem 返回的整题答案项; 答案项集合变化说明缓存已偏离。"""
+        scope = auth_scope()
+        if scope is None:
+            return
+        with self._lock:
+            located = self._cached_question(scope, str(question_id))
+            if located is None:
+                self._mark_write(scope, None)
+                return
+            key, cached = located
+            by_id = {str(item.get("id")): item for item in items}
+            current = cached.get("answer_items") or []
+            if set(by_id) != {str(item.get("id")) for item in current}:
+                self._drop(key)
+                return
+            cached["answer_items"] = [copy.deepcopy(by_id[str(item.get("id"))]) for item in current]
+            self._generations[key] += 1
+            self.stats["write_through"] += 1
+
+    def apply_question_order(
+        self, paper_id: str, question_ids: list[str], updated_at: str | None = None
+    ) -> None:
+        """写回 moveQuestion 返回的题目顺序; 题目集合不同则丢弃缓存。"""
+        scope = auth_scope()
+        if scope is None:
+            return
+        key = (scope, str(paper_id))
+        with self._lock:
+            entry = self._papers.get(key)
+            if entry is None:
+                self._generations[key] += 1
+                return
+            by_id = {str(question.get("id")): question for question in entry["data"]["questions"]}
+            if len(question_ids) != len(by_id) or set(map(str, question_ids)) != set(by_id):
+                self._drop(key)
+                return
+            entry["data"]["questions"] = [by_id[str(question_id)] for question_id in question_ids]
+            if updated_at is not None:
+                entry["data"]["updated_at"] = updated_at
+            self._generations[key] += 1
+            self.stats["write_through"] += 1
+
+    def remove_questions(self, paper_id: str, question_ids: list[str]) -> None:
+        """从缓存中删去已删除的题目; 缓存里本就没有这些题目时丢弃缓存。"""
+        scope = auth_scope()
+        if scope is None or not question_ids:
+            return
+        key = (scope, str(paper_id))
+        removed = set(map(str, question_ids))
+        with self._lock:
+            entry = self._papers.get(key)
+            if entry is None:
+                self._generations[key] += 1
+                return
+            questions = entry["data"]["questions"]
+            if not removed <= {str(question.get("id")) for question in questions}:
+                self._drop(key)
+                return
+            entry["data"]["questions"] = [
+                question for question in questions if str(question.get("id")) not in removed
+            ]
+            for question_id in removed:
+                self._question_papers.pop((scope, question_id), None)
+            self._generations[key] += 1
+            self.stats["write_through"] += 1
+
+
+PAPER_CACHE = PaperCache()
@@ -2,6 +2,11 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from functools import partial
+from itertools import groupby
 from typing import Annotated, Any
 
 from pydantic import Field
@@ -31,22 +36,31 @@ from ...utils.client import (
     expect_success,
     post_json,
 )
+from ...utils.logging import get_logger
 from ...utils.response import ResponseUtil
 from ...utils.rich_text import (
     markdown_without_asset_references,
     normalize_rich_text_input,
     render_rich_text_output,
 )
-from .delete import delete_questions
+from .cache import PAPER_CACHE
+from .delete import delete_answer_item_data, delete_questions
+from .plan import OfficeQuestion, question_from_edit_buffer, to_office_question
+from .query import _fetch_paper_edit_buffer, _load_paper_edit_buffer
 from .update import (
     update_fill_blank_answer,
+    update_paper_question_order,
     update_question,
     update_question_options,
     update_short_answer_answer,
     update_true_false_answer,
 )
 
+LOGGER = get_logger("xiaoya_teacher_mcp_server.questions")
+
 KNOWN_CREATION_ERRORS = (APIRequestError, ValueError)
+QUESTION_CREATE_WORKERS = 6
+QUESTION_SUBREQUEST_WORKERS = 4
 
 
 def resolve_parse_mode(need_parse: bool) -> str:
@@ -74,30 +88,33 @@ def create_question_data(
     payload = {"paper_id": str(paper_id), "type": question_type.value, "score": score}
     if insert_question_id is not None and len(insert_question_id) == 19:
         payload["insert_question_id"] = str(insert_question_id)
-    return parse_question(
-        expect_success(post_json(f"{MAIN_URL}/survey/addQuestion", payload=payload)),
-        parse_mode="raw",
-    )
+    question = expect_success(post_json(f"{MAIN_URL}/survey/addQuestion", payload=payload))
+    PAPER_CACHE.invalidate(paper_id)
+    return parse_question(question, parse_mode="raw")
 
 
 def create_blank_answer_items_data(
     paper_id: str, question_id: str, count: int
 ) -> list[dict[str, Any]]:
-    return expect_success(
+    data = expect_success(
         post_json(
             f"{MAIN_URL}/survey/createBlankAnswerItems",
             payload={"paper_id": str(paper_id), "question_id": str(question_id), "count": count},
         )
-    )["answer_items"]
+    )
+    PAPER_CACHE.invalidate(paper_id)
+    return data["answer_items"]
 
 
 def create_answer_item_data(paper_id: str, question_id: str) -> dict[str, Any]:
-    return expect_success(
+    item = expect_success(
         post_json(
             f"{MAIN_URL}/survey/createAnswerItem",
             payload={"paper_id": str(paper_id), "question_id": str(question_id)},
         )
     )
+    PAPER_CACHE.invalidate(paper_id)
+    return item
 
 
 def update_question_base(
@@ -140,6 +157,39 @@ def validate_fill_blank_question(
     return plain_title
 
 
+def _submit(executor: ThreadPoolExecutor, fn: Callable[..., Any], /, *args, **kwargs) -> Future:
+    return executor.submit(copy_context().run, partial(fn, *args, **kwargs))
+
+
+def _update_answer_item_or_raise(
+    update: Callable[..., dict], item_id: str, failure: str, **kwargs
+) -> tuple[str, list[dict[str, Any]]]:
+    r = update(answer_item_id=item_id, **kwargs)
+    if not r.get("success"):
+        raise ValueError(r.get("message") or failure)
+    return item_id, r["data"]
+
+
+def _merge_answer_item_updates(
+    item_ids: list[str], updates: list[tuple[str, list[dict[str, Any]]]]
+) -> list[dict[str, Any]]:
+    """合并并发更新各答案项的响应, 还原串行时最后一次响应应有的完整选项列表。
+
+    每次响应都返回全部答案项, 但并发时任何一次响应都可能早于其它项的更新;
+    被更新的项取自身那次更新的响应, 未更新的项取任意响应, 顺序按 item_ids。
+    """
+    merged: dict[str, dict[str, Any]] = {}
+    for _, items in updates:
+        for item in items:
+            merged.setdefault(item["answer_item_id"], item)
+    for item_id, items in updates:
+        merged.update(
+            {item["answer_item_id"]: item for item in items if item["answer_item_id"] == item_id}
+        )
+    order = [*item_ids, *(item_id for item_id in merged if item_id not in item_ids)]
+    return [merged[item_id] for item_id in order if item_id in merged]
+
+
 @MCP.tool()
 def create_single_choice_question(
     paper_id: Annotated[str, Field(description=desc.PAPER_ID_DESC)],
@@ -195,27 +245,42 @@ def create_fill_blank_question(
             paper_id, QuestionType.FILL_BLANK, question.score, question.insert_question_id
         )
         question_id = question_data["id"]
-        question_data = update_question_base(
-            question_id=question_id,
-            title=question.title,
-            title_md=question.title_md,
-            title_assets=question.title_assets,
-            title_raw=question.title_raw,
-            description=question.description,
-            required=question.required,
-            is_split_answer=question.is_split_answer,
-            automatic_stat=question.automatic_stat,
-            automatic_type=question.automatic_type,
-            parse_mode=parse_mode,
-        )
-        blank_items = create_blank_answer_items_data(paper_id, question_id, len(question.options))
-        last_blank_data = []
-        for item, answer in zip(blank_items, question.options, strict=False):
-            r = update_fill_blank_answer(question_id, item["id"], answer.text)
-            if not r.get("success"):
-                raise ValueError(r.get("message") or "填空答案更新失败")
-            last_blank_data = r["data"]
-        question_data["options"] = last_blank_data
+        # 题干设置与填空答案互不依赖, 并发提交
+        with ThreadPoolExecutor(max_workers=QUESTION_SUBREQUEST_WORKERS) as executor:
+            base_future = _submit(
+                executor,
+                update_question_base,
+                question_id=question_id,
+                title=question.title,
+                title_md=question.title_md,
+                title_assets=question.title_assets,
+                title_raw=question.title_raw,
+                description=question.description,
+                required=question.required,
+                is_split_answer=question.is_split_answer,
+                automatic_stat=question.automatic_stat,
+                automatic_type=question.automatic_type,
+                parse_mode=parse_mode,
+            )
+            blank_items = create_blank_answer_items_data(
+                paper_id, question_id, len(question.options)
+            )
+            item_ids = [item["id"] for item in blank_items]
+            blank_futures = [
+                _submit(
+                    executor,
+                    _update_answer_item_or_raise,
+                    update_fill_blank_answer,
+                    item_id,
+                    "填空答案更新失败",
+                    question_id=question_id,
+                    answer=answer.text,
+                )
+                for item_id, answer in zip(item_ids, question.options, strict=False)
+            ]
+            question_data = base_future.result()
+            updates = [future.result() for future in blank_futures]
+        question_data["options"] = _merge_answer_item_updates(item_ids, updates)
         return ResponseUtil.success(question_data if need_detail else None, "填空题创建成功")
     except Exception as e:
         if question_id:
@@ -398,6 +463,244 @@ def create_code_question(
         return ResponseUtil.error("创建编程题时发生异常", e)
 
 
+QUESTION_HANDLERS = {
+    QuestionType.SINGLE_CHOICE: create_single_choice_question,
+    QuestionType.MULTIPLE_CHOICE: create_multiple_choice_question,
+    QuestionType.TRUE_FALSE: create_true_false_question,
+    QuestionType.FILL_BLANK: create_fill_blank_question,
+    QuestionType.SHORT_ANSWER: create_short_answer_question,
+    QuestionType.ATTACHMENT: create_attachment_question,
+    QuestionType.CODE: create_code_question,
+}
+
+
+def _batch_item(index: int, question: Any) -> dict[str, Any]:
+    return {
+        "index": index,
+        "type": QuestionType.get(question.type),
+        "title": extract_plain_title(
+            getattr(question, "title", None),
+            getattr(question, "title_md", None),
+            getattr(question, "title_raw", None),
+        ),
+    }
+
+
+def _create_batch_question(
+    paper_id: str, index: int, question: Any, need_parse: bool
+) -> dict[str, Any]:
+    """逐题创建单题并返回结果条目; 失败时由各题型自身回滚。"""
+    item = _batch_item(index, question)
+    question_type = item["type"]
+    try:
+        handler = QUESTION_HANDLERS.get(question.type)
+        if handler is None:
+            return {
+                "success": False,
+                "item": {**item, "message": "不支持的题目类型"},
+                "detail": f"第{index}题: 创建失败 - 不支持的题目类型",
+            }
+        result = handler(paper_id, question, need_detail=True, need_parse=need_parse)
+        if not result["success"]:
+            return {
+                "success": False,
+                "item": {**item, "message": result["message"]},
+                "detail": f"[第{index}题][创建失败][{question_type}][{result['message']}]",
+            }
+        question_data = result["data"]
+        question_id = question_data.get("id") if isinstance(question_data, dict) else None
+        return {
+            "success": True,
+            "item": {**item, "question_id": question_id},
+            "detail": f"[第{index}题][创建成功][{question_type}][{item['title']}]",
+            "data": question_data,
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "item": {**item, "message": str(e)},
+            "detail": f"[第{index}题][创建异常][{question_type}][{str(e)}]",
+        }
+
+
+def _import_batch_questions(
+    paper_id: str, entries: list[tuple[int, Any, OfficeQuestion]], need_parse: bool
+) -> list[dict[str, Any]] | None:
+    """一次导入请求创建 entries; 请求失败或结果校验不通过时回滚并返回 None, 改走逐题创建。
+
+    题目详情(富文本渲染)延迟到调用方确实需要时才解析, 见 _outcome_data。
+    """
+    try:
+        imported, errors = import_office_questions(paper_id, [entry[2] for entry in entries])
+    except APIRequestError:
+        return None
+    if errors:
+        created_ids = [str(question["id"]) for question in imported if question.get("id")]
+        if created_ids:
+            _rollback_imported(paper_id, created_ids)
+        return None
+    parse_mode = resolve_parse_mode(need_parse)
+    outcomes = []
+    for (index, question, _), raw in zip(entries, imported, strict=True):
+        item = _batch_item(index, question)
+        outcomes.append(
+            {
+                "success": True,
+                "item": {**item, "question_id": raw.get("id")},
+                "detail": f"[第{index}题][导入成功][{item['type']}][{item['title']}]",
+                "data": partial(parse_question, raw, parse_mode=parse_mode),
+                "imported": True,
+            }
+        )
+    return outcomes
+
+
+def _rollback_imported(paper_id: str, question_ids: list[str]) -> None:
+    """删除校验未通过的导入结果; 删不掉的题目只记日志, 不影响随后的逐题创建。"""
+    try:
+        result = delete_questions(paper_id, question_ids)
+        remaining = [item["question_id"] for item in result["data"]["failed_items"]]
+    except APIRequestError as exc:
+        LOGGER.warning("回滚导入的题目失败 (paper_id: %s): %s", paper_id, exc)
+        remaining = question_ids
+    if remaining:
+        LOGGER.warning(
+            "试卷 %s 中以下导入的题目未能删除, 需手动清理: %s", paper_id, ", ".join(remaining)
+        )
+
+
+def _outcome_data(outcome: dict[str, Any]) -> Any:
+    data = outcome["data"]
+    return data() if callable(data) else data
+
+
+def _plan_entries(
+    questions: list[Any], prefer_import: bool
+) -> list[tuple[int, Any, OfficeQuestion | None]]:
+    return [
+        (index, question, to_office_question(question) if prefer_import else None)
+        for index, question in enumerate(questions, 1)
+    ]
+
+
+def _run_batch_plan(
+    paper_id: str,
+    entries: list[tuple[int, Any, OfficeQuestion | None]],
+    need_parse: bool,
+    *,
+    max_workers: int,
+) -> list[dict[str, Any]]:
+    """按计划创建并按题目顺序返回结果。
+
+    max_workers > 1 时(调用方随后统一排序): 可导入的题合并为一次导入请求,
+    与其余题的逐题创建并发进行。否则按原顺序把连续的可导入题分段导入,
+    其余逐题创建, 新题依次追加到试卷末尾, 无需再排序。
+    """
+    if max_workers <= 1:
+        outcomes: list[dict[str, Any]] = []
+        for importable, group in groupby(entries, key=lambda entry: entry[2] is not None):
+            segment = list(group)
+            imported = (
+                _import_batch_questions(paper_id, segment, need_parse) if importable else None
+            )
+            outcomes.extend(
+                imported
+                or [
+                    _create_batch_question(paper_id, index, question, need_parse)
+                    for index, question, _ in segment
+                ]
+            )
+        return outcomes
+
+    office_entries = [entry for entry in entries if entry[2] is not None]
+    by_index: dict[int, dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        import_future = (
+            _submit(executor, _import_batch_questions, paper_id, office_entries, need_parse)
+            if office_entries
+            else None
+        )
+        singles = {
+            index: _submit(executor, _create_batch_question, paper_id, index, question, need_parse)
+            for index, question, office in entries
+            if office is None
+        }
+        imported = import_future.result() if import_future else []
+        if imported is None:
+            singles.update(
+                {
+                    index: _submit(
+                        executor, _create_batch_question, paper_id, index, question, need_parse
+                    )
+                    for index, question, _ in office_entries
+                }
+            )
+            imported = []
+        by_index.update({outcome["item"]["index"]: outcome for outcome in imported})
+        by_index.update({index: future.result() for index, future in singles.items()})
+    return [by_index[index] for index, _, _ in entries]
+
+
+def _create_planned_questions(
+    paper_id: str,
+    entries: list[tuple[int, Any, OfficeQuestion | None]],
+    *,
+    need_detail: bool,
+    need_parse: bool,
+    group_id: str | None,
+    max_workers: int,
+    label: str,
+) -> dict:
+    """执行建题计划并汇总结果; 传入 group_id 时并发创建, 最后一次性恢复题目顺序。"""
+    concurrent = group_id is not None
+    try:
+        existing_ids = (
+            [
+                question["id"]
+                for question in _fetch_paper_edit_buffer(group_id, paper_id)["questions"]
+            ]
+            if concurrent
+            else []
+        )
+    except APIRequestError as e:
+        return ResponseUtil.error("查询试卷现有题目失败", e)
+
+    outcomes = _run_batch_plan(
+        paper_id, entries, need_parse, max_workers=max_workers if concurrent else 1
+    )
+    results: dict[str, Any] = {
+        "details": [outcome["detail"] for outcome in outcomes],
+        "success_items": [outcome["item"] for outcome in outcomes if outcome["success"]],
+        "failed_items": [outcome["item"] for outcome in outcomes if not outcome["success"]],
+        "imported_count": sum(bool(outcome.get("imported")) for outcome in outcomes),
+    }
+    success_count = len(results["success_items"])
+    failed_count = len(results["failed_items"])
+
+    reorder_failed = False
+    created_ids = [item["question_id"] for item in results["success_items"] if item["question_id"]]
+    if concurrent and len(created_ids) > 1:
+        reorder = update_paper_question_order(paper_id, [*existing_ids, *created_ids])
+        reorder_failed = not reorder.get("success")
+        results["reordered"] = not reorder_failed
+        if reorder_failed:
+            results["details"].append(f"[题目排序失败][{reorder.get('message')}]")
+
+    results["success_count"] = success_count
+    results["failed_count"] = failed_count
+    results["partial_success"] = bool(success_count and failed_count)
+    if need_detail:
+        results["questions"] = [
+            _outcome_data(outcome) for outcome in outcomes if outcome["success"]
+        ]
+    summary = f"[{label}][成功{success_count}题][失败{failed_count}题][总计{len(entries)}题]"
+    if reorder_failed:
+        summary += "[题目顺序未恢复]"
+    if failed_count or reorder_failed:
+        return ResponseUtil.error(summary, data=results)
+    return ResponseUtil.success(results, summary)
+
+
 @MCP.tool()
 def batch_create_questions(
     paper_id: Annotated[str, Field(description=desc.PAPER_ID_DESC)],
@@ -418,97 +721,115 @@ def batch_create_questions(
     ],
     need_detail: Annotated[bool, Field(description=desc.NEED_DETAIL_DESC)] = False,
     need_parse: Annotated[bool, Field(description=desc.RETURN_PARSE_DESC)] = False,
+    group_id: Annotated[str | None, Field(description=desc.BATCH_GROUP_ID_DESC)] = None,
+    max_workers: Annotated[
+        int, Field(description=desc.QUESTION_WORKERS_DESC, ge=1, le=16)
+    ] = QUESTION_CREATE_WORKERS,
+    prefer_import: Annotated[bool, Field(description=desc.PREFER_IMPORT_DESC)] = True,
 ) -> dict:
-    """批量创建题目(非官方接口),不稳定但功能更强大[支持单选、多选、填空、判断、附件、简答题、编程题]"""
-    question_handlers = {
-        QuestionType.SINGLE_CHOICE: create_single_choice_question,
-        QuestionType.MULTIPLE_CHOICE: create_multiple_choice_question,
-        QuestionType.TRUE_FALSE: create_true_false_question,
-        QuestionType.FILL_BLANK: create_fill_blank_question,
-        QuestionType.SHORT_ANSWER: create_short_answer_question,
-        QuestionType.ATTACHMENT: create_attachment_question,
-        QuestionType.CODE: create_code_question,
-    }
-    success_count, failed_count = 0, 0
-    results: dict[str, Any] = {
-        "details": [],
-        "questions": [],
-        "success_items": [],
-        "failed_items": [],
-    }
+    """批量创建题目(非官方接口),不稳定但功能更强大[支持单选、多选、填空、判断、附件、简答题、编程题]
+
+    纯文本题目会合并为官方导入请求创建并校验结果, 只有编程题、Markdown/原始富文本、
+    指定插入位置等导入接口表达不了的题逐题创建。传入 group_id 时导入与逐题创建并发进行,
+    全部完成后用一次 update_paper_question_order 把新题恢复为传入顺序, 原有题目保持在前;
+    指定了 insert_question_id 的批次按原方式依次创建。
+    """
+    if any(getattr(question, "insert_question_id", None) for question in questions):
+        group_id = None
+    return _create_planned_questions(
+        paper_id,
+        _plan_entries(questions, prefer_import),
+        need_detail=need_detail,
+        need_parse=need_parse,
+        group_id=group_id,
+        max_workers=max_workers,
+        label="批量创建完成",
+    )
 
-    for index, question in enumerate(questions, 1):
-        question_title = extract_plain_title(
-            getattr(question, "title", None),
-            getattr(question, "title_md", None),
-            getattr(question, "title_raw", None),
-        )
-        question_type = QuestionType.get(question.type)
+
+@MCP.tool()
+def clone_paper_questions(
+    source_group_id: Annotated[str, Field(description=desc.CLONE_SOURCE_GROUP_ID_DESC)],
+    source_paper_id: Annotated[str, Field(description=desc.CLONE_SOURCE_PAPER_ID_DESC)],
+    target_paper_id: Annotated[str, Field(description=desc.CLONE_TARGET_PAPER_ID_DESC)],
+    question_ids: Annotated[
+        list[str] | None, Field(description=desc.CLONE_QUESTION_IDS_DESC)
+    ] = None,
+    target_group_id: Annotated[str | None, Field(description=desc.BATCH_GROUP_ID_DESC)] = None,
+    need_detail: Annotated[bool, Field(description=desc.NEED_DETAIL_DESC)] = False,
+    need_parse: Annotated[bool, Field(description=desc.RETURN_PARSE_DESC)] = False,
+    max_workers: Annotated[
+        int, Field(description=desc.QUESTION_WORKERS_DESC, ge=1, le=16)
+    ] = QUESTION_CREATE_WORKERS,
+) -> dict:
+    """把源试卷的题目复制到目标试卷(可跨课程), 追加在目标试卷末尾
+
+    直接读取源试卷编辑缓冲区, 纯文本题合并为一次官方导入请求; 编程题、带格式或
+    图片/附件的富文本题逐题创建, 富文本原样复制并复用其中的 quote_id, 不重新上传资源。
+    """
+    try:
+        source = _load_paper_edit_buffer(source_group_id, source_paper_id)
+    except APIRequestError as e:
+        return ResponseUtil.error("查询源试卷失败", e)
+
+    source_questions = source.get("questions") or []
+    if question_ids:
+        wanted = set(map(str, question_ids))
+        source_questions = [q for q in source_questions if str(q.get("id")) in wanted]
+        missing = wanted - {str(q.get("id")) for q in source_questions}
+        if missing:
+            return ResponseUtil.error(f"源试卷中不存在这些题目: {sorted(missing)}")
+    if not source_questions:
+        return ResponseUtil.error("源试卷没有可复制的题目")
+
+    questions = []
+    for index, raw in enumerate(source_questions, 1):
         try:
-            handler = question_handlers.get(question.type)
-            if handler is None:
-                failed_count += 1
-                results["failed_items"].append(
-                    {
-                        "index": index,
-                        "type": question_type,
-                        "title": question_title,
-                        "message": "不支持的题目类型",
-                    }
-                )
-                results["details"].append(f"第{index}题: 创建失败 - 不支持的题目类型")
-                continue
-            result = handler(paper_id, question, need_detail=True, need_parse=need_parse)
-            if result["success"]:
-                success_count += 1
-                question_data = result["data"]
-                question_id = question_data.get("id") if isinstance(question_data, dict) else None
-                results["questions"].append(question_data)
-                results["success_items"].append(
-                    {
-                        "index": index,
-                        "type": question_type,
-                        "title": question_title,
-                        "question_id": question_id,
-                    }
-                )
-                results["details"].append(
-                    f"[第{index}题][创建成功][{question_type}][{question_title}]"
-                )
-            else:
-                failed_count += 1
-                results["failed_items"].append(
-                    {
-                        "index": index,
-                        "type": question_type,
-                        "title": question_title,
-                        "message": result["message"],
-                    }
-                )
-                results["details"].append(
-                    f"[第{index}题][创建失败][{question_type}][{result['message']}]"
-                )
-        except Exception as e:
-            failed_count += 1
-            results["failed_items"].append(
-                {
-                    "index": index,
-                    "type": question_type,
-                    "title": question_title,
-                    "message": str(e),
-                }
-            )
-            results["details"].append(f"[第{index}题][创建异常][{question_type}][{str(e)}]")
+            questions.append(question_from_edit_buffer(raw))
+        except (ValueError, KeyError) as e:
+            return ResponseUtil.error(f"第{index}题无法复制(题目id: {raw.get('id')})", e)
+    return _create_planned_questions(
+        target_paper_id,
+        _plan_entries(questions, prefer_import=True),
+        need_detail=need_detail,
+        need_parse=need_parse,
+        group_id=target_group_id,
+        max_workers=max_workers,
+        label="题目复制完成",
+    )
 
-    results["success_count"] = success_count
-    results["failed_count"] = failed_count
-    results["partial_success"] = bool(success_count and failed_count)
-    if not need_detail:
-        results.pop("questions", None)
-    summary = f"[批量创建完成][成功{success_count}题][失败{failed_count}题][总计{len(questions)}题]"
-    if failed_count:
-        return ResponseUtil.error(summary, data=results)
-    return ResponseUtil.success(results, summary)
+
+OFFICE_FIXED_ANSWER_ITEMS = {
+    QuestionType.SHORT_ANSWER: [{"seqno": "A"}],
+    QuestionType.TRUE_FALSE: [
+        {"seqno": "A", "context": "true"},
+        {"seqno": "B", "context": ""},
+    ],
+    QuestionType.ATTACHMENT: [{"seqno": "A"}],
+    QuestionType.CODE: [],
+}
+
+
+def import_office_questions(
+    paper_id: str, questions: list[Any]
+) -> tuple[list[dict[str, Any]], list[str]]:
+    """调用官方导入接口, 返回导入后的原始题目与结果校验错误。"""
+    questions_data = []
+    for q in questions:
+        data = q.model_dump()
+        items = OFFICE_FIXED_ANSWER_ITEMS.get(q.type)
+        if items is not None:
+            data["answer_items"] = items
+        questions_data.append(data)
+
+    imported_questions = expect_success(
+        post_json(
+            f"{MAIN_URL}/survey/question/import",
+            payload={"paper_id": str(paper_id), "questions": questions_data},
+        )
+    )
+    PAPER_CACHE.invalidate(paper_id)
+    return imported_questions, validate_office_import_results(questions, imported_questions)
 
 
 @MCP.tool()
@@ -543,30 +864,7 @@ def office_create_questions(
                 except ValueError as e:
                     return ResponseUtil.error(f"第{index}题格式错误", e)
 
-        fixed_answer_items = {
-            QuestionType.SHORT_ANSWER: [{"seqno": "A"}],
-            QuestionType.TRUE_FALSE: [
-                {"seqno": "A", "context": "true"},
-                {"seqno": "B", "context": ""},
-            ],
-            QuestionType.ATTACHMENT: [{"seqno": "A"}],
-            QuestionType.CODE: [],
-        }
-        questions_data = []
-        for q in questions:
-            data = q.model_dump()
-            items = fixed_answer_items.get(q.type)
-            if items is not None:
-                data["answer_items"] = items
-            questions_data.append(data)
-
-        imported_questions = expect_success(
-            post_json(
-                f"{MAIN_URL}/survey/question/import",
-                payload={"paper_id": str(paper_id), "questions": questions_data},
-            )
-        )
-        validation_errors = validate_office_import_results(questions, imported_questions)
+        imported_questions, validation_errors = import_office_questions(paper_id, questions)
         if validation_errors:
             return ResponseUtil.error("批量导入完成但结果校验失败: " + "; ".join(validation_errors))
         if not need_detail:
@@ -649,39 +947,57 @@ def _create_choice_question(
             paper_id, question_type, question.score, question.insert_question_id
         )
         question_id = question_data["id"]
-        answer_items = question_data["options"]
+        item_ids = [item["answer_item_id"] for item in question_data["options"]]
 
-        question_data = update_question_base(
-            question_id=question_id,
-            title=question.title,
-            title_md=question.title_md,
-            title_assets=question.title_assets,
-            title_raw=question.title_raw,
-            description=question.description,
-            required=question.required,
-            parse_mode=parse_mode,
-        )
-        # 确保选项数量足够
-        for _ in range(len(answer_items), len(question.options)):
-            raw = create_answer_item_data(paper_id, question_id)
-            answer_items.append({"answer_item_id": raw["id"]})
-        # 设置每个选项的内容和答案标记
-        last_options_data = []
-        for item, option in zip(answer_items, question.options, strict=False):
-            r = update_question_options(
+        with ThreadPoolExecutor(max_workers=QUESTION_SUBREQUEST_WORKERS) as executor:
+            base_future = _submit(
+                executor,
+                update_question_base,
                 question_id=question_id,
-                answer_item_id=item["answer_item_id"],
-                option_text=option.text,
-                option_text_md=option.text_md,
-                option_text_assets=option.text_assets,
-                option_text_raw=option.text_raw,
-                is_answer=option.answer,
+                title=question.title,
+                title_md=question.title_md,
+                title_assets=question.title_assets,
+                title_raw=question.title_raw,
+                description=question.description,
+                required=question.required,
                 parse_mode=parse_mode,
             )
-            if not r.get("success"):
-                raise ValueError(r.get("message") or "选项更新失败")
-            last_options_data = r["data"]
-        question_data["options"] = last_options_data
+
+            def submit_option(item_id: str, option: Any) -> Future:
+                return _submit(
+                    executor,
+                    _update_answer_item_or_raise,
+                    update_question_options,
+                    item_id,
+                    "选项更新失败",
+                    question_id=question_id,
+                    option_text=option.text,
+                    option_text_md=option.text_md,
+                    option_text_assets=option.text_assets,
+                    option_text_raw=option.text_raw,
+                    is_answer=option.answer,
+                    parse_mode=parse_mode,
+                )
+
+            option_futures = [
+                submit_option(item_id, option)
+                for item_id, option in zip(item_ids, question.options, strict=False)
+            ]
+            # 选项按创建先后排列, 缺少的选项逐个创建, 每建好一个立即提交其内容更新
+            for option in question.options[len(item_ids) :]:
+                item_ids.append(create_answer_item_data(paper_id, question_id)["id"])
+                option_futures.append(submit_option(item_ids[-1], option))
+            question_data = base_future.result()
+            updates = [future.result() for future in option_futures]
+        # 新题自带的默认选项多于所需(如复制来的三选项题)时删去多余的空选项
+        surplus = item_ids[len(question.options) :]
+        for item_id in surplus:
+            delete_answer_item_data(paper_id, question_id, item_id)
+        question_data["options"] = [
+            item
+            for item in _merge_answer_item_updates(item_ids, updates)
+            if item["answer_item_id"] not in surplus
+        ]
         msg = "单选题创建成功" if is_single else "多选题创建成功"
         return ResponseUtil.success(question_data if need_detail else None, msg)
     except Exception as e:
@@ -8,6 +8,7 @@ from pydantic import Field
 
 from ... import field_descriptions as desc
 from ...config import MAIN_URL, MCP
+from ...tools.questions.cache import PAPER_CACHE
 from ...utils.client import APIRequestError, expect_success, extract_response_message, post_json
 from ...utils.response import ResponseUtil
 
@@ -34,6 +35,7 @@ def delete_questions(
         except APIRequestError as exc:
             failed_items.append({"question_id": question_id, "message": str(exc)})
 
+    PAPER_CACHE.remove_questions(paper_id, success_ids)
     data = {
         "success_count": len(success_ids),
         "failed_count": len(failed_items),
@@ -48,6 +50,20 @@ def delete_questions(
     return ResponseUtil.success(data, message)
 
 
+def delete_answer_item_data(paper_id: str, question_id: str, answer_item_id: str) -> None:
+    expect_success(
+        post_json(
+            f"{MAIN_URL}/survey/delAnswerItem",
+            payload={
+                "paper_id": str(paper_id),
+                "question_id": str(question_id),
+                "answer_item_id": str(answer_item_id),
+            },
+        )
+    )
+    PAPER_CACHE.invalidate(paper_id)
+
+
 @MCP.tool()
 def delete_answer_item(
     paper_id: Annotated[str, Field(description=desc.PAPER_ID_DESC)],
@@ -56,16 +72,7 @@ def delete_answer_item(
 ) -> dict:
     """删除题目的某个选项"""
     try:
-        expect_success(
-            post_json(
-                f"{MAIN_URL}/survey/delAnswerItem",
-                payload={
-                    "paper_id": str(paper_id),
-                    "question_id": str(question_id),
-                    "answer_item_id": str(answer_item_id),
-                },
-            )
-        )
+        delete_answer_item_data(paper_id, question_id, answer_item_id)
         return ResponseUtil.success(None, "选项删除成功")
     except APIRequestError as e:
         return ResponseUtil.error("删除题目选项时发生异常", e)
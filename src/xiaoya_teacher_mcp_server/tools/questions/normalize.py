@@ -125,15 +125,8 @@ def summarize_question(
     return summary
 
 
-def summarize_paper(
-    paper: dict[str, Any],
-    parse_mode: str = "plain",
-) -> dict[str, Any]:
-    questions = [
-        summarize_question(question, parse_mode=parse_mode)
-        for question in paper.get("questions", [])
-    ]
-    type_counts = dict(Counter(question["type"] for question in questions))
+def _paper_payload(paper: dict[str, Any], questions: list[dict[str, Any]]) -> dict[str, Any]:
+    """统计只用到题型和分值, 摘要和完整题目都可以直接复用。"""
     return {
         "question_shuffle": paper["random"],
         "option_shuffle": paper["question_random"],
@@ -143,11 +136,36 @@ def summarize_paper(
         "updated_at": paper["updated_at"],
         "question_count": len(questions),
         "total_score": sum(question["score"] for question in questions),
-        "type_counts": type_counts,
+        "type_counts": dict(Counter(question["type"] for question in questions)),
         "questions": questions,
     }
 
 
+def summarize_paper(
+    paper: dict[str, Any],
+    parse_mode: str = "plain",
+) -> dict[str, Any]:
+    questions = [
+        summarize_question(question, parse_mode=parse_mode)
+        for question in paper.get("questions", [])
+    ]
+    return _paper_payload(paper, questions)
+
+
+def build_paper_payload(
+    paper: dict[str, Any],
+    detail_level: str = "summary",
+    parse_mode: str = "plain",
+) -> dict[str, Any]:
+    """按 detail_level 构造试卷数据; full 模式每道题只解析一遍, 统计取自解析结果。"""
+    if detail_level != "full":
+        return summarize_paper(paper, parse_mode=parse_mode)
+    questions = [
+        parse_question(question, parse_mode=parse_mode) for question in paper.get("questions", [])
+    ]
+    return _paper_payload(paper, questions)
+
+
 def answer_item_seqno(item: dict[str, Any], index: int) -> str:
     seqno = item.get("seqno")
     if seqno:
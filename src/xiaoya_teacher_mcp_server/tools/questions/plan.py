@@ -0,0 +1,318 @@
+"""批量建题规划: 判断题目能否走官方导入接口, 并转换为导入格式。
+
+也负责把试卷编辑缓冲区里的已有题目转换回建题模型, 供 clone_paper_questions 复制题目。
+"""
+
+from __future__ import annotations
+
+import json
+from string import ascii_uppercase
+from typing import Any
+
+from pydantic import BaseModel, Field, ValidationError
+
+from ... import field_descriptions as desc
+from ...types.enums import AnswerChecked, AutoStatType, QuestionType, RequiredType
+from ...types.question_models import (
+    AnswerItem,
+    AttachmentQuestion,
+    AttachmentQuestionData,
+    ChoiceQuestion,
+    CodeQuestion,
+    FillBlankAnswer,
+    FillBlankQuestion,
+    FillBlankQuestionData,
+    MultipleChoiceQuestion,
+    MultipleChoiceQuestionData,
+    ProgramSettingAllNeed,
+    QuestionOption,
+    ShortAnswerQuestion,
+    ShortAnswerQuestionData,
+    SingleChoiceQuestionData,
+    StandardAnswer,
+    TrueFalseQuestion,
+    TrueFalseQuestionData,
+)
+from ...utils.rich_text import (
+    is_rich_text_document,
+    load_rich_text_value,
+    rich_text_to_markdown_document,
+    rich_text_to_plain_text,
+)
+from .normalize import answer_item_seqno
+
+OfficeQuestion = (
+    SingleChoiceQuestionData
+    | MultipleChoiceQuestionData
+    | FillBlankQuestionData
+    | TrueFalseQuestionData
+    | ShortAnswerQuestionData
+    | AttachmentQuestionData
+)
+
+
+class _ClonedFields(BaseModel):
+    """复制已有题目时放宽的约束。
+
+    入参模型要求 AI 写解析、选择题至少 4 个选项; 编辑缓冲区里已有题目的解析可以为空,
+    选择题也可以只有 2~3 个选项, 复制时按原样保留。
+    """
+
+    description: str = Field(description=desc.ANSWER_EXPLANATION_DESC, default="")
+
+
+class _ClonedChoiceFields(_ClonedFields):
+    options: list[QuestionOption] = Field(description=desc.QUESTION_OPTIONS_DESC)
+
+
+class ClonedChoiceQuestion(_ClonedChoiceFields, ChoiceQuestion):
+    """复制的单选题"""
+
+
+class ClonedMultipleChoiceQuestion(_ClonedChoiceFields, MultipleChoiceQuestion):
+    """复制的多选题"""
+
+
+class ClonedTrueFalseQuestion(_ClonedFields, TrueFalseQuestion):
+    """复制的判断题"""
+
+
+class ClonedFillBlankQuestion(_ClonedFields, FillBlankQuestion):
+    """复制的填空题"""
+
+
+class ClonedShortAnswerQuestion(_ClonedFields, ShortAnswerQuestion):
+    """复制的简答题"""
+
+
+class ClonedAttachmentQuestion(_ClonedFields, AttachmentQuestion):
+    """复制的附件题"""
+
+
+class ClonedCodeQuestion(_ClonedFields, CodeQuestion):
+    """复制的编程题"""
+
+
+class ClonedSingleChoiceQuestionData(_ClonedFields, SingleChoiceQuestionData):
+    """复制的单选题(导入格式)"""
+
+
+class ClonedMultipleChoiceQuestionData(_ClonedFields, MultipleChoiceQuestionData):
+    """复制的多选题(导入格式)"""
+
+
+class ClonedFillBlankQuestionData(_ClonedFields, FillBlankQuestionData):
+    """复制的填空题(导入格式)"""
+
+
+class ClonedTrueFalseQuestionData(_ClonedFields, TrueFalseQuestionData):
+    """复制的判断题(导入格式)"""
+
+
+class ClonedShortAnswerQuestionData(_ClonedFields, ShortAnswerQuestionData):
+    """复制的简答题(导入格式)"""
+
+
+class ClonedAttachmentQuestionData(_ClonedFields, AttachmentQuestionData):
+    """复制的附件题(导入格式)"""
+
+
+_CLONED_OFFICE_MODELS: dict[type[BaseModel], type[BaseModel]] = {
+    SingleChoiceQuestionData: ClonedSingleChoiceQuestionData,
+    MultipleChoiceQuestionData: ClonedMultipleChoiceQuestionData,
+    FillBlankQuestionData: ClonedFillBlankQuestionData,
+    TrueFalseQuestionData: ClonedTrueFalseQuestionData,
+    ShortAnswerQuestionData: ClonedShortAnswerQuestionData,
+    AttachmentQuestionData: ClonedAttachmentQuestionData,
+}
+
+
+def _plain_text(model: Any, field: str) -> str | None:
+    """只有纯文本字段能原样导入; Markdown/原始富文本交给逐题创建。"""
+    if getattr(model, f"{field}_md", None) is not None:
+        return None
+    if getattr(model, f"{field}_raw", None) is not None:
+        return None
+    return getattr(model, field, None)
+
+
+def _choice_data(question: Any, title: str, base: dict[str, Any]) -> dict[str, Any] | None:
+    if len(question.options) > len(ascii_uppercase):
+        return None
+    texts = [_plain_text(option, "text") for option in question.options]
+    if any(text is None for text in texts):
+        return None
+    seqnos = ascii_uppercase[: len(texts)]
+    return {
+        **base,
+        "answer_items": [
+            AnswerItem(seqno=seqno, context=text) for seqno, text in zip(seqnos, texts, strict=True)
+        ],
+        "standard_answers": [
+            StandardAnswer(seqno=seqno, standard_answer=seqno)
+            for seqno, option in zip(seqnos, question.options, strict=True)
+            if option.answer
+        ],
+    }
+
+
+def to_office_question(question: Any) -> OfficeQuestion | None:
+    """能用导入接口等价创建时返回对应的 *QuestionData, 否则返回 None。
+
+    需要逐题创建的情况: 编程题、Markdown/原始富文本(含附件资源)、指定插入位置、
+    非必答, 以及填空题的拆分答案/统计方式等导入接口不支持的设置。
+    """
+    if question.type == QuestionType.CODE or question.insert_question_id:
+        return None
+    if question.required not in (None, RequiredType.YES):
+        return None
+    title = _plain_text(question, "title")
+    if not title:
+        return None
+    base = {"title": title, "description": question.description, "score": question.score}
+
+    data: dict[str, Any] | None
+    if question.type == QuestionType.SINGLE_CHOICE:
+        data, model = _choice_data(question, title, base), SingleChoiceQuestionData
+    elif question.type == QuestionType.MULTIPLE_CHOICE:
+        data, model = _choice_data(question, title, base), MultipleChoiceQuestionData
+    elif question.type == QuestionType.TRUE_FALSE:
+        seqno = "A" if question.answer else "B"
+        data = {**base, "standard_answers": [StandardAnswer(seqno="A", standard_answer=seqno)]}
+        model = TrueFalseQuestionData
+    elif question.type == QuestionType.FILL_BLANK:
+        if question.is_split_answer is not None or question.automatic_stat is not None:
+            return None
+        if "____" not in title or title.count("____") != len(question.options):
+            return None
+        seqnos = [str(position) for position in range(1, len(question.options) + 1)]
+        data = {
+            **base,
+            "automatic_type": question.automatic_type,
+            "answer_items": [AnswerItem(seqno=seqno) for seqno in seqnos],
+            "standard_answers": [
+                StandardAnswer(seqno=seqno, standard_answer=answer.text)
+                for seqno, answer in zip(seqnos, question.options, strict=True)
+            ],
+        }
+        model = FillBlankQuestionData
+    elif question.type == QuestionType.SHORT_ANSWER:
+        answer = _plain_text(question, "answer")
+        if not answer:
+            return None
+        data = {**base, "standard_answers": [StandardAnswer(seqno="A", standard_answer=answer)]}
+        model = ShortAnswerQuestionData
+    elif question.type == QuestionType.ATTACHMENT:
+        data, model = base, AttachmentQuestionData
+    else:
+        return None
+
+    if data is None:
+        return None
+    if isinstance(question, _ClonedFields):
+        model = _CLONED_OFFICE_MODELS[model]
+    try:
+        return model(**data)
+    except ValidationError:
+        return None
+
+
+def _rich_field(value: Any, field: str) -> dict[str, Any]:
+    """可以无损表示为纯文本的字段按纯文本复制, 才能走导入接口; 带样式、代码块、
+    图片/附件的字段原样复制 Draft.js 内容, 其中的 quote_id 直接复用, 不重新上传。
+    """
+    parsed = load_rich_text_value(value)
+    if not is_rich_text_document(parsed):
+        return {field: str(parsed or "")}
+    plain = rich_text_to_plain_text(parsed)
+    document = rich_text_to_markdown_document(parsed)
+    if not document["assets"] and document["markdown"] == plain:
+        return {field: plain}
+    return {f"{field}_raw": parsed}
+
+
+def _program_setting(question: dict[str, Any]) -> ProgramSettingAllNeed:
+    setting = question.get("program_setting") or {}
+    answer_items = question.get("answer_items") or []
+    cases = json.loads(answer_items[0].get("answer") or "[]") if answer_items else []
+    return ProgramSettingAllNeed(
+        **{
+            key: setting[key]
+            for key in (
+                "max_memory",
+                "max_time",
+                "debug",
+                "debug_count",
+                "runcase",
+                "runcase_count",
+                "language",
+            )
+            if setting.get(key) is not None
+        },
+        answer_language=setting.get("example_language"),
+        code_answer=setting.get("example_code"),
+        in_cases=[{"in": case.get("in", "")} for case in cases],
+    )
+
+
+def question_from_edit_buffer(question: dict[str, Any]) -> Any:
+    """把编辑缓冲区(queryPaperEditBuffer)中的原始题目转换为 batch_create_questions 的题目模型。
+
+    转换结果再经 to_office_question 分流: 纯文本题走导入接口, 编程题、带格式或
+    资源的富文本、非必答题以及导入接口不支持的填空设置逐题创建。
+    转换失败(如题型未知)时抛出 ValueError 或 ValidationError。
+    """
+    question_type = question["type"]
+    answer_items = question.get("answer_items") or []
+    data: dict[str, Any] = {
+        **_rich_field(question["title"], "title"),
+        "description": question.get("description") or "",
+        "score": question["score"],
+        "required": question["required"],
+    }
+
+    if question_type in (QuestionType.SINGLE_CHOICE, QuestionType.MULTIPLE_CHOICE):
+        data["options"] = [
+            QuestionOption(
+                **_rich_field(item.get("value"), "text"),
+                answer=item.get("answer_checked") == AnswerChecked.CORRECT,
+            )
+            for item in answer_items
+        ]
+        model = (
+            ClonedChoiceQuestion
+            if question_type == QuestionType.SINGLE_CHOICE
+            else ClonedMultipleChoiceQuestion
+        )
+    elif question_type == QuestionType.TRUE_FALSE:
+        checked = [
+            answer_item_seqno(item, index)
+            for index, item in enumerate(answer_items)
+            if item.get("answer_checked") == AnswerChecked.CORRECT
+        ]
+        data["answer"] = checked == ["A"]
+        model = ClonedTrueFalseQuestion
+    elif question_type == QuestionType.FILL_BLANK:
+        data["options"] = [
+            FillBlankAnswer(text=rich_text_to_plain_text(item.get("answer")) or "")
+            for item in answer_items
+        ]
+        data["automatic_type"] = question["automatic_type"]
+        # 与导入接口默认值一致时不写入, 这样纯文本填空题仍可合并导入
+        if question.get("is_split_answer"):
+            data["is_split_answer"] = True
+        if question.get("automatic_stat") not in (None, AutoStatType.OFF):
+            data["automatic_stat"] = question["automatic_stat"]
+        model = ClonedFillBlankQuestion
+    elif question_type == QuestionType.SHORT_ANSWER:
+        answer = answer_items[0].get("answer") if answer_items else ""
+        data.update(_rich_field(answer, "answer"))
+        model = ClonedShortAnswerQuestion
+    elif question_type == QuestionType.ATTACHMENT:
+        model = ClonedAttachmentQuestion
+    elif question_type == QuestionType.CODE:
+        data["program_setting"] = _program_setting(question)
+        model = ClonedCodeQuestion
+    else:
+        raise ValueError(f"不支持复制的题目类型: {QuestionType.get(question_type)}")
+    return model(**data)
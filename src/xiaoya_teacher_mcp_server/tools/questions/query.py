@@ -6,7 +6,8 @@ from pydantic import Field
 
 from ... import field_descriptions as desc
 from ...config import MAIN_URL, MCP
-from ...tools.questions.normalize import parse_question, summarize_paper
+from ...tools.questions.cache import PAPER_CACHE
+from ...tools.questions.normalize import build_paper_payload
 from ...utils.client import APIRequestError, expect_success, get_json
 from ...utils.response import ResponseUtil
 
@@ -19,13 +20,10 @@ def _fetch_paper_edit_buffer(group_id: str, paper_id: str) -> dict:
     return expect_success(response)
 
 
-def _build_paper_payload(data: dict, detail_level: str, parse_mode: str) -> dict:
-    paper_data = summarize_paper(data, parse_mode=parse_mode)
-    if detail_level == "full":
-        paper_data["questions"] = [
-            parse_question(question, parse_mode=parse_mode) for question in data["questions"]
-        ]
-    return paper_data
+def _load_paper_edit_buffer(group_id: str, paper_id: str, *, refresh: bool = False) -> dict:
+    return PAPER_CACHE.load(
+        paper_id, lambda: _fetch_paper_edit_buffer(group_id, paper_id), refresh=refresh
+    )
 
 
 @MCP.tool()
@@ -48,11 +46,12 @@ def query_paper(
             pattern="^(plain|raw|markdown)$",
         ),
     ] = "plain",
+    refresh: Annotated[bool, Field(description=desc.PAPER_REFRESH_DESC)] = False,
 ) -> dict:
     """查询试卷；默认返回摘要，完整内容请设 detail_level=full"""
     try:
-        data = _fetch_paper_edit_buffer(group_id, paper_id)
-        paper_data = _build_paper_payload(data, detail_level, parse_mode)
+        data = _load_paper_edit_buffer(group_id, paper_id, refresh=refresh)
+        paper_data = build_paper_payload(data, detail_level, parse_mode)
         if detail_level == "summary":
             return ResponseUtil.success(paper_data, "试卷摘要查询成功")
         return ResponseUtil.success(paper_data, "试卷查询成功")
@@ -64,6 +63,7 @@ def query_paper(
 def query_paper_summary(
     group_id: Annotated[str, Field(description=desc.GROUP_ID_DESC)],
     paper_id: Annotated[str, Field(description=desc.PAPER_ID_DESC)],
+    refresh: Annotated[bool, Field(description=desc.PAPER_REFRESH_DESC)] = False,
 ) -> dict:
     """获取试卷摘要(推荐 AI 默认使用)"""
     return query_paper(
@@ -71,4 +71,5 @@ def query_paper_summary(
         paper_id=paper_id,
         detail_level="summary",
         parse_mode="plain",
+        refresh=refresh,
     )
@@ -9,6 +9,7 @@ from pydantic import Field
 
 from ... import field_descriptions as desc
 from ...config import MAIN_URL, MCP
+from ...tools.questions.cache import PAPER_CACHE
 from ...tools.questions.normalize import format_rich_text_field, parse_question
 from ...tools.questions.query import _fetch_paper_edit_buffer
 from ...types.enums import (
@@ -33,12 +34,16 @@ KNOWN_UPDATE_ERRORS = (APIRequestError, ValueError)
 
 def _post_update_answer_item(**payload) -> list[dict[str, Any]]:
     response = post_json(f"{MAIN_URL}/survey/updateAnswerItem", payload=payload)
-    return expect_success(response)
+    items = expect_success(response)
+    PAPER_CACHE.apply_answer_items(payload["question_id"], items)
+    return items
 
 
 def _post_update_question(**payload) -> dict[str, Any]:
     response = post_json(f"{MAIN_URL}/survey/updateQuestion", payload=payload)
-    return expect_success(response)
+    question = expect_success(response)
+    PAPER_CACHE.apply_question(question)
+    return question
 
 
 def _format_choice_items(items: list[dict[str, Any]], parse_mode: str) -> list[dict[str, Any]]:
@@ -99,6 +104,7 @@ def _update_paper_settings(
     if len(payload) == 1:
         raise ValueError("至少提供一个试卷配置项")
     expect_success(post_json(f"{MAIN_URL}/survey/updatePaper", payload=payload))
+    PAPER_CACHE.invalidate(paper_id)
 
 
 def _update_question_required(question_id: str, required: RequiredType) -> None:
@@ -152,15 +158,10 @@ def _update_code_cases(
         {"id": f"use_case_{i}", "in": case["in"], "out": case["out"]}
         for i, case in enumerate(case_data["result"])
     ]
-    return expect_success(
-        post_json(
-            f"{MAIN_URL}/survey/updateAnswerItem",
-            payload={
-                "question_id": str(question_id),
-                "answer_item_id": str(answer_item_id),
-                "answer": json.dumps(formatted_cases, ensure_ascii=False),
-            },
-        )
+    return _post_update_answer_item(
+        question_id=str(question_id),
+        answer_item_id=str(answer_item_id),
+        answer=json.dumps(formatted_cases, ensure_ascii=False),
     )
 
 
@@ -501,6 +502,7 @@ def move_answer_item(
                 payload={"question_id": str(question_id), "answer_item_ids": answer_item_ids},
             )
         )
+        PAPER_CACHE.invalidate_question(question_id)
         return ResponseUtil.success(None, "题目选项顺序调整成功")
     except KNOWN_UPDATE_ERRORS as e:
         return ResponseUtil.error("题目选项顺序调整失败", e)
@@ -524,6 +526,10 @@ def update_paper_question_order(
                 },
             )
         )
-        return ResponseUtil.success(_format_question_order(data), "试卷题目顺序更新成功")
+        order = _format_question_order(data)
+        PAPER_CACHE.apply_question_order(
+            paper_id, order.get("questions_sort") or [], order.get("updated_at")
+        )
+        return ResponseUtil.success(order, "试卷题目顺序更新成功")
     except KNOWN_UPDATE_ERRORS as e:
         return ResponseUtil.error("试卷题目顺序更新失败", e)
@@ -1,4 +1,4 @@
 """资源管理模块"""
 
 # 导出所有工具函数
-from . import create, delete, query, update  # noqa: F401
+from . import create, delete, layout, query, sync, update  # noqa: F401
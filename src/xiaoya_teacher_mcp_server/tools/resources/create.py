@@ -2,16 +2,53 @@
 
 from __future__ import annotations
 
-from typing import Annotated
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Annotated, Any
 
 from pydantic import Field
 
 from ... import field_descriptions as desc
 from ...config import MAIN_URL, MCP
 from ...tools.resources.normalize import normalize_resource_item
-from ...types.resource_models import ResourceType
+from ...types.resource_models import ResourceTreeNode, ResourceType
 from ...utils.client import APIRequestError, expect_success, post_json
 from ...utils.response import ResponseUtil
+from .query import _load_course_resource_index
+from .update import _sort_nodes
+
+RESOURCE_CREATE_WORKERS = 8
+
+
+def _add_resource(group_id: str, type_val: ResourceType, parent_id: str, name: str) -> dict:
+    return expect_success(
+        post_json(
+            f"{MAIN_URL}/resource/addResource",
+            payload={
+                "type": str(type_val),
+                "parent_id": str(parent_id),
+                "group_id": str(group_id),
+                "name": name,
+            },
+        )
+    )
+
+
+def _run_concurrently(calls: list[Callable[[], Any]]) -> list[Any]:
+    """并发执行并按提交顺序返回结果; 异常作为结果返回由调用方归类。"""
+
+    def capture(call: Callable[[], Any]) -> Any:
+        try:
+            return call()
+        except APIRequestError as exc:
+            return exc
+
+    if len(calls) <= 1:
+        return [capture(call) for call in calls]
+    with ThreadPoolExecutor(max_workers=min(RESOURCE_CREATE_WORKERS, len(calls))) as executor:
+        futures = [executor.submit(copy_context().run, capture, call) for call in calls]
+        return [future.result() for future in futures]
 
 
 @MCP.tool()
@@ -23,19 +60,90 @@ def create_course_resource(
 ) -> dict:
     """创建新的教育资源"""
     try:
-        data = expect_success(
-            post_json(
-                f"{MAIN_URL}/resource/addResource",
-                payload={
-                    "type": str(type_val),
-                    "parent_id": str(parent_id),
-                    "group_id": str(group_id),
-                    "name": name,
-                },
-            )
-        )
         return ResponseUtil.success(
-            normalize_resource_item(data, detail_level="full"), "资源创建成功"
+            normalize_resource_item(
+                _add_resource(group_id, type_val, parent_id, name), detail_level="full"
+            ),
+            "资源创建成功",
         )
     except APIRequestError as e:
         return ResponseUtil.error("创建教育资源时发生异常", e)
+
+
+@MCP.tool()
+def create_resource_tree(
+    group_id: Annotated[str, Field(description=desc.GROUP_ID_DESC)],
+    parent_id: Annotated[str, Field(description=desc.PARENT_ID_DESC)],
+    tree: Annotated[
+        list[ResourceTreeNode], Field(description=desc.RESOURCE_TREE_DESC, min_length=1)
+    ],
+) -> dict:
+    """按嵌套结构一次性创建课程资源树(如 周次 x 讲义/实验/作业)。
+
+    逐层创建, 同层兄弟节点并发提交; 新文件夹的 id 传给其子节点作为 parent_id。
+    全部创建完成后每个文件夹只调用一次排序, 使资源顺序与传入列表一致;
+    parent_id 下原有的资源保持在新资源之前。创建失败的文件夹其子树会被跳过并记入 failed_items。
+    """
+    try:
+        existing = _load_course_resource_index(group_id).children_by_parent.get(str(parent_id), [])
+        root: dict[str, Any] = {"children": []}
+        # (父文件夹 id, 该文件夹在结果树中的节点, 待创建的子节点规格, 父路径)
+        level = [(str(parent_id), root, tree, "")]
+        created_count = 0
+        failed_items: list[dict[str, str]] = []
+        created_children: dict[str, list[str]] = {}
+
+        while level:
+            jobs = [
+                (parent, holder, spec, f"{path}/{spec.name}" if path else spec.name)
+                for parent, holder, specs, path in level
+                for spec in specs
+            ]
+            results = _run_concurrently(
+                [
+                    lambda parent=parent, spec=spec: _add_resource(
+                        group_id, spec.type, parent, spec.name
+                    )
+                    for parent, _, spec, _ in jobs
+                ]
+            )
+            level = []
+            for (parent, holder, spec, path), result in zip(jobs, results, strict=True):
+                if isinstance(result, APIRequestError):
+                    failed_items.append({"path": path, "message": str(result)})
+                    continue
+                created_count += 1
+                node = normalize_resource_item(result, detail_level="summary")
+                holder["children"].append(node)
+                created_children.setdefault(parent, []).append(node["id"])
+                if spec.type == ResourceType.FOLDER:
+                    node["children"] = []
+                    if spec.children:
+                        level.append((node["id"], node, spec.children, path))
+
+        sort_jobs = [
+            (folder_id, ([*existing, *child_ids] if folder_id == str(parent_id) else child_ids))
+            for folder_id, child_ids in created_children.items()
+        ]
+        sort_jobs = [(folder_id, ids) for folder_id, ids in sort_jobs if len(ids) > 1]
+        sort_results = _run_concurrently(
+            [lambda ids=ids: _sort_nodes(group_id, ids) for _, ids in sort_jobs]
+        )
+        for (folder_id, _), result in zip(sort_jobs, sort_results, strict=True):
+            if isinstance(result, APIRequestError):
+                failed_items.append({"folder_id": folder_id, "message": f"排序失败: {result}"})
+
+        data = {
+            "created_count": created_count,
+            "failed_count": len(failed_items),
+            "partial_success": bool(created_count and failed_items),
+            "sorted_folder_count": len(sort_jobs),
+            "tree": root["children"],
+            "failed_items": failed_items,
+        }
+        message = f"资源树创建完成:成功{created_count}个,失败{len(failed_items)}个"
+        if failed_items:
+            return ResponseUtil.error(message, data=data)
+        return ResponseUtil.success(data, message)
+    except (APIRequestError, ValueError) as e:
+        return ResponseUtil.error("创建资源树时发生异常", e)
@@ -12,6 +12,15 @@ from ...utils.client import APIRequestError, expect_success, post_json
 from ...utils.response import ResponseUtil
 
 
+def _delete_node(group_id: str, node_id: str) -> None:
+    expect_success(
+        post_json(
+            f"{MAIN_URL}/resource/delResource",
+            payload={"node_id": str(node_id), "group_id": str(group_id)},
+        )
+    )
+
+
 @MCP.tool()
 def delete_course_resource(
     group_id: Annotated[str, Field(description=desc.GROUP_ID_DESC)],
@@ -19,12 +28,7 @@ def delete_course_resource(
 ) -> dict:
     """删除教育资源"""
     try:
-        expect_success(
-            post_json(
-                f"{MAIN_URL}/resource/delResource",
-                payload={"node_id": str(node_id), "group_id": str(group_id)},
-            )
-        )
+        _delete_node(group_id, node_id)
         return ResponseUtil.success(None, "资源删除成功")
     except APIRequestError as e:
         return ResponseUtil.error("删除教育资源时发生异常", e)
@@ -0,0 +1,400 @@
+"""课程资源布局 plan/apply MCP 工具"""
+
+from __future__ import annotations
+
+from typing import Annotated, Any
+
+from pydantic import Field
+
+from ... import field_descriptions as desc
+from ...config import MCP
+from ...types.resource_models import (
+    DownloadType,
+    ResourceLayoutNode,
+    ResourceType,
+    VisibilityType,
+)
+from ...utils.client import APIRequestError
+from ...utils.response import ResponseUtil
+from .create import _add_resource, _run_concurrently
+from .delete import _delete_node
+from .normalize import CourseResourceIndex
+from .query import _load_course_resource_index
+from .update import (
+    _move_nodes,
+    _post_download,
+    _post_visibility,
+    _rename_node,
+    _run_batch_resource_update,
+    _sort_nodes,
+)
+
+NEW_REF_PREFIX = "new:"
+OPERATION_KINDS = ("create", "rename", "move", "visibility", "download", "sort", "delete")
+
+
+class _LayoutPlanner:
+    """对比期望布局与当前资源树, 生成最少的操作集合; 新建节点用 new:<序号>:<路径> 占位引用。"""
+
+    def __init__(self, index: CourseResourceIndex, delete_missing: bool):
+        self.index = index
+        self.delete_missing = delete_missing
+        self.claimed: set[str] = set()
+        self.creates: list[dict[str, Any]] = []
+        self.renames: list[dict[str, Any]] = []
+        self.moves: dict[tuple[str, str], list[str]] = {}
+        self.visibility: dict[int, list[str]] = {}
+        self.download: dict[int, list[str]] = {}
+        self.sorts: list[dict[str, Any]] = []
+        self.deletes: list[dict[str, Any]] = []
+        # 新建节点的创建轮次: 父节点已存在为 0, 否则为父节点轮次 + 1
+        self.depths: dict[str, int] = {}
+
+    def claim_explicit_ids(self, layout: list[ResourceLayoutNode]) -> None:
+        pending = list(layout)
+        while pending:
+            spec = pending.pop()
+            if spec.id is not None:
+                if spec.id not in self.index:
+                    raise ValueError(f"资源不存在: {spec.id}")
+                if spec.id in self.claimed:
+                    raise ValueError(f"同一资源在布局中出现多次: {spec.id}")
+                self.claimed.add(spec.id)
+            pending.extend(spec.children or [])
+
+    def visit(
+        self,
+        parent_ref: str,
+        existing_parent: str | None,
+        specs: list[ResourceLayoutNode],
+        path: str,
+    ) -> None:
+        current = self.index.children_by_parent.get(existing_parent, []) if existing_parent else []
+        available = [child_id for child_id in current if child_id not in self.claimed]
+        final_order: list[str] = []
+
+        for spec in specs:
+            spec_path = f"{path}/{spec.name}" if path else spec.name
+            node_id = spec.id or self._match_sibling(available, spec)
+            if node_id is None:
+                ref = f"{NEW_REF_PREFIX}{len(self.creates) + 1}:{spec_path}"
+                self.depths[ref] = self.depths.get(parent_ref, -1) + 1
+                self.creates.append(
+                    {
+                        "ref": ref,
+                        "parent_id": parent_ref,
+                        "name": spec.name,
+                        "type": int(spec.type),
+                        "path": spec_path,
+                        "depth": self.depths[ref],
+                    }
+                )
+                self._plan_flags(ref, spec, None)
+                final_order.append(ref)
+                if spec.children:
+                    self.visit(ref, None, spec.children, spec_path)
+                continue
+
+            item = self.index.by_id[node_id]
+            if item.get("name") != spec.name:
+                self.renames.append({"node_id": node_id, "name": spec.name, "path": spec_path})
+            if str(item.get("parent_id")) != parent_ref:
+                self.moves.setdefault((str(item.get("parent_id")), parent_ref), []).append(node_id)
+            self._plan_flags(node_id, spec, item)
+            final_order.append(node_id)
+            if spec.children is not None and item.get("type") == ResourceType.FOLDER.value:
+                self.visit(node_id, node_id, spec.children, spec_path)
+
+        leftovers = [child_id for child_id in available if child_id not in self.claimed]
+        if self.delete_missing:
+            self.deletes.extend(
+                {"node_id": child_id, "path": self._path_of(path, child_id)}
+                for child_id in leftovers
+            )
+        else:
+            final_order.extend(leftovers)
+
+        retained = set(final_order)
+        if len(final_order) > 1 and final_order != [c for c in current if c in retained]:
+            self.sorts.append({"parent_id": parent_ref, "order": final_order, "path": path})
+
+    def _match_sibling(self, available: list[str], spec: ResourceLayoutNode) -> str | None:
+        for child_id in available:
+            item = self.index.by_id[child_id]
+            if item.get("name") == spec.name and item.get("type") == int(spec.type):
+                available.remove(child_id)
+                self.claimed.add(child_id)
+                return child_id
+        return None
+
+    def _plan_flags(
+        self, node_ref: str, spec: ResourceLayoutNode, item: dict[str, Any] | None
+    ) -> None:
+        if spec.public is not None and (item is None or item.get("public") != int(spec.public)):
+            self.visibility.setdefault(int(spec.public), []).append(node_ref)
+        if spec.download is not None and (
+            item is None or item.get("download") != int(spec.download)
+        ):
+            self.download.setdefault(int(spec.download), []).append(node_ref)
+
+    def _path_of(self, parent_path: str, node_id: str) -> str:
+        name = self.index.by_id[node_id].get("name") or node_id
+        return f"{parent_path}/{name}" if parent_path else name
+
+    def _claimed_descendants(self, node_id: str) -> list[str]:
+        found, pending = [], list(self.index.children_by_parent.get(node_id, []))
+        while pending:
+            child_id = pending.pop()
+            if child_id in self.claimed:
+                found.append(child_id)
+            pending.extend(self.index.children_by_parent.get(child_id, []))
+        return found
+
+    def plan(self) -> dict[str, Any]:
+        for item in self.deletes:
+            item["moved_out_ids"] = self._claimed_descendants(item["node_id"])
+        operations = {
+            "create": self.creates,
+            "rename": self.renames,
+            "move": [
+                {"node_ids": node_ids, "from_parent_id": source, "parent_id": target}
+                for (source, target), node_ids in self.moves.items()
+            ],
+            "visibility": [
+                {"pub": pub, "node_ids": node_ids} for pub, node_ids in self.visibility.items()
+            ],
+            "download": [
+                {"download": value, "node_ids": node_ids}
+                for value, node_ids in self.download.items()
+            ],
+            "sort": self.sorts,
+            "delete": self.deletes,
+        }
+        request_counts = {
+            "create": len(self.creates),
+            "rename": len(self.renames),
+            "move": len(self.moves),
+            "visibility": sum(len(node_ids) for node_ids in self.visibility.values()),
+            "download": sum(len(node_ids) for node_ids in self.download.values()),
+            "sort": len(self.sorts),
+            "delete": len(self.deletes),
+        }
+        create_levels = len({item["depth"] for item in self.creates})
+        return {
+            "operations": operations,
+            "request_counts": request_counts,
+            "request_count": sum(request_counts.values()),
+            # 串行轮次: 逐层创建 + 改名/移动/属性 + 排序 + 删除
+            "rounds": create_levels
+            + bool(self.renames or self.moves or self.visibility or self.download)
+            + bool(self.sorts)
+            + bool(self.deletes),
+        }
+
+
+def _check_layout_parent(index: CourseResourceIndex, group_id: str, parent_id: str) -> None:
+    """布局根必须是课程根目录(group_id)或已存在的文件夹, 否则在计划阶段就拒绝。"""
+    if parent_id == str(group_id):
+        return
+    item = index.by_id.get(parent_id)
+    if item is None:
+        raise ValueError(f"父资源不存在: {parent_id}")
+    if item.get("type") != ResourceType.FOLDER.value:
+        raise ValueError(f"父资源不是文件夹: {index.file_path(parent_id) or parent_id}")
+
+
+def plan_resource_layout(
+    index: CourseResourceIndex,
+    group_id: str,
+    parent_id: str,
+    layout: list[ResourceLayoutNode],
+    *,
+    delete_missing: bool = False,
+) -> dict[str, Any]:
+    _check_layout_parent(index, group_id, str(parent_id))
+    planner = _LayoutPlanner(index, delete_missing)
+    planner.claim_explicit_ids(layout)
+    planner.visit(str(parent_id), str(parent_id), layout, "")
+    return planner.plan()
+
+
+def _apply_plan(group_id: str, plan: dict[str, Any]) -> tuple[dict[str, int], list[dict[str, Any]]]:
+    """按依赖顺序执行: 逐层创建 -> 改名/移动/可见性/下载 -> 排序 -> 删除。
+
+    依赖的新建节点失败时, 相关操作记为失败而不发送请求;
+    待删除文件夹中仍有未成功移出的布局资源时, 跳过该删除。
+    """
+    operations = plan["operations"]
+    refs: dict[str, str] = {}
+    succeeded = dict.fromkeys(OPERATION_KINDS, 0)
+    failed_items: list[dict[str, Any]] = []
+
+    def resolve(node_ref: str) -> str | None:
+        if node_ref.startswith(NEW_REF_PREFIX):
+            return refs.get(node_ref)
+        return node_ref
+
+    def record(kind: str, detail: dict[str, Any], result: Any) -> None:
+        if isinstance(result, APIRequestError):
+            failed_items.append({"op": kind, **detail, "message": str(result)})
+        else:
+            succeeded[kind] += 1
+
+    def skip(kind: str, detail: dict[str, Any]) -> None:
+        failed_items.append({"op": kind, **detail, "message": "依赖的新建资源创建失败, 已跳过"})
+
+    for depth in sorted({item["depth"] for item in operations["create"]}):
+        level = []
+        for item in operations["create"]:
+            if item["depth"] != depth:
+                continue
+            parent = resolve(item["parent_id"])
+            if parent is None:
+                skip("create", {"path": item["path"]})
+            else:
+                level.append((item, parent))
+        results = _run_concurrently(
+            [
+                lambda item=item, parent=parent: _add_resource(
+                    group_id, ResourceType(item["type"]), parent, item["name"]
+                )
+                for item, parent in level
+            ]
+        )
+        for (item, _), result in zip(level, results, strict=True):
+            record("create", {"path": item["path"]}, result)
+            if not isinstance(result, APIRequestError):
+                refs[item["ref"]] = str(result["id"])
+
+    calls = [
+        (
+            "rename",
+            {"path": item["path"]},
+            lambda item=item: _rename_node(group_id, item["node_id"], item["name"]),
+        )
+        for item in operations["rename"]
+    ]
+    for item in operations["move"]:
+        target = resolve(item["parent_id"])
+        if target is None:
+            skip("move", {"node_ids": item["node_ids"]})
+            continue
+        calls.append(
+            (
+                "move",
+                {"node_ids": item["node_ids"]},
+                lambda item=item, target=target: _move_nodes(
+                    group_id, item["node_ids"], item["from_parent_id"], target
+                ),
+            )
+        )
+    results = _run_concurrently([call for _, _, call in calls])
+    moved: set[str] = set()
+    for (kind, detail, _), result in zip(calls, results, strict=True):
+        record(kind, detail, result)
+        if kind == "move" and not isinstance(result, APIRequestError):
+            moved.update(detail["node_ids"])
+
+    for kind, key, poster in (
+        ("visibility", "pub", _post_visibility),
+        ("download", "download", _post_download),
+    ):
+        for item in operations[kind]:
+            node_ids = []
+            for node_ref in item["node_ids"]:
+                node_id = resolve(node_ref)
+                if node_id is None:
+                    skip(kind, {"node_id": node_ref})
+                else:
+                    node_ids.append(node_id)
+            value = (VisibilityType if kind == "visibility" else DownloadType)(item[key])
+            success_ids, failed = _run_batch_resource_update(
+                node_ids=node_ids,
+                request_builder=lambda node_id, value=value, poster=poster: poster(
+                    group_id, node_id, value
+                ),
+            )
+            succeeded[kind] += len(success_ids)
+            failed_items.extend({"op": kind, **entry} for entry in failed)
+
+    sorts = []
+    for item in operations["sort"]:
+        parent = resolve(item["parent_id"])
+        order = [resolve(node_ref) for node_ref in item["order"]]
+        order = [node_id for node_id in order if node_id is not None]
+        if parent is None:
+            skip("sort", {"path": item["path"]})
+        elif len(order) > 1:
+            sorts.append((item, order))
+    results = _run_concurrently(
+        [lambda order=order: _sort_nodes(group_id, order) for _, order in sorts]
+    )
+    for (item, _), result in zip(sorts, results, strict=True):
+        record("sort", {"path": item["path"]}, result)
+
+    deletes = []
+    for item in operations["delete"]:
+        stranded = [node_id for node_id in item["moved_out_ids"] if node_id not in moved]
+        if stranded:
+            failed_items.append(
+                {
+                    "op": "delete",
+                    "node_id": item["node_id"],
+                    "path": item["path"],
+                    "message": f"子资源未能移出, 已跳过删除: {', '.join(stranded)}",
+                }
+            )
+        else:
+            deletes.append(item)
+    results = _run_concurrently(
+        [lambda item=item: _delete_node(group_id, item["node_id"]) for item in deletes]
+    )
+    for item, result in zip(deletes, results, strict=True):
+        record("delete", {"node_id": item["node_id"], "path": item["path"]}, result)
+    return succeeded, failed_items
+
+
+@MCP.tool()
+def apply_resource_layout(
+    group_id: Annotated[str, Field(description=desc.GROUP_ID_DESC)],
+    parent_id: Annotated[str, Field(description=desc.PARENT_ID_DESC)],
+    layout: Annotated[list[ResourceLayoutNode], Field(description=desc.RESOURCE_LAYOUT_DESC)],
+    dry_run: Annotated[bool, Field(description=desc.DRY_RUN_DESC)] = True,
+    delete_missing: Annotated[bool, Field(description=desc.DELETE_MISSING_DESC)] = False,
+) -> dict:
+    """声明期望的课程资源布局, 计算并执行与当前资源树的最小差异。
+
+    操作包括创建、改名、移动、排序、可见性/下载权限切换和删除; 移动按(原父, 新父)
+    合并为一次请求。默认 dry_run=true 只返回计划与预计请求数, 确认后再以
+    dry_run=false 执行; 执行时同一阶段的请求并发发送。
+    """
+    try:
+        plan = plan_resource_layout(
+            _load_course_resource_index(group_id),
+            group_id,
+            parent_id,
+            layout,
+            delete_missing=delete_missing,
+        )
+        if dry_run:
+            return ResponseUtil.success(
+                {"dry_run": True, **plan},
+                f"布局计划生成成功: 预计{plan['request_count']}个请求",
+            )
+
+        succeeded, failed_items = _apply_plan(group_id, plan)
+        success_count = sum(succeeded.values())
+        data = {
+            "dry_run": False,
+            **plan,
+            "success_counts": succeeded,
+            "failed_count": len(failed_items),
+            "partial_success": bool(success_count and failed_items),
+            "failed_items": failed_items,
+        }
+        message = f"布局应用完成:成功{success_count}项,失败{len(failed_items)}项"
+        if failed_items:
+            return ResponseUtil.error(message, data=data)
+        return ResponseUtil.success(data, message)
+    except (APIRequestError, ValueError) as e:
+        return ResponseUtil.error("应用资源布局时发生异常", e)
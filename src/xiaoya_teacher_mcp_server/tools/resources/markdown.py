@@ -0,0 +1,417 @@
+"""markitdown 转换器复用与按内容哈希落盘的 Markdown 缓存。"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+import uuid
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import suppress
+from contextvars import copy_context
+from importlib.metadata import PackageNotFoundError, version
+from multiprocessing.connection import Connection
+from pathlib import Path
+from threading import BoundedSemaphore, Lock
+from typing import Any
+from urllib.parse import quote
+
+import requests
+from markitdown import MarkItDown
+
+from ...utils.client import APIRequestError
+from ...utils.download import (
+    ResponseOpener,
+    file_sha256,
+    partial_path,
+    stream_to_file,
+    validator_path,
+)
+from .outline import build_outline
+
+MARKDOWN_CACHE_SCHEMA = 1
+CONVERSION_WORKERS = os.cpu_count() or 1
+
+_CONVERTER: MarkItDown | None = None
+_CONVERTER_LOCK = Lock()
+_DEFAULT_CACHE: MarkdownCache | None = None
+# 所有批次共用的转换槽位与空闲子进程, 同时运行的转换不超过 CPU 核数
+_CONVERSION_SLOTS = BoundedSemaphore(CONVERSION_WORKERS)
+_IDLE_WORKERS: list[ConversionWorker] = []
+_IDLE_WORKERS_LOCK = Lock()
+
+
+def converter_version() -> str:
+    try:
+        markitdown_version = version("markitdown")
+    except PackageNotFoundError:
+        markitdown_version = "unknown"
+    return f"markitdown-{markitdown_version}-v{MARKDOWN_CACHE_SCHEMA}"
+
+
+def get_converter() -> MarkItDown:
+    """进程内共享一个 MarkItDown 实例, 避免每次调用重新注册全部转换器。"""
+    global _CONVERTER
+    with _CONVERTER_LOCK:
+        if _CONVERTER is None:
+            _CONVERTER = MarkItDown()
+        return _CONVERTER
+
+
+def _safe_name(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", value).strip("._") or "item"
+
+
+class MarkdownCache:
+    """以 <转换器版本>/<sha256>.md 存放转换结果; 课程资源另存 paper_id+filename 到哈希的引用。"""
+
+    def __init__(self, root: Path, converter: str | None = None):
+        self.dir = root / _safe_name(converter or converter_version())
+
+    def _entry(self, content_hash: str) -> Path:
+        return self.dir / f"{content_hash}.md"
+
+    def entry_path(self, content_hash: str) -> Path:
+        return self._entry(content_hash)
+
+    def _ref(self, ref_key: str) -> Path:
+        return self.dir / "refs" / hashlib.sha256(ref_key.encode("utf-8")).hexdigest()
+
+    def get(self, content_hash: str) -> str | None:
+        try:
+            return self._entry(content_hash).read_bytes().decode("utf-8")
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def put(self, content_hash: str, text: str) -> None:
+        _atomic_write(self._entry(content_hash), text)
+
+    def resolve(self, ref_key: str) -> str | None:
+        try:
+            content_hash = self._ref(ref_key).read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+        return content_hash if self._entry(content_hash).exists() else None
+
+    def link(self, ref_key: str, content_hash: str) -> None:
+        _atomic_write(self._ref(ref_key), content_hash)
+
+    def outline(self, content_hash: str) -> dict[str, Any]:
+        """分页与标题偏移只在首次分段读取时计算一次, 存为同名 .outline.json。"""
+        outline_path = self.dir / f"{content_hash}.outline.json"
+        try:
+            return json.loads(outline_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            pass
+        outline = build_outline(self._entry(content_hash).read_bytes().decode("utf-8"))
+        _atomic_write(outline_path, json.dumps(outline, ensure_ascii=False))
+        return outline
+
+    def download_path(self, ref_key: str, filename: str) -> Path:
+        """文件名主体由引用哈希代替(中文等字符不会丢失区分度), 扩展名单独保留供转换器识别格式。
+
+        每次调用附加随机后缀, 并发下载同一资源时各写各的临时文件, 不会互相覆盖或删除。
+        """
+        digest = hashlib.sha256(ref_key.encode("utf-8")).hexdigest()[:16]
+        suffix = quote(Path(filename).suffix, safe="")
+        return self.dir / "downloads" / f"{digest}-{uuid.uuid4().hex[:12]}{suffix}"
+
+
+def _discard_scratch(path: Path) -> None:
+    """临时下载文件名每次不同, 失败时残留的 .part 也不会再被续传, 一并删除。"""
+    for leftover in (path, partial_path(path), validator_path(path)):
+        with suppress(OSError):
+            leftover.unlink(missing_ok=True)
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    """按 UTF-8 字节原样写入, 不做换行转换: 大纲里的字节偏移必须与磁盘文件一致。"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    temp.write_bytes(text.encode("utf-8"))
+    os.replace(temp, path)
+
+
+def default_markdown_cache() -> MarkdownCache:
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        _DEFAULT_CACHE = MarkdownCache(
+            Path(tempfile.gettempdir()) / "xiaoya-teacher-mcp-server" / "markdown-cache"
+        )
+    return _DEFAULT_CACHE
+
+
+def _convert_cached(
+    file_path: Path, content_hash: str, cache: MarkdownCache, with_content: bool
+) -> dict[str, Any]:
+    result = {"sha256": content_hash, "cached": cache.entry_path(content_hash).exists()}
+    if not result["cached"]:
+        content = get_converter().convert(file_path).text_content
+        cache.put(content_hash, content)
+        if with_content:
+            result["content"] = content
+    elif with_content:
+        result["content"] = cache.get(content_hash)
+    return result
+
+
+def convert_local_file(
+    file_path: Path, cache: MarkdownCache, *, with_content: bool = True
+) -> dict[str, Any]:
+    return _convert_cached(file_path, file_sha256(file_path), cache, with_content)
+
+
+def convert_remote_file(
+    paper_id: str,
+    filename: str,
+    open_response: ResponseOpener,
+    cache: MarkdownCache,
+    *,
+    with_content: bool = True,
+) -> dict[str, Any]:
+    """课程资源按 paper_id+filename 命中引用时既不下载也不转换。
+
+    小雅文件资源的 paper_id 指向一次上传的文件内容, 重新上传会生成新的 paper_id,
+    因此引用可以长期复用; 内容相同的不同资源仍通过内容哈希共享同一份转换结果。
+    """
+    ref_key = f"{paper_id}\n{filename}"
+    content_hash = cache.resolve(ref_key)
+    if content_hash is not None:
+        result = {"sha256": content_hash, "cached": True}
+        if with_content:
+            result["content"] = cache.get(content_hash)
+        return result
+
+    download_path = cache.download_path(ref_key, filename)
+    try:
+        downloaded = stream_to_file(open_response, download_path)
+        result = _convert_cached(download_path, downloaded["sha256"], cache, with_content)
+    finally:
+        _discard_scratch(download_path)
+    cache.link(ref_key, result["sha256"])
+    return result
+
+
+def convert_path_to_markdown(file_path: str) -> str:
+    """转换子进程入口: 子进程内复用各自的转换器实例。"""
+    return get_converter().convert(Path(file_path)).text_content
+
+
+class ConversionError(RuntimeError):
+    """单个文件转换失败; 只记为该文件失败, 不影响同批其他文件。"""
+
+
+class ConversionTimeout(ConversionError):
+    pass
+
+
+def _conversion_worker_main(connection: Connection) -> None:
+    while True:
+        try:
+            file_path = connection.recv()
+        except EOFError:
+            return
+        try:
+            connection.send(("ok", convert_path_to_markdown(file_path)))
+        except Exception as exc:  # 子进程内的任意转换异常只回报给该文件
+            connection.send(("error", f"{type(exc).__name__}: {exc}"))
+
+
+class ConversionWorker:
+    """常驻的转换子进程, 经管道逐个接收文件路径; 用 spawn 避免 fork 带走服务端线程状态。"""
+
+    def __init__(self):
+        context = multiprocessing.get_context("spawn")
+        self._connection, child = context.Pipe()
+        self._process = context.Process(target=_conversion_worker_main, args=(child,), daemon=True)
+        self._process.start()
+        child.close()
+
+    def send(self, file_path: str) -> None:
+        self._connection.send(file_path)
+
+    def wait(self, timeout: float) -> bool:
+        return self._connection.poll(timeout)
+
+    def receive(self) -> tuple[str, str]:
+        return self._connection.recv()
+
+    def kill(self) -> None:
+        self._process.kill()
+        self._process.join(1)
+        self._connection.close()
+
+
+def convert_in_worker(file_path: str, timeout: float) -> str:
+    """占用一个转换槽位, 在空闲子进程中转换单个文件。
+
+    超时从子进程收到文件时开始计; 超时或子进程意外退出时只终止这一个子进程,
+    其他批次正在使用的子进程不受影响, 下次需要时再补建。
+    """
+    with _CONVERSION_SLOTS:
+        with _IDLE_WORKERS_LOCK:
+            worker = _IDLE_WORKERS.pop() if _IDLE_WORKERS else None
+        if worker is None:
+            worker = ConversionWorker()
+        try:
+            worker.send(file_path)
+            finished = worker.wait(timeout)
+            outcome = worker.receive() if finished else None
+        except (EOFError, OSError) as exc:
+            worker.kill()
+            raise ConversionError("转换子进程意外退出") from exc
+        if outcome is None:
+            worker.kill()
+            raise ConversionTimeout(f"转换超时(超过 {timeout:g} 秒)")
+        with _IDLE_WORKERS_LOCK:
+            _IDLE_WORKERS.append(worker)
+    status, payload = outcome
+    if status != "ok":
+        raise ConversionError(payload)
+    return payload
+
+
+def _source_label(source: dict[str, Any]) -> dict[str, Any]:
+    if source.get("file_path"):
+        return {"file_path": source["file_path"]}
+    return {"paper_id": source["paper_id"], "filename": source["filename"]}
+
+
+def batch_convert(
+    sources: list[dict[str, Any]],
+    cache: MarkdownCache,
+    open_remote: Callable[[str, str, int, str | None], requests.Response],
+    *,
+    timeout: float,
+    download_workers: int,
+) -> list[dict[str, Any]]:
+    """批量转换: 课程资源下载与已下载文件的子进程转换并行推进, 单文件超时不拖住整批。
+
+    返回与 sources 等长、顺序一致的结果列表, 每项带 success 标记。
+    """
+    results: list[dict[str, Any] | None] = [None] * len(sources)
+    # 同一内容只转换一次: 内容哈希 -> 等待结果的序号、课程资源引用和临时文件
+    jobs: dict[str, dict[str, list]] = {}
+    conversions: dict[Future, str] = {}
+
+    def fail(indices: list[int], message: str) -> None:
+        for index in indices:
+            results[index] = {
+                **_source_label(sources[index]),
+                "success": False,
+                "message": message,
+            }
+
+    def succeed(indices: list[int], content: str, content_hash: str, cached: bool) -> None:
+        for index in indices:
+            results[index] = {
+                **_source_label(sources[index]),
+                "success": True,
+                "content": content,
+                "sha256": content_hash,
+                "cached": cached,
+            }
+
+    def convert_or_hit(
+        indices: list[int],
+        path: Path,
+        content_hash: str,
+        scratch: Path | None,
+        ref_key: str | None,
+    ) -> None:
+        job = jobs.get(content_hash)
+        cached = cache.get(content_hash) if job is None else None
+        if job is None and cached is None:
+            jobs[content_hash] = job = {"indices": [], "refs": [], "scratch": []}
+            conversions[converter.submit(convert_in_worker, str(path), timeout)] = content_hash
+            if scratch:
+                job["scratch"].append(scratch)
+        elif scratch:
+            _discard_scratch(scratch)
+        if job is not None:
+            job["indices"].extend(indices)
+            if ref_key:
+                job["refs"].append(ref_key)
+            return
+        if ref_key:
+            cache.link(ref_key, content_hash)
+        succeed(indices, cached, content_hash, True)
+
+    def convert_or_fail(
+        indices: list[int], path: Path, content_hash: str, scratch: Path | None, ref_key: str | None
+    ) -> None:
+        """缓存读写的 OSError 只记为这些位置失败, 不中断整批。"""
+        try:
+            convert_or_hit(indices, path, content_hash, scratch, ref_key)
+        except OSError as exc:
+            fail(indices, str(exc))
+
+    with (
+        ThreadPoolExecutor(max_workers=max(1, download_workers)) as downloader,
+        ThreadPoolExecutor(max_workers=CONVERSION_WORKERS) as converter,
+    ):
+        # 同一 paper_id+filename 只下载一次, 结果分发给每个出现的位置
+        remote: dict[str, list[int]] = {}
+        for index, source in enumerate(sources):
+            if not source.get("file_path"):
+                remote.setdefault(f"{source['paper_id']}\n{source['filename']}", []).append(index)
+
+        downloads: dict[Future, tuple[list[int], Path, str]] = {}
+        for ref_key, indices in remote.items():
+            paper_id, filename = sources[indices[0]]["paper_id"], sources[indices[0]]["filename"]
+            content_hash = cache.resolve(ref_key)
+            if content_hash is not None:
+                succeed(indices, cache.get(content_hash), content_hash, True)
+                continue
+            scratch = cache.download_path(ref_key, filename)
+            ctx = copy_context()
+            future = downloader.submit(
+                ctx.run,
+                stream_to_file,
+                lambda offset, if_range, p=paper_id, f=filename: open_remote(
+                    p, f, offset, if_range
+                ),
+                scratch,
+            )
+            downloads[future] = (indices, scratch, ref_key)
+
+        for index, source in enumerate(sources):
+            if not source.get("file_path"):
+                continue
+            path = Path(source["file_path"])
+            try:
+                convert_or_hit([index], path, file_sha256(path), None, None)
+            except OSError as exc:
+                fail([index], str(exc))
+
+        for future in as_completed(downloads):
+            indices, scratch, ref_key = downloads[future]
+            try:
+                downloaded = future.result()
+            except (APIRequestError, OSError) as exc:
+                _discard_scratch(scratch)
+                fail(indices, str(exc))
+                continue
+            convert_or_fail(indices, scratch, downloaded["sha256"], scratch, ref_key)
+
+        for future in as_completed(conversions):
+            content_hash = conversions[future]
+            job = jobs[content_hash]
+            try:
+                content = future.result()
+                cache.put(content_hash, content)
+                for ref_key in job["refs"]:
+                    cache.link(ref_key, content_hash)
+            except (ConversionError, OSError) as exc:
+                fail(job["indices"], str(exc))
+            else:
+                succeed(job["indices"], content, content_hash, False)
+            for scratch in job["scratch"]:
+                _discard_scratch(scratch)
+
+    assert all(result is not None for result in results), "每个 source 都应有结果"
+    return results
@@ -0,0 +1,188 @@
+"""课程文件夹镜像到本地目录的规划、清单与并发下载。"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import tempfile
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+from pathlib import Path
+from typing import Any
+
+from ...types.resource_models import ResourceType
+from ...utils.client import APIRequestError
+from ...utils.logging import get_logger
+from .normalize import CourseResourceIndex
+
+LOGGER = get_logger("xiaoya_teacher_mcp_server.mirror")
+MANIFEST_NAME = ".xiaoya-mirror.json"
+MIRROR_FILE_TYPES = (ResourceType.FILE.value, ResourceType.VIDEO.value)
+
+MirrorDownloader = Callable[[dict[str, Any], Path], dict[str, Any]]
+
+
+def default_mirror_dir(group_id: str, folder_id: str) -> Path:
+    return (
+        Path(tempfile.gettempdir())
+        / "xiaoya-teacher-mcp-server"
+        / "mirrors"
+        / _safe_name(group_id)
+        / _safe_name(folder_id)
+    )
+
+
+def _safe_name(value: Any) -> str:
+    safe = re.sub(r'[\\/:*?"<>|\x00-\x1f]+', "_", str(value or "")).strip(" .")
+    return safe or "item"
+
+
+def _unique_name(name: str, resource_id: str, taken: set[str]) -> str:
+    if name not in taken:
+        return name
+    stem, dot, suffix = name.rpartition(".")
+    if not dot or not stem:
+        stem, suffix = name, ""
+    tag = _safe_name(resource_id)[:8]
+    return f"{stem}_{tag}.{suffix}" if suffix else f"{stem}_{tag}"
+
+
+def plan_folder_mirror(index: CourseResourceIndex, folder_id: str) -> list[dict[str, Any]]:
+    """展开 folder_id 下的子树, 为每个可下载文件算出相对于镜像根目录的路径。"""
+    entries: list[dict[str, Any]] = []
+    pending: list[tuple[str, Path]] = [(str(folder_id), Path())]
+    visited: set[str] = set()
+    while pending:
+        parent_id, relative_dir = pending.pop()
+        if parent_id in visited:
+            continue
+        visited.add(parent_id)
+        taken: set[str] = set()
+        for child_id in index.children_by_parent.get(parent_id, []):
+            item = index.by_id[child_id]
+            name = _unique_name(_safe_name(item.get("name")), child_id, taken)
+            if item.get("type") == ResourceType.FOLDER.value:
+                taken.add(name)
+                pending.append((child_id, relative_dir / name))
+            elif item.get("type") in MIRROR_FILE_TYPES and item.get("quote_id"):
+                taken.add(name)
+                entries.append(
+                    {
+                        "id": child_id,
+                        "paper_id": item["quote_id"],
+                        "filename": item.get("name") or name,
+                        "relative_path": (relative_dir / name).as_posix(),
+                        "updated_at": item.get("updated_at"),
+                    }
+                )
+    entries.sort(key=lambda entry: entry["relative_path"])
+    return entries
+
+
+def load_manifest(target_dir: Path) -> dict[str, dict[str, Any]]:
+    try:
+        data = json.loads((target_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data.get("files", {}) if isinstance(data, dict) else {}
+
+
+def save_manifest(target_dir: Path, files: dict[str, dict[str, Any]]) -> None:
+    manifest = target_dir / MANIFEST_NAME
+    temp = manifest.with_name(manifest.name + ".tmp")
+    temp.write_text(json.dumps({"files": files}, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(temp, manifest)
+
+
+def _is_unchanged(entry: dict[str, Any], record: dict[str, Any] | None, target_dir: Path) -> bool:
+    if not record or record.get("updated_at") != entry["updated_at"]:
+        return False
+    if record.get("relative_path") != entry["relative_path"]:
+        return False
+    local = target_dir / entry["relative_path"]
+    return local.is_file() and local.stat().st_size == record.get("size")
+
+
+def mirror_folder_files(
+    entries: list[dict[str, Any]],
+    target_dir: Path,
+    max_workers: int,
+    downloader: MirrorDownloader,
+) -> dict[str, Any]:
+    """按清单跳过未变化的文件, 其余用有界线程池并发下载, 汇总进度与吞吐。"""
+    target_dir.mkdir(parents=True, exist_ok=True)
+    previous = load_manifest(target_dir)
+    records: dict[str, dict[str, Any]] = {}
+    skipped: list[str] = []
+    pending: list[dict[str, Any]] = []
+    for entry in entries:
+        if _is_unchanged(entry, previous.get(entry["id"]), target_dir):
+            records[entry["id"]] = previous[entry["id"]]
+            skipped.append(entry["relative_path"])
+        else:
+            pending.append(entry)
+
+    downloaded: list[dict[str, Any]] = []
+    failed_items: list[dict[str, Any]] = []
+    total_bytes = 0
+    started = time.perf_counter()
+    if pending:
+        workers = max(1, min(max_workers, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for entry in pending:
+                ctx = copy_context()
+                future = executor.submit(
+                    ctx.run, downloader, entry, target_dir / entry["relative_path"]
+                )
+                futures[future] = entry
+            for done, future in enumerate(as_completed(futures), start=1):
+                entry = futures[future]
+                try:
+                    result = future.result()
+                except (APIRequestError, OSError) as exc:
+                    failed_items.append(
+                        {
+                            "id": entry["id"],
+                            "relative_path": entry["relative_path"],
+                            "message": str(exc),
+                        }
+                    )
+                else:
+                    total_bytes += result["size"]
+                    records[entry["id"]] = {
+                        "relative_path": entry["relative_path"],
+                        "updated_at": entry["updated_at"],
+                        "size": result["size"],
+                        "sha256": result["sha256"],
+                    }
+                    downloaded.append(
+                        {"relative_path": entry["relative_path"], "size": result["size"]}
+                    )
+                LOGGER.info("文件夹镜像进度 %s/%s: %s", done, len(pending), entry["relative_path"])
+    elapsed = time.perf_counter() - started
+
+    # 下载失败时本地旧文件未被改动(写入的是 .part), 沿用旧记录, 下次按 updated_at 重新比对
+    for entry in failed_items:
+        if entry["id"] in previous:
+            records[entry["id"]] = previous[entry["id"]]
+    save_manifest(target_dir, records)
+
+    downloaded.sort(key=lambda item: item["relative_path"])
+    failed_items.sort(key=lambda item: item["relative_path"])
+    return {
+        "target_dir": str(target_dir),
+        "total_count": len(entries),
+        "downloaded_count": len(downloaded),
+        "skipped_count": len(skipped),
+        "failed_count": len(failed_items),
+        "downloaded_bytes": total_bytes,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_bytes_per_second": int(total_bytes / elapsed) if elapsed > 0 else total_bytes,
+        "downloaded": downloaded,
+        "skipped": skipped,
+        "failed_items": failed_items,
+    }
@@ -0,0 +1,124 @@
+"""课程资源本地镜像库: 元数据存 SQLite, 文件按课程目录结构存放。"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from ...utils.client import APIRequestError
+from .mirror import _safe_name
+
+MIRROR_DIR_ENV = "XIAOYA_MIRROR_DIR"
+OFFLINE_ENV = "XIAOYA_OFFLINE"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resources (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    updated_at TEXT,
+    raw TEXT NOT NULL,
+    data TEXT NOT NULL,
+    file_path TEXT,
+    sha256 TEXT,
+    size INTEGER
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def offline_mode() -> bool:
+    return os.getenv(OFFLINE_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def mirror_root() -> Path:
+    configured = os.getenv(MIRROR_DIR_ENV)
+    if configured:
+        return Path(configured)
+    return Path(tempfile.gettempdir()) / "xiaoya-teacher-mcp-server" / "sync"
+
+
+class ResourceMirrorDB:
+    """单个课程组的镜像库; 每次同步在一个事务内整体替换, 读者不会看到半同步状态。"""
+
+    def __init__(self, group_id: str, root: Path | None = None):
+        self.dir = (root or mirror_root()) / _safe_name(group_id)
+        self.files_dir = self.dir / "files"
+        self.db_path = self.dir / "mirror.sqlite3"
+
+    def _connect(self) -> sqlite3.Connection:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.db_path)
+        connection.row_factory = sqlite3.Row
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def exists(self) -> bool:
+        return self.db_path.exists()
+
+    def rows(self) -> dict[str, dict[str, Any]]:
+        with closing(self._connect()) as connection:
+            return {
+                row["id"]: {
+                    "updated_at": row["updated_at"],
+                    "data": json.loads(row["data"]),
+                    "file_path": row["file_path"],
+                    "sha256": row["sha256"],
+                    "size": row["size"],
+                }
+                for row in connection.execute("SELECT * FROM resources")
+            }
+
+    def raw_items(self) -> list[dict[str, Any]]:
+        with closing(self._connect()) as connection:
+            return [
+                json.loads(row["raw"])
+                for row in connection.execute("SELECT raw FROM resources ORDER BY position")
+            ]
+
+    def last_synced_at(self) -> str | None:
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT value FROM sync_state WHERE key = 'last_synced_at'"
+            ).fetchone()
+            return row["value"] if row else None
+
+    def replace(self, records: list[dict[str, Any]]) -> str:
+        synced_at = datetime.now(UTC).isoformat(timespec="seconds")
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM resources")
+            connection.executemany(
+                "INSERT INTO resources (id, position, updated_at, raw, data, file_path, sha256, size)"
+                " VALUES (:id, :position, :updated_at, :raw, :data, :file_path, :sha256, :size)",
+                [
+                    {
+                        **record,
+                        "raw": json.dumps(record["raw"], ensure_ascii=False),
+                        "data": json.dumps(record["data"], ensure_ascii=False, sort_keys=True),
+                    }
+                    for record in records
+                ],
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO sync_state (key, value) VALUES ('last_synced_at', ?)",
+                (synced_at,),
+            )
+        return synced_at
+
+
+def load_mirrored_resources(group_id: str) -> list[dict[str, Any]]:
+    """离线模式下代替 queryCourseResources/v2 返回镜像中的原始资源列表。"""
+    mirror = ResourceMirrorDB(group_id)
+    if not mirror.exists() or mirror.last_synced_at() is None:
+        raise APIRequestError(
+            f"离线模式下没有课程组 {group_id} 的本地镜像, 请先在线调用 sync_course_resources"
+        )
+    return mirror.raw_items()
@@ -71,54 +71,106 @@ def _is_folder_resource(resource: dict[str, Any]) -> bool:
     return resource_type in (ResourceType.FOLDER.value, ResourceType.get(ResourceType.FOLDER.value))
 
 
-def build_file_path(resource_id: str, resource_map: dict[str, dict[str, Any]]) -> str:
-    path = []
-    current = resource_map.get(resource_id)
-    while current:
-        path.append(current["name"])
-        current = resource_map.get(current.get("parent_id"))
-    return "/".join(reversed([part for part in path if part]))
+def _sort_position(item: dict[str, Any]) -> int:
+    return item.get("sort_position") or 0
+
+
+class CourseResourceIndex:
+    """课程资源内存索引: 每份接口数据构建一次, 父子/路径/类型查询不再全量扫描。"""
+
+    def __init__(self, items: list[dict[str, Any]]):
+        self.items = [item for item in items if "id" in item]
+        self.by_id: dict[str, dict[str, Any]] = {item["id"]: item for item in self.items}
+        # 稳定排序: sort_position 相同时保持接口返回顺序
+        self.sorted_ids: list[str] = [item["id"] for item in sorted(self.items, key=_sort_position)]
+        self.children_by_parent: dict[str | None, list[str]] = {}
+        self.by_type: dict[Any, list[str]] = {}
+        for resource_id in self.sorted_ids:
+            item = self.by_id[resource_id]
+            self.children_by_parent.setdefault(item.get("parent_id"), []).append(resource_id)
+            self.by_type.setdefault(item.get("type"), []).append(resource_id)
+        self.root_ids: list[str] = [
+            resource_id
+            for resource_id in self.sorted_ids
+            if self.by_id[resource_id].get("parent_id") not in self.by_id
+        ]
+        self._paths: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def __contains__(self, resource_id: object) -> bool:
+        return resource_id in self.by_id
+
+    def file_path(self, resource_id: str) -> str:
+        """沿父链向上直到命中已缓存的祖先, 整条链路只计算一次。"""
+        if resource_id in self._paths or resource_id not in self.by_id:
+            return self._paths.get(resource_id, "")
+
+        chain: list[str] = []
+        visited: set[str] = set()
+        current = resource_id
+        while current in self.by_id and current not in self._paths and current not in visited:
+            chain.append(current)
+            visited.add(current)
+            current = self.by_id[current].get("parent_id")
+
+        path = self._paths.get(current, "")
+        for node_id in reversed(chain):
+            name = self.by_id[node_id].get("name")
+            path = f"{path}/{name}" if path and name else (name or path)
+            self._paths[node_id] = path
+        return path
+
+    def get(self, resource_id: str, detail_level: str = "full") -> dict[str, Any] | None:
+        item = self.by_id.get(resource_id)
+        if item is None:
+            return None
+        resource = normalize_resource_item(item, detail_level=detail_level)
+        if detail_level == "full":
+            resource["file_path"] = self.file_path(resource_id)
+        return resource
+
+    def children(self, parent_id: str | None, detail_level: str = "full") -> list[dict[str, Any]]:
+        return [
+            self.get(child_id, detail_level)
+            for child_id in self.children_by_parent.get(parent_id, [])
+        ]
+
+    def of_type(self, resource_type: int, detail_level: str = "full") -> list[dict[str, Any]]:
+        return [
+            self.get(resource_id, detail_level)
+            for resource_id in self.by_type.get(int(resource_type), [])
+        ]
+
+    def resource_map(self, detail_level: str = "full") -> dict[str, dict[str, Any]]:
+        return {item["id"]: self.get(item["id"], detail_level) for item in self.items}
+
+    def flat(self, detail_level: str = "summary") -> list[dict[str, Any]]:
+        return [self.get(resource_id, detail_level) for resource_id in self.sorted_ids]
+
+    def tree(self, detail_level: str = "summary") -> list[dict[str, Any]]:
+        nodes = {
+            resource_id: self.get(resource_id, detail_level) for resource_id in self.sorted_ids
+        }
+        if detail_level != "raw":
+            for resource_id, node in nodes.items():
+                if _is_folder_resource(self.by_id[resource_id]):
+                    node["children"] = []
+            for resource_id in self.sorted_ids:
+                parent = nodes.get(self.by_id[resource_id].get("parent_id"))
+                if parent is not None and "children" in parent:
+                    parent["children"].append(nodes[resource_id])
+        return [nodes[resource_id] for resource_id in self.root_ids]
 
 
 def build_resource_map(
     items: list[dict[str, Any]], detail_level: str = "full"
 ) -> dict[str, dict[str, Any]]:
-    resource_map = {
-        normalized["id"]: normalized
-        for normalized in (
-            normalize_resource_item(item, detail_level=detail_level) for item in items
-        )
-    }
-
-    if detail_level == "full":
-        for resource in resource_map.values():
-            resource["file_path"] = build_file_path(resource["id"], resource_map)
-    return resource_map
+    return CourseResourceIndex(items).resource_map(detail_level)
 
 
 def build_resource_tree(
     items: list[dict[str, Any]], detail_level: str = "summary"
 ) -> list[dict[str, Any]]:
-    id_to_sort_position = {item["id"]: item["sort_position"] for item in items}
-    item_ids = set(id_to_sort_position)
-    resource_list = [normalize_resource_item(item, detail_level) for item in items]
-
-    if detail_level != "raw":
-        for resource in resource_list:
-            if _is_folder_resource(resource):
-                resource["children"] = []
-
-    resource_list.sort(key=lambda resource: id_to_sort_position[resource["id"]])
-    id_to_resource = {resource["id"]: resource for resource in resource_list}
-
-    for item in items:
-        parent_id = item.get("parent_id")
-        parent = id_to_resource.get(parent_id)
-        if parent and "children" in parent:
-            parent["children"].append(id_to_resource[item["id"]])
-
-    return [
-        resource
-        for resource_id, resource in id_to_resource.items()
-        if resource_id in item_ids and resource.get("parent_id") not in item_ids
-    ]
+    return CourseResourceIndex(items).tree(detail_level)
@@ -0,0 +1,140 @@
+"""大文档 Markdown 的分页、标题大纲与按字节区间读取。"""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Any
+
+HEADING_RE = re.compile(r"^(#{1,6})[ \t]+(.+?)[ \t#]*$")
+FENCE_RE = re.compile(r"^[ \t]*(```|~~~)")
+SLIDE_RE = re.compile(r"^<!-- Slide number: \d+ -->$")
+PAGE_BREAK = "\f"
+
+
+def build_outline(text: str) -> dict[str, Any]:
+    """单遍扫描得到分页起点与标题偏移, 偏移均为 UTF-8 字节位置。
+
+    分页标记: PDF 转换结果中的换页符, PPTX 转换结果中的幻灯片注释; 都没有时整篇算一页。
+    """
+    pages = [0]
+    page_has_text = False
+    headings: list[dict[str, Any]] = []
+    in_fence = False
+    offset = 0
+
+    def start_page(position: int) -> None:
+        nonlocal page_has_text
+        if page_has_text:
+            pages.append(position)
+        else:
+            pages[-1] = position
+        page_has_text = False
+
+    for line in text.splitlines(keepends=True):
+        stripped = line.strip()
+        if SLIDE_RE.match(stripped):
+            start_page(offset)
+        elif PAGE_BREAK in line:
+            position = offset
+            for segment in line.split(PAGE_BREAK)[:-1]:
+                position += len(segment.encode("utf-8")) + 1
+                page_has_text = page_has_text or bool(segment.strip())
+                start_page(position)
+            page_has_text = bool(line.rsplit(PAGE_BREAK, 1)[1].strip())
+        else:
+            if FENCE_RE.match(line):
+                in_fence = not in_fence
+            elif not in_fence and (match := HEADING_RE.match(line.rstrip("\r\n"))):
+                headings.append(
+                    {
+                        "index": len(headings),
+                        "level": len(match.group(1)),
+                        "title": match.group(2),
+                        "offset": offset,
+                        "page": len(pages),
+                    }
+                )
+            page_has_text = page_has_text or bool(stripped)
+        offset += len(line.encode("utf-8"))
+
+    if not page_has_text and len(pages) > 1:
+        pages.pop()
+    for position, heading in enumerate(headings):
+        end = next(
+            (
+                later["offset"]
+                for later in headings[position + 1 :]
+                if later["level"] <= heading["level"]
+            ),
+            offset,
+        )
+        heading["length"] = end - heading["offset"]
+    return {"size": offset, "page_count": len(pages), "pages": pages, "headings": headings}
+
+
+def _char_boundary(handle: Any, position: int) -> int:
+    """向前退到 UTF-8 字符起点, 保证截取的字节区间能完整解码。"""
+    while position > 0:
+        handle.seek(position)
+        byte = handle.read(1)
+        if not byte or byte[0] & 0xC0 != 0x80:
+            break
+        position -= 1
+    return position
+
+
+def read_byte_range(path: Path, start: int, end: int) -> tuple[str, int, int]:
+    with path.open("rb") as handle:
+        start = _char_boundary(handle, start)
+        end = max(_char_boundary(handle, end), start)
+        handle.seek(start)
+        return handle.read(end - start).decode("utf-8"), start, end
+
+
+def read_markdown_view(
+    path: Path,
+    outline: dict[str, Any],
+    view: str,
+    *,
+    page: int | None = None,
+    section: int | None = None,
+    offset: int = 0,
+    length: int,
+) -> dict[str, Any]:
+    """按 outline/page/section/range 返回文档片段; 越界参数抛 ValueError。"""
+    size = outline["size"]
+    if view == "outline":
+        return {"size": size, "page_count": outline["page_count"], "outline": outline["headings"]}
+
+    if view == "page":
+        pages = outline["pages"]
+        if page is None or not 1 <= page <= len(pages):
+            raise ValueError(f"page 需在 1~{len(pages)} 之间")
+        start = pages[page - 1]
+        end = pages[page] if page < len(pages) else size
+        extra = {"page": page, "page_count": len(pages)}
+    elif view == "section":
+        headings = outline["headings"]
+        if section is None or not 0 <= section < len(headings):
+            raise ValueError(f"section 需在 0~{len(headings) - 1} 之间(先用 outline 视图查看)")
+        heading = headings[section]
+        start, end = heading["offset"], heading["offset"] + heading["length"]
+        extra = {"section": section, "title": heading["title"], "level": heading["level"]}
+    elif view == "range":
+        if offset >= size and size:
+            raise ValueError(f"offset 超出文档大小 {size}")
+        start, end = offset, min(offset + length, size)
+        extra = {}
+    else:
+        raise ValueError(f"不支持的视图: {view}")
+
+    content, start, end = read_byte_range(path, start, end)
+    return {
+        **extra,
+        "content": content,
+        "offset": start,
+        "length": end - start,
+        "size": size,
+        "next_offset": end if end < size else None,
+    }
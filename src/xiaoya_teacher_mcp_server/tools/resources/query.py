@@ -9,18 +9,33 @@ from typing import Annotated, Any
 from urllib.parse import quote
 
 import requests
-from markitdown import MarkItDown
 from pydantic import Field
 
 from ... import field_descriptions as desc
 from ...config import DOWNLOAD_URL, HEADERS, MAIN_URL, MCP
+from ...types.resource_models import MarkdownSource, ResourceType
 from ...utils.client import (
     APIRequestError,
     expect_success,
     get_json,
 )
+from ...utils.download import stream_to_file
 from ...utils.response import ResponseUtil
-from .normalize import build_resource_map, build_resource_tree
+from .markdown import (
+    batch_convert,
+    convert_local_file,
+    convert_remote_file,
+    default_markdown_cache,
+)
+from .mirror import default_mirror_dir, mirror_folder_files, plan_folder_mirror
+from .mirror_db import load_mirrored_resources, offline_mode
+from .normalize import CourseResourceIndex
+from .outline import read_markdown_view
+from .search import get_search_index
+
+FOLDER_DOWNLOAD_WORKERS = 4
+CONVERSION_TIMEOUT_SECONDS = 120.0
+MARKDOWN_RANGE_BYTES = 20_000
 
 
 def _fetch_course_resources_response(group_id: str) -> dict:
@@ -31,7 +46,10 @@ def _fetch_course_resources_response(group_id: str) -> dict:
     return response
 
 
-def _load_course_resources(group_id: str) -> list[dict]:
+def _load_course_resources(group_id: str, *, allow_offline: bool = False) -> list[dict]:
+    """allow_offline 只给只读的查询/搜索工具; 写操作据资源树做规划, 必须读线上最新数据。"""
+    if allow_offline and offline_mode():
+        return load_mirrored_resources(group_id)
     response = _fetch_course_resources_response(group_id)
     try:
         return expect_success(response)
@@ -39,14 +57,16 @@ def _load_course_resources(group_id: str) -> list[dict]:
         raise APIRequestError(f"查询课程资源失败: {exc}") from exc
 
 
+def _load_course_resource_index(
+    group_id: str, *, allow_offline: bool = False
+) -> CourseResourceIndex:
+    return CourseResourceIndex(_load_course_resources(group_id, allow_offline=allow_offline))
+
+
 def _load_course_resource_map(
     group_id: str, detail_level: str = "full"
 ) -> dict[str, dict[str, Any]]:
-    return build_resource_map(_load_course_resources(group_id), detail_level=detail_level)
-
-
-def _sort_position_map(items: list[dict]) -> dict[str, int]:
-    return {item["id"]: item.get("sort_position", 0) for item in items if "id" in item}
+    return _load_course_resource_index(group_id, allow_offline=True).resource_map(detail_level)
 
 
 def _get_download_url(paper_id: str, filename: str) -> str:
@@ -57,11 +77,23 @@ def _get_download_url(paper_id: str, filename: str) -> str:
         raise APIRequestError(f"获取文件下载链接失败 (文件名: {filename}): {exc}") from exc
 
 
-def _fetch_download_response(paper_id: str, filename: str, *, stream: bool = False):
+def _fetch_download_response(
+    paper_id: str,
+    filename: str,
+    *,
+    stream: bool = False,
+    range_start: int = 0,
+    if_range: str | None = None,
+):
+    headers = {"User-Agent": HEADERS["User-Agent"]}
+    if range_start > 0:
+        headers["Range"] = f"bytes={range_start}-"
+        if if_range:
+            headers["If-Range"] = if_range
     try:
         response = requests.get(
             _get_download_url(paper_id, filename),
-            headers={"User-Agent": HEADERS["User-Agent"]},
+            headers=headers,
             stream=stream,
             timeout=20,
         )
@@ -76,13 +108,28 @@ def _fetch_download_response(paper_id: str, filename: str, *, stream: bool = Fal
         raise APIRequestError(f"HTTP 请求失败: {exc.__class__.__name__}") from exc
 
 
-def _build_resource_summary_view(raw_data: list[dict[str, Any]], view_mode: str) -> Any:
+def _download_mirror_entry(entry: dict[str, Any], file_path: Path) -> dict[str, Any]:
+    return stream_to_file(
+        lambda offset, if_range: _fetch_download_response(
+            entry["paper_id"],
+            entry["filename"],
+            stream=True,
+            range_start=offset,
+            if_range=if_range,
+        ),
+        file_path,
+    )
+
+
+def _default_download_path(paper_id: str, filename: str) -> Path:
+    # 固定路径而非随机临时文件名, 中断后再次下载同一文件才能续传
+    return Path(tempfile.gettempdir()) / "xiaoya-teacher-mcp-server" / f"{paper_id}_{filename}"
+
+
+def _build_resource_summary_view(index: CourseResourceIndex, view_mode: str) -> Any:
     if view_mode == "flat":
-        sort_positions = _sort_position_map(raw_data)
-        flat_list = list(build_resource_map(raw_data, detail_level="summary").values())
-        flat_list.sort(key=lambda item: sort_positions.get(item["id"], 0))
-        return flat_list
-    return build_resource_tree(raw_data, detail_level="summary")
+        return index.flat(detail_level="summary")
+    return index.tree(detail_level="summary")
 
 
 def _query_course_resource_map(group_id: str, detail_level: str = "full") -> dict:
@@ -124,7 +171,9 @@ def query_resource_attributes(
 ) -> dict:
     """根据group_id和resource_id获取对应资源的属性"""
     try:
-        target = _load_course_resource_map(group_id, detail_level=detail_level).get(resource_id)
+        target = _load_course_resource_index(group_id, allow_offline=True).get(
+            resource_id, detail_level=detail_level
+        )
         if not target:
             return ResponseUtil.error(f"未找到id: {resource_id} 对应的课程资源")
         return ResponseUtil.success(target, f"查询成功: id={resource_id}")
@@ -142,19 +191,36 @@ def query_course_resources_summary(
 ) -> dict:
     """获取课程资源摘要(推荐 AI 默认使用)"""
     try:
-        raw_data = _load_course_resources(group_id)
-        summary_data = _build_resource_summary_view(raw_data, view_mode)
+        index = _load_course_resource_index(group_id, allow_offline=True)
+        summary_data = _build_resource_summary_view(index, view_mode)
         if view_mode == "flat":
             return ResponseUtil.success(
                 summary_data, f"课程资源(flat)查询成功, 共{len(summary_data)}项"
             )
-        return ResponseUtil.success(
-            summary_data, f"课程资源简要信息查询成功,共{len(raw_data)}项资源"
-        )
+        return ResponseUtil.success(summary_data, f"课程资源简要信息查询成功,共{len(index)}项资源")
     except (APIRequestError, ValueError) as e:
         return ResponseUtil.error("查询课程资源简要信息时发生异常", e)
 
 
+@MCP.tool()
+def search_course_resources(
+    group_id: Annotated[str, Field(description=desc.GROUP_ID_DESC)],
+    keyword: Annotated[str, Field(description=desc.RESOURCE_SEARCH_KEYWORD_DESC, min_length=1)],
+    type_val: Annotated[
+        ResourceType | None, Field(description=desc.RESOURCE_TYPE_FILTER_DESC)
+    ] = None,
+    limit: Annotated[int, Field(description=desc.SEARCH_LIMIT_DESC, ge=1, le=200)] = 20,
+) -> dict:
+    """按名称/路径搜索课程资源, 只返回命中节点及其路径(找资源时优先使用)"""
+    try:
+        search_index = get_search_index(group_id)
+        search_index.update(_load_course_resource_index(group_id, allow_offline=True))
+        matches = search_index.search(keyword, resource_type=type_val, limit=limit)
+        return ResponseUtil.success(matches, f"课程资源搜索完成,命中{len(matches)}项")
+    except (APIRequestError, ValueError) as e:
+        return ResponseUtil.error("搜索课程资源时发生异常", e)
+
+
 @MCP.tool()
 def query_group_order_setting(
     group_id: Annotated[str, Field(description=desc.GROUP_ID_DESC)],
@@ -179,12 +245,9 @@ def query_resource_folder_snapshot(
 ) -> dict:
     """查询指定文件夹下的直接子资源快照"""
     try:
-        children = [
-            resource
-            for resource in _load_course_resource_map(group_id, detail_level="full").values()
-            if resource.get("parent_id") == str(parent_id)
-        ]
-        children.sort(key=lambda item: item.get("sort_position", 0))
+        children = _load_course_resource_index(group_id, allow_offline=True).children(
+            str(parent_id)
+        )
         snapshot = [
             {
                 "id": item["id"],
@@ -225,32 +288,63 @@ def download_file(
     - save_path 传文件绝对路径：按该路径保存，自动创建不存在的父目录。
     - save_path 传已存在的目录：在目录下用原 filename 保存。
     - save_path 不传：保存到系统临时目录，文件名会带原 filename 后缀。
+    文件按固定大小分块流式写入 `<目标>.part`，完成后原子替换；中断后再次调用会用
+    HTTP Range 从已写入的位置续传。返回内容附带 sha256 与下载吞吐。
     """
     try:
-        download_response = _fetch_download_response(paper_id, filename, stream=True)
-
         if save_path:
-            file_path = os.path.join(save_path, filename) if os.path.isdir(save_path) else save_path
+            file_path = Path(save_path) / filename if os.path.isdir(save_path) else Path(save_path)
         else:
-            file_path = tempfile.NamedTemporaryFile(delete=False, suffix=f"_{filename}").name
-        parent = os.path.dirname(file_path)
-        if parent:
-            os.makedirs(parent, exist_ok=True)
-        with open(file_path, "wb") as handle:
-            handle.write(download_response.content)
+            file_path = _default_download_path(paper_id, filename)
 
+        result = stream_to_file(
+            lambda offset, if_range: _fetch_download_response(
+                paper_id, filename, stream=True, range_start=offset, if_range=if_range
+            ),
+            file_path,
+        )
         return ResponseUtil.success(
-            {
-                "filename": filename,
-                "file_path": file_path,
-                "content_type": download_response.headers.get("Content-Type", ""),
-            },
+            {"filename": filename, **result},
             f"文件下载成功: {file_path}",
         )
     except (APIRequestError, OSError) as e:
         return ResponseUtil.error("文件下载时发生异常", e)
 
 
+@MCP.tool()
+def download_resource_folder(
+    group_id: Annotated[str, Field(description=desc.GROUP_ID_DESC)],
+    folder_id: Annotated[str, Field(description=desc.MIRROR_FOLDER_ID_DESC)],
+    save_dir: Annotated[str | None, Field(description=desc.SAVE_DIR_DESC, default=None)] = None,
+    max_workers: Annotated[
+        int, Field(description=desc.DOWNLOAD_WORKERS_DESC, ge=1, le=16)
+    ] = FOLDER_DOWNLOAD_WORKERS,
+) -> dict:
+    """把课程文件夹子树按原目录结构镜像到本地。
+
+    文件/视频并发下载, 文件夹映射为本地子目录；目录下的 .xiaoya-mirror.json 记录
+    每个文件的 updated_at 与大小, 再次镜像时两者都未变化的文件直接跳过。
+    """
+    try:
+        index = _load_course_resource_index(group_id)
+        folder_id = str(folder_id)
+        if folder_id != str(group_id) and folder_id not in index:
+            return ResponseUtil.error(f"文件夹不存在: {folder_id}")
+
+        entries = plan_folder_mirror(index, folder_id)
+        target_dir = Path(save_dir) if save_dir else default_mirror_dir(group_id, folder_id)
+        data = mirror_folder_files(entries, target_dir, max_workers, _download_mirror_entry)
+        message = (
+            f"文件夹镜像完成: 下载{data['downloaded_count']}个, "
+            f"跳过{data['skipped_count']}个, 失败{data['failed_count']}个"
+        )
+        if data["failed_count"]:
+            return ResponseUtil.error(message, data=data)
+        return ResponseUtil.success(data, message)
+    except (APIRequestError, OSError) as e:
+        return ResponseUtil.error("文件夹镜像时发生异常", e)
+
+
 @MCP.tool()
 def read_file_by_markdown(
     paper_id: Annotated[
@@ -258,6 +352,20 @@ def read_file_by_markdown(
     ] = None,
     filename: Annotated[str | None, Field(description=desc.FILENAME_DESC, default=None)] = None,
     file_path: Annotated[str | None, Field(description=desc.FILE_PATH_DESC, default=None)] = None,
+    view: Annotated[
+        str,
+        Field(
+            description=desc.MARKDOWN_VIEW_DESC,
+            default="full",
+            pattern="^(full|outline|page|section|range)$",
+        ),
+    ] = "full",
+    page: Annotated[int | None, Field(description=desc.MARKDOWN_PAGE_DESC, ge=1)] = None,
+    section: Annotated[int | None, Field(description=desc.MARKDOWN_SECTION_DESC, ge=0)] = None,
+    offset: Annotated[int, Field(description=desc.MARKDOWN_OFFSET_DESC, ge=0)] = 0,
+    length: Annotated[
+        int, Field(description=desc.MARKDOWN_LENGTH_DESC, ge=256, le=1_000_000)
+    ] = MARKDOWN_RANGE_BYTES,
 ) -> dict:
     """用 markitdown 把文件内容读成 Markdown。
 
@@ -265,24 +373,86 @@ def read_file_by_markdown(
       - file_path：读本地文件。
       - paper_id + filename：读小雅课程资源（同时必填）。
     支持 docx/pptx/xlsx/pdf/html/图片 OCR 等常见格式。
+    转换结果按文件内容哈希与 markitdown 版本缓存在本地, 重复读取未变化的文件直接返回缓存。
+    大文档可先取 view=outline 查看标题与页数, 再按 page/section/range 分段读取。
     """
     try:
+        cache = default_markdown_cache()
+        with_content = view == "full"
         if file_path:
-            result = MarkItDown().convert(Path(file_path))
-            return ResponseUtil.success(
-                {"content": result.text_content},
-                f"本地文件转换为markdown成功: {file_path}",
+            result = convert_local_file(Path(file_path), cache, with_content=with_content)
+            message = f"本地文件转换为markdown成功: {file_path}"
+        elif paper_id and filename:
+            result = convert_remote_file(
+                paper_id,
+                filename,
+                lambda start, if_range: _fetch_download_response(
+                    paper_id, filename, stream=True, range_start=start, if_range=if_range
+                ),
+                cache,
+                with_content=with_content,
             )
-
-        if paper_id and filename:
-            result = MarkItDown().convert(
-                _fetch_download_response(paper_id, filename, stream=False)
-            )
-            return ResponseUtil.success(
-                {"content": result.text_content},
-                f"文件下载且转换为markdown成功: {filename}",
+            message = f"文件下载且转换为markdown成功: {filename}"
+        else:
+            return ResponseUtil.error("请提供file_path或者同时提供paper_id和filename")
+
+        if not with_content:
+            result.update(
+                read_markdown_view(
+                    cache.entry_path(result["sha256"]),
+                    cache.outline(result["sha256"]),
+                    view,
+                    page=page,
+                    section=section,
+                    offset=offset,
+                    length=length,
+                )
             )
-
-        return ResponseUtil.error("请提供file_path或者同时提供paper_id和filename")
+        return ResponseUtil.success(result, message)
     except (APIRequestError, OSError, ValueError) as e:
         return ResponseUtil.error("文件转换为markdown时发生异常", e)
+
+
+@MCP.tool()
+def batch_read_files_by_markdown(
+    sources: Annotated[
+        list[MarkdownSource], Field(description=desc.MARKDOWN_SOURCES_DESC, min_length=1)
+    ],
+    timeout_seconds: Annotated[
+        float, Field(description=desc.CONVERSION_TIMEOUT_DESC, gt=0, le=1800)
+    ] = CONVERSION_TIMEOUT_SECONDS,
+) -> dict:
+    """批量把本地文件或课程资源读成 Markdown。
+
+    课程资源并发下载, 下载完成的文件立即交给按 CPU 核数复用的转换子进程；
+    已缓存的文件直接返回。结果按 sources 顺序排列, 失败项带 message。
+    """
+    try:
+        results = batch_convert(
+            [source.model_dump() for source in sources],
+            default_markdown_cache(),
+            lambda paper_id, filename, offset, if_range: _fetch_download_response(
+                paper_id, filename, stream=True, range_start=offset, if_range=if_range
+            ),
+            timeout=timeout_seconds,
+            download_workers=FOLDER_DOWNLOAD_WORKERS,
+        )
+        failed_items = [
+            {key: value for key, value in result.items() if key != "success"}
+            for result in results
+            if not result["success"]
+        ]
+        success_count = len(results) - len(failed_items)
+        data = {
+            "success_count": success_count,
+            "failed_count": len(failed_items),
+            "partial_success": bool(success_count and failed_items),
+            "results": results,
+            "failed_items": failed_items,
+        }
+        message = f"批量转换为markdown:成功{success_count}个,失败{len(failed_items)}个"
+        if failed_items:
+            return ResponseUtil.error(message, data=data)
+        return ResponseUtil.success(data, message)
+    except (APIRequestError, OSError) as e:
+        return ResponseUtil.error("批量转换为markdown时发生异常", e)
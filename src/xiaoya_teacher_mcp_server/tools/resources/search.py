@@ -0,0 +1,178 @@
+"""课程资源名称/路径倒排索引。"""
+
+from __future__ import annotations
+
+import difflib
+import re
+from bisect import bisect_left
+from threading import RLock
+from typing import Any
+
+from .normalize import CourseResourceIndex
+
+CJK_CHARS = r"\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af\uf900-\ufaff"
+TOKEN_RE = re.compile(rf"[{CJK_CHARS}]+|[0-9a-z]+")
+CJK_RE = re.compile(rf"[{CJK_CHARS}]")
+NAME_WEIGHT = 3.0
+PATH_WEIGHT = 1.0
+PREFIX_FACTOR = 0.6
+FUZZY_FACTOR = 0.3
+FUZZY_CUTOFF = 0.75
+SUBSTRING_BONUS = 5.0
+
+
+def tokenize(text: str, *, with_unigrams: bool = False) -> list[str]:
+    """拉丁/数字按词切分, 中日韩文字切成二元组; 建索引时额外收录单字以支持单字查询。"""
+    tokens: list[str] = []
+    for run in TOKEN_RE.findall((text or "").lower()):
+        if not CJK_RE.match(run):
+            tokens.append(run)
+            continue
+        tokens.extend(run[i : i + 2] for i in range(max(len(run) - 1, 1)))
+        if with_unigrams and len(run) > 1:
+            tokens.extend(run)
+    return tokens
+
+
+class ResourceSearchIndex:
+    """按资源 id 增量维护的倒排索引; 课程资源变化时只重建变更节点的词项。"""
+
+    def __init__(self):
+        self._lock = RLock()
+        self._docs: dict[str, tuple[tuple[Any, ...], set[str], set[str]]] = {}
+        self._postings: dict[str, dict[str, float]] = {}
+        self._terms: list[str] = []
+        self._terms_dirty = False
+        self.resources = CourseResourceIndex([])
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def update(self, resources: CourseResourceIndex) -> dict[str, int]:
+        """与上一次的资源快照对比, 返回新增/变更/删除的节点数。"""
+        with self._lock:
+            stats = {"added": 0, "changed": 0, "removed": 0}
+            for resource_id in set(self._docs) - set(resources.by_id):
+                self._remove(resource_id)
+                stats["removed"] += 1
+            for resource_id, item in resources.by_id.items():
+                file_path = resources.file_path(resource_id)
+                signature = (item.get("name"), item.get("type"), file_path)
+                previous = self._docs.get(resource_id)
+                if previous and previous[0] == signature:
+                    continue
+                if previous:
+                    self._remove(resource_id)
+                    stats["changed"] += 1
+                else:
+                    stats["added"] += 1
+                self._add(resource_id, signature, item.get("name") or "", file_path)
+            self.resources = resources
+            return stats
+
+    def _add(self, resource_id: str, signature: tuple[Any, ...], name: str, path: str) -> None:
+        name_terms = set(tokenize(name, with_unigrams=True))
+        path_terms = set(tokenize(path, with_unigrams=True)) - name_terms
+        for term in name_terms:
+            self._posting(term)[resource_id] = NAME_WEIGHT
+        for term in path_terms:
+            self._posting(term)[resource_id] = PATH_WEIGHT
+        self._docs[resource_id] = (signature, name_terms, path_terms)
+
+    def _posting(self, term: str) -> dict[str, float]:
+        if term not in self._postings:
+            self._postings[term] = {}
+            self._terms_dirty = True
+        return self._postings[term]
+
+    def _remove(self, resource_id: str) -> None:
+        _, name_terms, path_terms = self._docs.pop(resource_id)
+        for term in name_terms | path_terms:
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(resource_id, None)
+            if not posting:
+                del self._postings[term]
+                self._terms_dirty = True
+
+    def _sorted_terms(self) -> list[str]:
+        if self._terms_dirty:
+            self._terms = sorted(self._postings)
+            self._terms_dirty = False
+        return self._terms
+
+    def _expand(self, token: str) -> list[tuple[str, float]]:
+        if token in self._postings:
+            return [(token, 1.0)]
+        terms = self._sorted_terms()
+        start = bisect_left(terms, token)
+        prefixed = []
+        for term in terms[start:]:
+            if not term.startswith(token):
+                break
+            prefixed.append((term, PREFIX_FACTOR))
+        if prefixed:
+            return prefixed
+        if CJK_RE.match(token):
+            return []
+        return [
+            (term, FUZZY_FACTOR)
+            for term in difflib.get_close_matches(token, terms, n=5, cutoff=FUZZY_CUTOFF)
+        ]
+
+    def search(
+        self,
+        query: str,
+        *,
+        resource_type: int | None = None,
+        limit: int = 20,
+    ) -> list[dict[str, Any]]:
+        with self._lock:
+            tokens = list(dict.fromkeys(tokenize(query)))
+            if not tokens:
+                return []
+            scores: dict[str, float] = {}
+            coverage: dict[str, int] = {}
+            for token in tokens:
+                best: dict[str, float] = {}
+                for term, factor in self._expand(token):
+                    for resource_id, weight in self._postings[term].items():
+                        best[resource_id] = max(best.get(resource_id, 0.0), weight * factor)
+                for resource_id, score in best.items():
+                    scores[resource_id] = scores.get(resource_id, 0.0) + score
+                    coverage[resource_id] = coverage.get(resource_id, 0) + 1
+
+            needle = query.strip().lower()
+            candidates = []
+            for resource_id, score in scores.items():
+                item = self.resources.by_id.get(resource_id)
+                if item is None or (
+                    resource_type is not None and item.get("type") != resource_type
+                ):
+                    continue
+                if needle and needle in str(item.get("name") or "").lower():
+                    score += SUBSTRING_BONUS
+                candidates.append((coverage[resource_id], score, resource_id))
+
+            if any(covered == len(tokens) for covered, _, _ in candidates):
+                candidates = [entry for entry in candidates if entry[0] == len(tokens)]
+            candidates.sort(
+                key=lambda entry: (-entry[0], -entry[1], self.resources.file_path(entry[2]))
+            )
+            results = []
+            for _, score, resource_id in candidates[:limit]:
+                resource = self.resources.get(resource_id, detail_level="summary")
+                resource["file_path"] = self.resources.file_path(resource_id)
+                resource["score"] = round(score, 2)
+                results.append(resource)
+            return results
+
+
+_SEARCH_INDEXES: dict[str, ResourceSearchIndex] = {}
+_SEARCH_INDEXES_LOCK = RLock()
+
+
+def get_search_index(group_id: str) -> ResourceSearchIndex:
+    with _SEARCH_INDEXES_LOCK:
+        return _SEARCH_INDEXES.setdefault(str(group_id), ResourceSearchIndex())
@@ -0,0 +1,156 @@
+"""课程资源增量同步 MCP 工具"""
+
+from __future__ import annotations
+
+import json
+from typing import Annotated, Any
+
+from pydantic import Field
+
+from ... import field_descriptions as desc
+from ...config import MCP
+from ...utils.client import APIRequestError
+from ...utils.response import ResponseUtil
+from .mirror import load_manifest, mirror_folder_files, plan_folder_mirror
+from .mirror_db import ResourceMirrorDB, offline_mode
+from .normalize import CourseResourceIndex
+from .query import FOLDER_DOWNLOAD_WORKERS, _download_mirror_entry, _load_course_resource_index
+
+
+def _resource_brief(resource: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "id": resource["id"],
+        "name": resource.get("name"),
+        "type": resource.get("type_name"),
+        "file_path": resource.get("file_path"),
+    }
+
+
+def diff_resources(
+    index: CourseResourceIndex, previous: dict[str, dict[str, Any]]
+) -> tuple[dict[str, dict[str, Any]], dict[str, list[dict[str, Any]]]]:
+    """按 normalize_resource_item 的完整字段对比上次镜像, 返回当前数据与增删改列表。"""
+    current = {
+        resource_id: json.loads(json.dumps(index.get(resource_id), ensure_ascii=False))
+        for resource_id in index.sorted_ids
+    }
+    changes: dict[str, list[dict[str, Any]]] = {"added": [], "changed": [], "removed": []}
+    for resource_id, data in current.items():
+        old = previous.get(resource_id)
+        if old is None:
+            changes["added"].append(_resource_brief(data))
+            continue
+        fields = sorted(
+            key for key in set(data) | set(old["data"]) if data.get(key) != old["data"].get(key)
+        )
+        if fields:
+            changes["changed"].append({**_resource_brief(data), "fields": fields})
+    changes["removed"] = [
+        _resource_brief(old["data"])
+        for resource_id, old in previous.items()
+        if resource_id not in current
+    ]
+    return current, changes
+
+
+@MCP.tool()
+def sync_course_resources(
+    group_id: Annotated[str, Field(description=desc.GROUP_ID_DESC)],
+    download_files: Annotated[bool, Field(description=desc.SYNC_DOWNLOAD_FILES_DESC)] = True,
+    max_workers: Annotated[
+        int, Field(description=desc.DOWNLOAD_WORKERS_DESC, ge=1, le=16)
+    ] = FOLDER_DOWNLOAD_WORKERS,
+) -> dict:
+    """把课程组资源同步到本地镜像库, 报告新增/变更/删除的资源。
+
+    元数据存入 SQLite, 文件按课程目录结构存放; 只下载 updated_at 变化或本地缺失的文件,
+    并按 sha256 报告内容真正变化的文件。设置环境变量 XIAOYA_OFFLINE=1 后,
+    课程资源查询/搜索类工具直接读取镜像, 不再访问小雅。
+    """
+    if offline_mode():
+        return ResponseUtil.error("离线模式下无法同步课程资源, 请先关闭 XIAOYA_OFFLINE")
+    try:
+        index = _load_course_resource_index(group_id)
+        mirror = ResourceMirrorDB(group_id)
+        previous = mirror.rows()
+        current, changes = diff_resources(index, previous)
+
+        files_report: dict[str, Any] | None = None
+        content_changed: list[dict[str, Any]] = []
+        if download_files:
+            files_report = mirror_folder_files(
+                plan_folder_mirror(index, str(group_id)),
+                mirror.files_dir,
+                max_workers,
+                _download_mirror_entry,
+            )
+            manifest = load_manifest(mirror.files_dir)
+            current_paths = {record["relative_path"] for record in manifest.values()}
+            for old in previous.values():
+                if old["file_path"] and old["file_path"] not in current_paths:
+                    (mirror.files_dir / old["file_path"]).unlink(missing_ok=True)
+            content_changed = [
+                _resource_brief(current[resource_id])
+                for resource_id, record in manifest.items()
+                if resource_id in previous
+                and previous[resource_id]["sha256"]
+                and previous[resource_id]["sha256"] != record["sha256"]
+            ]
+        else:
+            # 不下载时沿用 updated_at 未变化资源的已有文件记录
+            manifest = {
+                resource_id: {
+                    "relative_path": old["file_path"],
+                    "sha256": old["sha256"],
+                    "size": old["size"],
+                }
+                for resource_id, old in previous.items()
+                if old["file_path"]
+                and resource_id in current
+                and index.by_id[resource_id].get("updated_at") == old["updated_at"]
+            }
+
+        synced_at = mirror.replace(
+            [
+                {
+                    "id": resource_id,
+                    "position": position,
+                    "updated_at": index.by_id[resource_id].get("updated_at"),
+                    "raw": index.by_id[resource_id],
+                    "data": current[resource_id],
+                    "file_path": manifest.get(resource_id, {}).get("relative_path"),
+                    "sha256": manifest.get(resource_id, {}).get("sha256"),
+                    "size": manifest.get(resource_id, {}).get("size"),
+                }
+                for position, resource_id in enumerate(index.sorted_ids)
+            ]
+        )
+
+        data = {
+            "mirror_dir": str(mirror.dir),
+            "files_dir": str(mirror.files_dir),
+            "synced_at": synced_at,
+            "resource_count": len(index),
+            **changes,
+            "content_changed": content_changed,
+        }
+        if files_report is not None:
+            data["files"] = {
+                key: files_report[key]
+                for key in (
+                    "downloaded_count",
+                    "skipped_count",
+                    "failed_count",
+                    "downloaded_bytes",
+                    "failed_items",
+                )
+            }
+        message = (
+            f"课程资源同步完成: 新增{len(changes['added'])}个, "
+            f"变更{len(changes['changed'])}个, 删除{len(changes['removed'])}个"
+        )
+        if files_report and files_report["failed_count"]:
+            return ResponseUtil.error(message, data=data)
+        return ResponseUtil.success(data, message)
+    except (APIRequestError, OSError) as e:
+        return ResponseUtil.error("同步课程资源时发生异常", e)
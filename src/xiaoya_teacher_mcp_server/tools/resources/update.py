@@ -3,6 +3,9 @@
 from __future__ import annotations
 
 import json
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from typing import Annotated
 
 from pydantic import Field
@@ -14,28 +17,103 @@ from ...types.resource_models import DownloadType, VisibilityType
 from ...utils.client import APIRequestError, expect_success, extract_response_message, post_json
 from ...utils.response import ResponseUtil
 
+RESOURCE_UPDATE_WORKERS = 8
+
+
+def _post_node_update(node_id: str, request_builder: Callable[[str], dict]) -> str | None:
+    try:
+        response = request_builder(node_id)
+    except APIRequestError as exc:
+        return str(exc)
+    return None if response["success"] else extract_response_message(response)
+
 
 def _run_batch_resource_update(
     *,
     node_ids: list[str],
-    request_builder,
+    request_builder: Callable[[str], dict],
 ) -> tuple[list[str], list[dict[str, str]]]:
+    """每个 id 单独一个请求, 各请求在有界线程池中并发发送, 逐项给出结果。"""
+    if len(node_ids) <= 1:
+        messages = [_post_node_update(node_id, request_builder) for node_id in node_ids]
+    else:
+        with ThreadPoolExecutor(
+            max_workers=min(RESOURCE_UPDATE_WORKERS, len(node_ids))
+        ) as executor:
+            futures = [
+                executor.submit(copy_context().run, _post_node_update, node_id, request_builder)
+                for node_id in node_ids
+            ]
+            messages = [future.result() for future in futures]
+
     success_ids: list[str] = []
     failed_items: list[dict[str, str]] = []
-    for node_id in node_ids:
-        try:
-            response = request_builder(node_id)
-            if response["success"]:
-                success_ids.append(node_id)
-            else:
-                failed_items.append(
-                    {"node_id": node_id, "message": extract_response_message(response)}
-                )
-        except APIRequestError as exc:
-            failed_items.append({"node_id": node_id, "message": str(exc)})
+    for node_id, message in zip(node_ids, messages, strict=True):
+        if message is None:
+            success_ids.append(node_id)
+        else:
+            failed_items.append({"node_id": node_id, "message": message})
     return success_ids, failed_items
 
 
+def _rename_node(group_id: str, node_id: str, name: str) -> dict:
+    return expect_success(
+        post_json(
+            f"{MAIN_URL}/resource/updateResource",
+            payload={"node_id": str(node_id), "group_id": str(group_id), "name": name},
+        )
+    )
+
+
+def _move_nodes(
+    group_id: str, node_ids: list[str], from_parent_id: str, parent_id: str
+) -> list[dict]:
+    return expect_success(
+        post_json(
+            f"{MAIN_URL}/resource/moveResource",
+            payload={
+                "group_id": str(group_id),
+                "node_ids": [str(node_id) for node_id in node_ids],
+                "from_parent_id": str(from_parent_id),
+                "parent_id": str(parent_id),
+            },
+        )
+    )
+
+
+def _post_download(group_id: str, node_id: str, download: DownloadType) -> dict:
+    return post_json(
+        f"{MAIN_URL}/resource/batch/update/attribute",
+        payload={"group_id": str(group_id), "node_id": str(node_id), "download": int(download)},
+    )
+
+
+def _post_visibility(group_id: str, node_id: str, pub: VisibilityType) -> dict:
+    return post_json(
+        f"{MAIN_URL}/resource/publicResources",
+        payload={"group_id": str(group_id), "activity_node_ids": str(node_id), "pub": pub},
+    )
+
+
+def _sort_nodes(group_id: str, sorted_ids: list[str]) -> list[dict]:
+    data = expect_success(
+        post_json(
+            f"{MAIN_URL}/resource/sortNode",
+            payload={
+                "group_id": str(group_id),
+                "sort_content": json.dumps(
+                    [
+                        {"node_id": str(node_id), "sort_position": index}
+                        for index, node_id in enumerate(sorted_ids)
+                    ],
+                    ensure_ascii=False,
+                ),
+            },
+        )
+    )
+    return sorted(data, key=lambda item: item["sort_position"])
+
+
 def _batch_update_response(
     *,
     success_ids: list[str],
@@ -64,14 +142,9 @@ def update_resource_name(
 ) -> dict:
     """更新教育资源的名称"""
     try:
-        data = expect_success(
-            post_json(
-                f"{MAIN_URL}/resource/updateResource",
-                payload={"node_id": str(node_id), "group_id": str(group_id), "name": new_name},
-            )
-        )
         return ResponseUtil.success(
-            normalize_resource_item(data, detail_level="full"), "资源名称更新成功"
+            normalize_resource_item(_rename_node(group_id, node_id, new_name), detail_level="full"),
+            "资源名称更新成功",
         )
     except APIRequestError as e:
         return ResponseUtil.error("更新资源名称时发生异常", e)
@@ -86,17 +159,7 @@ def move_resource(
 ) -> dict:
     """将资源移动到新的父文件夹"""
     try:
-        data = expect_success(
-            post_json(
-                f"{MAIN_URL}/resource/moveResource",
-                payload={
-                    "group_id": str(group_id),
-                    "node_ids": [str(node_id)],
-                    "from_parent_id": str(from_parent_id),
-                    "parent_id": str(parent_id),
-                },
-            )
-        )
+        data = _move_nodes(group_id, [node_id], from_parent_id, parent_id)
         return ResponseUtil.success(
             [normalize_resource_item(item, detail_level="full") for item in data],
             "资源移动成功",
@@ -115,14 +178,7 @@ def batch_update_resource_download(
     try:
         success_ids, failed_items = _run_batch_resource_update(
             node_ids=node_ids,
-            request_builder=lambda node_id: post_json(
-                f"{MAIN_URL}/resource/batch/update/attribute",
-                payload={
-                    "group_id": str(group_id),
-                    "node_id": str(node_id),
-                    "download": int(download),
-                },
-            ),
+            request_builder=lambda node_id: _post_download(group_id, node_id, download),
         )
         return _batch_update_response(
             success_ids=success_ids,
@@ -143,10 +199,7 @@ def batch_update_resource_visibility(
     try:
         success_ids, failed_items = _run_batch_resource_update(
             node_ids=activity_node_ids,
-            request_builder=lambda node_id: post_json(
-                f"{MAIN_URL}/resource/publicResources",
-                payload={"group_id": str(group_id), "activity_node_ids": str(node_id), "pub": pub},
-            ),
+            request_builder=lambda node_id: _post_visibility(group_id, node_id, pub),
         )
         return _batch_update_response(
             success_ids=success_ids,
@@ -166,24 +219,6 @@ def update_resource_sort(
 ) -> dict:
     """更新课程组内资源的排序"""
     try:
-        data = expect_success(
-            post_json(
-                f"{MAIN_URL}/resource/sortNode",
-                payload={
-                    "group_id": str(group_id),
-                    "sort_content": json.dumps(
-                        [
-                            {"node_id": str(node_id), "sort_position": index}
-                            for index, node_id in enumerate(sorted_ids)
-                        ],
-                        ensure_ascii=False,
-                    ),
-                },
-            )
-        )
-        return ResponseUtil.success(
-            sorted(data, key=lambda item: item["sort_position"]),
-            "资源排序成功",
-        )
+        return ResponseUtil.success(_sort_nodes(group_id, sorted_ids), "资源排序成功")
     except APIRequestError as e:
         return ResponseUtil.error("更新资源排序时发生异常", e)
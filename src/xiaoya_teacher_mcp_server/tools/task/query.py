@@ -10,7 +10,7 @@ from pydantic import Field
 from ... import field_descriptions as desc
 from ...config import MAIN_URL, MCP
 from ...tools.questions.normalize import format_rich_text_field, parse_answer_items
-from ...tools.resources.query import _load_course_resource_map
+from ...tools.resources.query import _load_course_resource_index
 from ...types.enums import QuestionType
 from ...types.resource_models import ResourceType
 from ...types.task_models import AnswerStatus
@@ -47,15 +47,9 @@ def _query_payload(
 
 def _build_group_tasks(group_id: str, detail_level: str = "summary") -> dict:
     try:
-        resources = _load_course_resource_map(group_id, detail_level="full").values()
+        assignments = _load_course_resource_index(group_id).of_type(ResourceType.ASSIGNMENT)
         flattened_tasks = []
-        for task_folder in resources:
-            is_assignment = (
-                task_folder.get("type") == ResourceType.ASSIGNMENT.value
-                or task_folder.get("type_name") == "作业"
-            )
-            if not is_assignment:
-                continue
+        for task_folder in assignments:
             for link_task in task_folder.get("link_tasks", []):
                 publish_id = link_task.get("publish_id")
                 if not publish_id:
@@ -2,6 +2,10 @@ from __future__ import annotations
 
 from enum import IntEnum
 
+from pydantic import BaseModel, Field, model_validator
+
+from .. import field_descriptions as desc
+
 
 class ResourceType(IntEnum):
     """资源类型枚举"""
@@ -53,3 +57,52 @@ class VisibilityType(IntEnum):
             1: "学生不可见",
             2: "学生可见",
         }.get(value, default)
+
+
+class MarkdownSource(BaseModel):
+    """待转换为 Markdown 的文件: 本地路径, 或小雅课程资源的 paper_id + filename"""
+
+    file_path: str | None = Field(description=desc.FILE_PATH_DESC, default=None)
+    paper_id: str | None = Field(description=desc.PAPER_ID_FILE_DESC, default=None)
+    filename: str | None = Field(description=desc.FILENAME_DESC, default=None)
+
+    @model_validator(mode="after")
+    def _require_source(self) -> MarkdownSource:
+        if not self.file_path and not (self.paper_id and self.filename):
+            raise ValueError("请提供file_path或者同时提供paper_id和filename")
+        return self
+
+
+class ResourceTreeNode(BaseModel):
+    """资源树节点: 文件夹可继续嵌套 children"""
+
+    name: str = Field(description=desc.RESOURCE_NAME_DESC, min_length=1)
+    type: ResourceType = Field(description=desc.RESOURCE_TYPE_DESC, default=ResourceType.FOLDER)
+    children: list[ResourceTreeNode] = Field(
+        description=desc.RESOURCE_TREE_CHILDREN_DESC, default=[]
+    )
+
+    @model_validator(mode="after")
+    def _children_only_in_folders(self) -> ResourceTreeNode:
+        if self.children and self.type != ResourceType.FOLDER:
+            raise ValueError(f"只有文件夹可以包含子资源: {self.name}")
+        return self
+
+
+class ResourceLayoutNode(BaseModel):
+    """期望的资源布局节点; 带 id 时匹配指定资源(可改名/移动), 否则按名称+类型匹配同级资源"""
+
+    id: str | None = Field(description=desc.LAYOUT_NODE_ID_DESC, default=None)
+    name: str = Field(description=desc.RESOURCE_NAME_DESC, min_length=1)
+    type: ResourceType = Field(description=desc.RESOURCE_TYPE_DESC, default=ResourceType.FOLDER)
+    public: VisibilityType | None = Field(description=desc.LAYOUT_VISIBILITY_DESC, default=None)
+    download: DownloadType | None = Field(description=desc.LAYOUT_DOWNLOAD_DESC, default=None)
+    children: list[ResourceLayoutNode] | None = Field(
+        description=desc.LAYOUT_CHILDREN_DESC, default=None
+    )
+
+    @model_validator(mode="after")
+    def _children_only_in_folders(self) -> ResourceLayoutNode:
+        if self.children and self.type != ResourceType.FOLDER:
+            raise ValueError(f"只有文件夹可以包含子资源: {self.name}")
+        return self
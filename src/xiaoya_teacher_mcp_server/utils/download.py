@@ -0,0 +1,144 @@
+"""流式下载工具: 分块落盘、断点续传、边写边算哈希。"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import requests
+
+from .client import APIRequestError
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+PARTIAL_SUFFIX = ".part"
+VALIDATOR_SUFFIX = ".validator"
+CONTENT_RANGE_START_RE = re.compile(r"^\s*bytes\s+(\d+)-")
+
+ResponseOpener = Callable[[int, str | None], requests.Response]
+
+
+def partial_path(file_path: Path) -> Path:
+    return file_path.with_name(file_path.name + PARTIAL_SUFFIX)
+
+
+def validator_path(file_path: Path) -> Path:
+    return file_path.with_name(file_path.name + PARTIAL_SUFFIX + VALIDATOR_SUFFIX)
+
+
+def response_validator(response: requests.Response) -> str | None:
+    """If-Range 只接受强 ETag 或 Last-Modified; 两者都没有时无法安全续传。"""
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified") or None
+
+
+def _content_range_start(response: requests.Response) -> int | None:
+    match = CONTENT_RANGE_START_RE.match(response.headers.get("Content-Range") or "")
+    return int(match.group(1)) if match else None
+
+
+def _read_validator(path: Path) -> str | None:
+    try:
+        return path.read_text(encoding="utf-8").strip() or None
+    except OSError:
+        return None
+
+
+def file_sha256(file_path: Path, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> str:
+    digest = hashlib.sha256()
+    with file_path.open("rb") as handle:
+        while chunk := handle.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _hash_existing(part: Path, digest: Any, chunk_size: int) -> int:
+    size = 0
+    with part.open("rb") as handle:
+        while chunk := handle.read(chunk_size):
+            digest.update(chunk)
+            size += len(chunk)
+    return size
+
+
+def stream_to_file(
+    open_response: ResponseOpener,
+    file_path: Path,
+    *,
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+) -> dict[str, Any]:
+    """把响应分块写入 `<file>.part`, 完成后原子替换为目标文件。
+
+    open_response(offset, if_range) 需返回流式响应; offset > 0 时应携带 Range 头,
+    if_range 不为空时同时携带 If-Range 头。.part 旁边保存上次响应的 ETag/Last-Modified,
+    只有带着它续传、服务端返回 206 且 Content-Range 起点正好等于已写入字节数时才追加,
+    否则(文件已在服务端变化、没有校验值、服务端忽略 Range)从头重写。
+    """
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    part = partial_path(file_path)
+    validator_file = validator_path(file_path)
+    digest = hashlib.sha256()
+    validator = _read_validator(validator_file) if part.exists() else None
+    if part.exists() and validator is None:
+        part.unlink()
+    offset = _hash_existing(part, digest, chunk_size) if part.exists() else 0
+
+    try:
+        response = open_response(offset, validator if offset else None)
+    except APIRequestError:
+        if not offset:
+            raise
+        # 续传失败(如 416)时丢弃残留分片, 从头下载
+        part.unlink(missing_ok=True)
+        digest, offset = hashlib.sha256(), 0
+        response = open_response(0, None)
+
+    if offset and not (response.status_code == 206 and _content_range_start(response) == offset):
+        digest, offset = hashlib.sha256(), 0
+        if response.status_code == 206:
+            # 返回的是别的区间, 这份响应体不能当作完整文件
+            response.close()
+            response = open_response(0, None)
+    resumed_from = offset
+    if not offset:
+        new_validator = response_validator(response)
+        if new_validator:
+            validator_file.write_text(new_validator, encoding="utf-8")
+        else:
+            validator_file.unlink(missing_ok=True)
+
+    started = time.perf_counter()
+    written = 0
+    try:
+        with part.open("ab" if offset else "wb") as handle:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if not chunk:
+                    continue
+                handle.write(chunk)
+                digest.update(chunk)
+                written += len(chunk)
+    except requests.RequestException as exc:
+        raise APIRequestError(
+            f"下载中断, 已保留 {offset + written} 字节, 重试将自动续传: {exc.__class__.__name__}"
+        ) from exc
+    finally:
+        response.close()
+    elapsed = time.perf_counter() - started
+
+    os.replace(part, file_path)
+    validator_file.unlink(missing_ok=True)
+    return {
+        "file_path": str(file_path),
+        "size": offset + written,
+        "sha256": digest.hexdigest(),
+        "resumed_from": resumed_from,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_bytes_per_second": int(written / elapsed) if elapsed > 0 else written,
+        "content_type": response.headers.get("Content-Type", ""),
+    }
@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
+import copy
 import json
 import random
 import re
 import string
+from bisect import bisect_left
+from functools import lru_cache
 from typing import Any
 
 from ..config import DOWNLOAD_URL
@@ -14,6 +17,7 @@ ASSET_ID_RE = re.compile(r"asset://([A-Za-z0-9_.:-]+)")
 ASSET_IMAGE_LINE_RE = re.compile(r"^!\[([^\]]*)\]\(asset://([A-Za-z0-9_.:-]+)\)$")
 ASSET_LINK_LINE_RE = re.compile(r"^\[([^\]]+)\]\(asset://([A-Za-z0-9_.:-]+)\)$")
 CLOUD_FILE_ID_RE = re.compile(r"/cloud/file_(?:access|url)/([^/?#]+)")
+ASTRAL_CHAR_RE = re.compile("[\U00010000-\U0010ffff]")
 HEADER_BLOCK_TYPES = {
     1: "header-one",
     2: "header-two",
@@ -30,6 +34,7 @@ MARKDOWN_HEADERS = {
     "header-five": "#####",
     "header-six": "######",
 }
+RICH_TEXT_MEMO_SIZE = 4096
 MARKDOWN_INLINE_MARKERS = {
     "BOLD": ("**", "**"),
     "ITALIC": ("*", "*"),
@@ -107,88 +112,82 @@ def _rich_text_block(
     }
 
 
-def _append_inline_text(
-    output_parts: list[str],
-    style_ranges: list[dict[str, Any]],
-    text: str,
-    style: str | None = None,
-) -> None:
-    if not text:
-        return
-    offset = _utf16_len("".join(output_parts))
-    output_parts.append(text)
-    if style:
-        style_ranges.append({"offset": offset, "length": _utf16_len(text), "style": style})
+# 按尝试顺序排列: 同一位置先匹配更长的标记, 找不到闭合标记时回退到下一种
+INLINE_MARKDOWN_SPANS = (
+    ("<u>", "</u>", "UNDERLINE"),
+    ("`", "`", "CODE"),
+    ("**", "**", "BOLD"),
+    ("__", "__", "BOLD"),
+    ("*", "*", "ITALIC"),
+    ("_", "_", "ITALIC"),
+)
+INLINE_MARKDOWN_OPENER_RE = re.compile(r"<u>|[`*_]")
+HEADER_LINE_RE = re.compile(r"^(#{1,6})\s+(.*)$")
+UNORDERED_LINE_RE = re.compile(r"^\s*[-*+]\s+(.*)$")
+ORDERED_LINE_RE = re.compile(r"^\s*\d+[.)]\s+(.*)$")
+QUOTE_LINE_RE = re.compile(r"^\s*>\s?(.*)$")
 
 
 def _parse_inline_markdown(text: str) -> tuple[str, list[dict[str, Any]]]:
+    """单遍解析行内 Markdown, 返回纯文本与 UTF-16 偏移的样式区间。
+
+    边输出边累加 UTF-16 偏移; 某个闭合标记在当前位置之后已找不到时记下来,
+    之后不再重复查找, 未闭合的标记再多也保持线性。
+    """
     output_parts: list[str] = []
     style_ranges: list[dict[str, Any]] = []
+    offset = 0
+    exhausted: set[str] = set()
     i = 0
+    length = len(text)
+
+    while i < length:
+        opener = INLINE_MARKDOWN_OPENER_RE.search(text, i)
+        literal_end = opener.start() if opener else length
+        if literal_end > i:
+            literal = text[i:literal_end]
+            output_parts.append(literal)
+            offset += _utf16_len(literal)
+            i = literal_end
+            continue
 
-    while i < len(text):
-        if text.startswith("<u>", i):
-            end = text.find("</u>", i + 3)
-            if end != -1:
-                _append_inline_text(output_parts, style_ranges, text[i + 3 : end], "UNDERLINE")
-                i = end + 4
-                continue
-
-        if text[i] == "`":
-            end = text.find("`", i + 1)
-            if end != -1:
-                _append_inline_text(output_parts, style_ranges, text[i + 1 : end], "CODE")
-                i = end + 1
-                continue
-
-        if text.startswith("**", i):
-            end = text.find("**", i + 2)
-            if end != -1:
-                _append_inline_text(output_parts, style_ranges, text[i + 2 : end], "BOLD")
-                i = end + 2
-                continue
-
-        if text.startswith("__", i):
-            end = text.find("__", i + 2)
-            if end != -1:
-                _append_inline_text(output_parts, style_ranges, text[i + 2 : end], "BOLD")
-                i = end + 2
-                continue
-
-        if text[i] == "*":
-            end = text.find("*", i + 1)
-            if end != -1:
-                _append_inline_text(output_parts, style_ranges, text[i + 1 : end], "ITALIC")
-                i = end + 1
+        for open_marker, close_marker, style in INLINE_MARKDOWN_SPANS:
+            if close_marker in exhausted or not text.startswith(open_marker, i):
                 continue
-
-        if text[i] == "_":
-            end = text.find("_", i + 1)
-            if end != -1:
-                _append_inline_text(output_parts, style_ranges, text[i + 1 : end], "ITALIC")
-                i = end + 1
+            end = text.find(close_marker, i + len(open_marker))
+            if end == -1:
+                exhausted.add(close_marker)
                 continue
-
-        output_parts.append(text[i])
-        i += 1
+            content = text[i + len(open_marker) : end]
+            if content:
+                content_length = _utf16_len(content)
+                output_parts.append(content)
+                style_ranges.append({"offset": offset, "length": content_length, "style": style})
+                offset += content_length
+            i = end + len(close_marker)
+            break
+        else:
+            output_parts.append(text[i])
+            offset += 1
+            i += 1
 
     return "".join(output_parts), style_ranges
 
 
 def _markdown_block_type_and_text(line: str) -> tuple[str, str]:
-    header = re.match(r"^(#{1,6})\s+(.*)$", line)
+    header = HEADER_LINE_RE.match(line)
     if header:
         return HEADER_BLOCK_TYPES[len(header.group(1))], header.group(2).strip()
 
-    unordered = re.match(r"^\s*[-*+]\s+(.*)$", line)
+    unordered = UNORDERED_LINE_RE.match(line)
     if unordered:
         return "unordered-list-item", unordered.group(1).strip()
 
-    ordered = re.match(r"^\s*\d+[.)]\s+(.*)$", line)
+    ordered = ORDERED_LINE_RE.match(line)
     if ordered:
         return "ordered-list-item", ordered.group(1).strip()
 
-    quote = re.match(r"^\s*>\s?(.*)$", line)
+    quote = QUOTE_LINE_RE.match(line)
     if quote:
         return "blockquote", quote.group(1).strip()
 
@@ -381,31 +380,57 @@ def _quote_id_from_url(url: str) -> str | None:
     return match.group(1) if match else None
 
 
-def _utf16_offset_to_index(text: str, target_offset: int) -> int:
-    offset = 0
-    for index, char in enumerate(text):
-        if offset >= target_offset:
-            return index
-        offset += _utf16_len(char)
-    return len(text)
+def _utf16_index_table(text: str) -> list[int]:
+    """文本中每个非 BMP 字符(UTF-16 代理对)的起始偏移, 升序; 每个块只计算一次。"""
+    return [match.start() + count for count, match in enumerate(ASTRAL_CHAR_RE.finditer(text))]
+
+
+def _utf16_offset_to_index(table: list[int], offset: int) -> int:
+    """借助 _utf16_index_table 把 UTF-16 偏移换算成字符下标; 落在代理对中间时取下一个字符。"""
+    before = bisect_left(table, offset)
+    index = offset - before
+    if before and table[before - 1] == offset - 1:
+        index += 1
+    return index
 
 
 def _apply_inline_markdown(text: str, ranges: list[dict[str, Any]]) -> str:
-    result = text
-    normalized_ranges = []
-    for style_range in ranges or []:
+    """按样式区间一次性输出带 Markdown 标记的文本。
+
+    同一位置先闭合内层再打开外层: 闭合按起点从后到前, 打开按终点从远到近,
+    完全相同的区间按出现顺序嵌套。
+    """
+    table = _utf16_index_table(text)
+    limit = len(text) + len(table)
+    opens: dict[int, list[tuple[int, int, str]]] = {}
+    closes: dict[int, list[tuple[int, int, str]]] = {}
+    for sequence, style_range in enumerate(ranges or []):
         marker = MARKDOWN_INLINE_MARKERS.get(style_range.get("style"))
         if not marker:
             continue
-        start = _utf16_offset_to_index(text, int(style_range.get("offset") or 0))
-        end = _utf16_offset_to_index(
-            text,
-            int(style_range.get("offset") or 0) + int(style_range.get("length") or 0),
-        )
-        normalized_ranges.append((start, end, marker))
-    for start, end, (open_marker, close_marker) in sorted(normalized_ranges, reverse=True):
-        result = f"{result[:start]}{open_marker}{result[start:end]}{close_marker}{result[end:]}"
-    return result
+        offset = max(int(style_range.get("offset") or 0), 0)
+        end_offset = offset + max(int(style_range.get("length") or 0), 0)
+        start = min(offset, limit)
+        end = min(end_offset, limit)
+        if table:
+            start = _utf16_offset_to_index(table, start)
+            end = _utf16_offset_to_index(table, end)
+        if end <= start:
+            continue
+        opens.setdefault(start, []).append((-end, sequence, marker[0]))
+        closes.setdefault(end, []).append((-start, -sequence, marker[1]))
+    if not opens:
+        return text
+
+    parts: list[str] = []
+    previous = 0
+    for position in sorted(opens.keys() | closes.keys()):
+        parts.append(text[previous:position])
+        parts.extend(marker for *_, marker in sorted(closes.get(position, ())))
+        parts.extend(marker for *_, marker in sorted(opens.get(position, ())))
+        previous = position
+    parts.append(text[previous:])
+    return "".join(parts)
 
 
 def _markdown_for_text_block(block: dict[str, Any]) -> str:
@@ -507,12 +532,46 @@ def rich_text_to_markdown_document(value: Any) -> dict[str, Any]:
     return {"markdown": _join_markdown_parts(parts), "assets": assets}
 
 
-def render_rich_text_output(value: Any, parse_mode: str = "plain") -> Any:
-    parsed = load_rich_text_value(value)
-    if parse_mode == "raw":
-        return parsed
+def _render_parsed(parsed: Any, parse_mode: str) -> Any:
     if parse_mode == "markdown":
         return rich_text_to_markdown_document(parsed)
-    if parse_mode != "plain":
-        raise ValueError("parse_mode 仅支持 plain、raw 或 markdown")
     return rich_text_to_plain_text(parsed)
+
+
+@lru_cache(maxsize=RICH_TEXT_MEMO_SIZE)
+def _render_memoized(value: str, parse_mode: str) -> Any:
+    return _render_parsed(load_rich_text_value(value), parse_mode)
+
+
+def _copy_rendered(rendered: Any, parse_mode: str) -> Any:
+    if parse_mode == "markdown":
+        return {"markdown": rendered["markdown"], "assets": [dict(a) for a in rendered["assets"]]}
+    return rendered if isinstance(rendered, str) else copy.deepcopy(rendered)
+
+
+def render_rich_text_output(value: Any, parse_mode: str = "plain") -> Any:
+    """渲染富文本字段; 字符串输入的 plain/markdown 结果按 (原文, parse_mode) 记忆。
+
+    同一份题目内容(例如逐个学生预览答卷时)只解析渲染一次, 返回的是副本,
+    调用方可以放心修改。raw 模式直接 json.loads, 比复制缓存结果更快, 不做记忆。
+    """
+    if parse_mode == "raw":
+        return load_rich_text_value(value)
+    if parse_mode not in ("plain", "markdown"):
+        raise ValueError("parse_mode 仅支持 plain、raw 或 markdown")
+    if isinstance(value, str):
+        return _copy_rendered(_render_memoized(value, parse_mode), parse_mode)
+    return _render_parsed(load_rich_text_value(value), parse_mode)
+
+
+def rich_text_memo_stats() -> dict[str, Any]:
+    """富文本渲染记忆的命中统计。"""
+    info = _render_memoized.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": round(info.hits / lookups, 4) if lookups else None,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+    }
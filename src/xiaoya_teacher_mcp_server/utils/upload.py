@@ -2,17 +2,47 @@
 
 from __future__ import annotations
 
+import io
+import json
 import mimetypes
+import os
+import tempfile
+import time
 import uuid
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from datetime import UTC, datetime
 from pathlib import Path
-from typing import Any
+from threading import Lock, RLock
+from typing import Any, BinaryIO
+from urllib.parse import quote
 
 import requests
 
-from ..config import DOWNLOAD_URL
+from ..config import DOWNLOAD_URL, auth_scope
 from .client import APIRequestError, expect_success, get_json, post_json
+from .download import file_sha256
+from .logging import get_logger
+
+LOGGER = get_logger("xiaoya_teacher_mcp_server.upload")
 
 UPLOAD_TIMEOUT = 60
+UPLOAD_READ_SIZE = 1024 * 1024
+STREAM_UPLOAD_THRESHOLD = 8 * 1024 * 1024
+STREAM_UPLOAD_ATTEMPTS = 3
+STREAM_UPLOAD_BACKOFF_SECONDS = 2.0
+ASSET_CACHE_NAME = "uploaded-assets.json"
+ASSET_CACHE_VERIFY_ENV = "XIAOYA_ASSET_CACHE_VERIFY"
+ASSET_UPLOAD_WORKERS = 4
+ASSET_KEY_LOCK_STRIPES = 64
+
+_ASSET_CACHE_LOCK = RLock()
+# 同一账号同一内容的资源同时只上传一次, 并发引用同一图片的题目等待首个上传写入缓存;
+# 按缓存键哈希分段加锁, 锁的数量固定, 不随上传过的内容增长
+_ASSET_KEY_LOCKS = tuple(Lock() for _ in range(ASSET_KEY_LOCK_STRIPES))
+_BUCKET_URLS: dict[str, str] = {}
+_BUCKET_LOCK = RLock()
 
 
 def _asset_name(asset: dict[str, Any], path: Path) -> str:
@@ -52,13 +82,28 @@ def _quote_id_from_upload(
 
 
 def _get_bucket_url() -> str:
+    """OSS 上传地址; 同一账号在进程内只查询一次, 上传失败时丢弃重新查询。"""
+    scope = auth_scope()
+    with _BUCKET_LOCK:
+        cached = _BUCKET_URLS.get(scope) if scope else None
+    if cached:
+        return cached
     data = expect_success(get_json(f"{DOWNLOAD_URL}/cloud/bucket"), "获取上传 bucket 失败")
     bucket_url = str(data.get("aliyun_oss_host") or "").strip()
     if not bucket_url:
         raise APIRequestError("上传 bucket 为空")
+    if scope:
+        with _BUCKET_LOCK:
+            _BUCKET_URLS[scope] = bucket_url
     return bucket_url
 
 
+def _forget_bucket_url(bucket_url: str) -> None:
+    with _BUCKET_LOCK:
+        for scope in [scope for scope, url in _BUCKET_URLS.items() if url == bucket_url]:
+            del _BUCKET_URLS[scope]
+
+
 def _register_disk_file(*, upload_id: str, filename: str, file_size: int) -> dict[str, Any]:
     data = expect_success(
         post_json(
@@ -73,33 +118,257 @@ def _register_disk_file(*, upload_id: str, filename: str, file_size: int) -> dic
     return dict(multipart)
 
 
-def upload_rich_text_asset(asset: dict[str, Any]) -> dict[str, Any]:
-    """上传单个 Markdown 资源，返回可嵌入小雅富文本的文件信息。"""
-    file_path = Path(str(asset.get("file_path") or ""))
-    if not file_path.is_file():
-        raise FileNotFoundError(str(file_path))
+class MultipartFileBody:
+    """按需从磁盘读取的 multipart/form-data 请求体, 大文件上传不整体载入内存。
 
-    filename = _asset_name(asset, file_path)
-    upload_id = str(asset.get("upload_id") or uuid.uuid4())
-    bucket_url = _get_bucket_url()
+    提供 __len__ 让 requests 设置 Content-Length(OSS 表单上传不接受 chunked 编码);
+    不实现 tell/seek, 避免 requests 按当前位置推算长度。
+    """
+
+    def __init__(
+        self, fields: dict[str, Any], filename: str, handle: BinaryIO, size: int, content_type: str
+    ):
+        self.boundary = uuid.uuid4().hex
+        quoted_name = filename.replace('"', "%22")
+        head = b"".join(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n'
+            f"{value}\r\n".encode()
+            for key, value in fields.items()
+        )
+        head += (
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="file"; '
+            f'filename="{quoted_name}"\r\nContent-Type: {content_type}\r\n\r\n'
+        ).encode()
+        tail = f"\r\n--{self.boundary}--\r\n".encode()
+        self._parts = [io.BytesIO(head), handle, io.BytesIO(tail)]
+        self._length = len(head) + size + len(tail)
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[bytes]:
+        while chunk := self.read(UPLOAD_READ_SIZE):
+            yield chunk
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self._length
+        chunks: list[bytes] = []
+        while size > 0 and self._parts:
+            chunk = self._parts[0].read(min(size, UPLOAD_READ_SIZE))
+            if not chunk:
+                self._parts.pop(0)
+                continue
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+
+def _retryable_upload_error(exc: requests.RequestException) -> bool:
+    if isinstance(exc, requests.HTTPError):
+        return exc.response is not None and exc.response.status_code >= 500
+    return isinstance(exc, requests.ConnectionError | requests.Timeout)
+
+
+def _post_streaming(
+    bucket_url: str,
+    multipart: dict[str, Any],
+    filename: str,
+    handle: BinaryIO,
+    size: int,
+    content_type: str | None,
+) -> tuple[requests.Response, int]:
+    """边读边发的大文件上传; 连接中断、超时或 5xx 时回到文件开头, 退避后重传。
+
+    签名表单在有效期内可重复提交, 重试复用同一组 multipart 参数, 不会多注册文件。
+    """
+    attempt = 1
+    while True:
+        handle.seek(0)
+        body = MultipartFileBody(
+            multipart, filename, handle, size, content_type or "application/octet-stream"
+        )
+        try:
+            response = requests.post(
+                bucket_url,
+                data=body,
+                headers={"Content-Type": body.content_type},
+                timeout=UPLOAD_TIMEOUT,
+            )
+            response.raise_for_status()
+            return response, attempt
+        except requests.RequestException as exc:
+            if attempt >= STREAM_UPLOAD_ATTEMPTS or not _retryable_upload_error(exc):
+                raise
+            delay = STREAM_UPLOAD_BACKOFF_SECONDS * attempt
+            LOGGER.warning(
+                "文件 %s 第%d次上传失败(%s), %.0f 秒后重试",
+                filename,
+                attempt,
+                exc.__class__.__name__,
+                delay,
+            )
+            time.sleep(delay)
+            attempt += 1
+
+
+def upload_file_to_oss(
+    file_path: Path,
+    filename: str,
+    *,
+    bucket_url: str | None = None,
+    upload_id: str | None = None,
+) -> dict[str, Any]:
+    """注册 disk/files 后以 multipart 表单直传 OSS, 返回 quote_id、大小、MIME 类型与尝试次数。
+
+    超过 STREAM_UPLOAD_THRESHOLD 的文件边读边发并在网络错误时整体重传,
+    小文件沿用 requests 的 files 表单。
+    """
+    size = file_path.stat().st_size
+    bucket_url = bucket_url or _get_bucket_url()
     multipart = _register_disk_file(
-        upload_id=upload_id, filename=filename, file_size=file_path.stat().st_size
+        upload_id=upload_id or str(uuid.uuid4()), filename=filename, file_size=size
     )
     content_type = _guess_content_type(filename)
     if content_type and "x-oss-content-type" not in multipart:
         multipart["x-oss-content-type"] = content_type
 
+    attempts = 1
     with file_path.open("rb") as handle:
-        response = requests.post(
-            bucket_url,
-            data=multipart,
-            files={"file": (filename, handle, content_type or "application/octet-stream")},
-            headers={},
-            timeout=UPLOAD_TIMEOUT,
+        try:
+            if size > STREAM_UPLOAD_THRESHOLD:
+                response, attempts = _post_streaming(
+                    bucket_url, multipart, filename, handle, size, content_type
+                )
+            else:
+                response = requests.post(
+                    bucket_url,
+                    data=multipart,
+                    files={"file": (filename, handle, content_type or "application/octet-stream")},
+                    headers={},
+                    timeout=UPLOAD_TIMEOUT,
+                )
+                response.raise_for_status()
+        except requests.RequestException:
+            _forget_bucket_url(bucket_url)
+            raise
+
+    return {
+        "quote_id": _quote_id_from_upload(upload_response=response, multipart=multipart),
+        "size": size,
+        "mimetype": content_type,
+        "attempts": attempts,
+    }
+
+
+def _asset_cache_path() -> Path:
+    return Path(tempfile.gettempdir()) / "xiaoya-teacher-mcp-server" / ASSET_CACHE_NAME
+
+
+def load_asset_cache() -> dict[str, dict[str, Any]]:
+    """已上传的富文本资源: "账号标识:sha256" -> {quote_id, size, filename, uploaded_at}。"""
+    try:
+        data = json.loads(_asset_cache_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_asset_cache(cache: dict[str, dict[str, Any]]) -> None:
+    path = _asset_cache_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    temp.write_text(json.dumps(cache, ensure_ascii=False), encoding="utf-8")
+    os.replace(temp, path)
+
+
+def _update_asset_cache(key: str, entry: dict[str, Any] | None) -> None:
+    with _ASSET_CACHE_LOCK:
+        cache = load_asset_cache()
+        if entry is None:
+            cache.pop(key, None)
+        else:
+            cache[key] = entry
+        try:
+            save_asset_cache(cache)
+        except OSError:
+            pass  # 缓存只用于跳过重复上传, 写入失败不影响本次上传
+
+
+def _verify_asset_cache() -> bool:
+    return os.getenv(ASSET_CACHE_VERIFY_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _quote_resolves(quote_id: str, filename: str) -> bool:
+    """缓存的 quote_id 能否换到下载链接; 请求失败也按失效处理, 重新上传。"""
+    try:
+        response = get_json(
+            f"{DOWNLOAD_URL}/cloud/file_down/{quote_id}/v2?filename={quote(filename)}",
+            allow_http_error=True,
+        )
+    except APIRequestError:
+        return False
+    data = response.get("data")
+    return bool(response.get("success") and isinstance(data, dict) and data.get("download_url"))
+
+
+def _cached_quote_id(key: str, filename: str) -> str | None:
+    with _ASSET_CACHE_LOCK:
+        entry = load_asset_cache().get(key)
+    quote_id = str((entry or {}).get("quote_id") or "")
+    if not quote_id:
+        return None
+    if _verify_asset_cache() and not _quote_resolves(quote_id, filename):
+        _update_asset_cache(key, None)
+        return None
+    return quote_id
+
+
+def _upload_asset_file(
+    asset: dict[str, Any], file_path: Path, filename: str, cache_key: str | None
+) -> str:
+    uploaded = upload_file_to_oss(
+        file_path, filename, upload_id=str(asset.get("upload_id") or uuid.uuid4())
+    )
+    if cache_key:
+        _update_asset_cache(
+            cache_key,
+            {
+                "quote_id": uploaded["quote_id"],
+                "size": uploaded["size"],
+                "filename": filename,
+                "uploaded_at": datetime.now(UTC).isoformat(timespec="seconds"),
+            },
         )
-    response.raise_for_status()
+    return uploaded["quote_id"]
 
-    quote_id = _quote_id_from_upload(upload_response=response, multipart=multipart)
+
+def upload_rich_text_asset(asset: dict[str, Any]) -> dict[str, Any]:
+    """上传单个 Markdown 资源，返回可嵌入小雅富文本的文件信息。
+
+    同一账号上传过相同内容(sha256)的文件时直接复用缓存的 quote_id;
+    设置 XIAOYA_ASSET_CACHE_VERIFY=1 时复用前先确认该文件仍可访问。
+    """
+    file_path = Path(str(asset.get("file_path") or ""))
+    if not file_path.is_file():
+        raise FileNotFoundError(str(file_path))
+
+    filename = _asset_name(asset, file_path)
+    scope = auth_scope()
+    if scope:
+        cache_key = f"{scope}:{file_sha256(file_path)}"
+        with _ASSET_KEY_LOCKS[hash(cache_key) % ASSET_KEY_LOCK_STRIPES]:
+            quote_id = _cached_quote_id(cache_key, filename)
+            if quote_id is None:
+                quote_id = _upload_asset_file(asset, file_path, filename, cache_key)
+            else:
+                LOGGER.info("资源 %s 内容已上传过, 复用 quote_id %s", filename, quote_id)
+    else:
+        quote_id = _upload_asset_file(asset, file_path, filename, None)
     return {
         "id": str(asset["id"]),
         "type": str(asset["type"]),
@@ -109,13 +378,57 @@ def upload_rich_text_asset(asset: dict[str, Any]) -> dict[str, Any]:
     }
 
 
+def _timed_asset_upload(asset: dict[str, Any]) -> dict[str, Any]:
+    started = time.monotonic()
+    result = upload_rich_text_asset(asset)
+    elapsed = time.monotonic() - started
+    size = Path(str(asset.get("file_path"))).stat().st_size
+    throughput = round(size / elapsed) if elapsed > 0 else None
+    LOGGER.info(
+        "资源 %s 上传完成: %d 字节, 耗时 %.3fs, %s 字节/秒",
+        result["name"],
+        size,
+        elapsed,
+        throughput,
+    )
+    return {
+        **result,
+        "size": size,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_bytes_per_second": throughput,
+    }
+
+
 def upload_rich_text_assets(
     assets: list[dict[str, Any]] | None,
     referenced_ids: set[str],
+    *,
+    max_workers: int = ASSET_UPLOAD_WORKERS,
 ) -> dict[str, dict[str, Any]]:
-    """上传 Markdown 中引用到的 assets，返回 id 到上传结果的映射。"""
+    """并发上传 Markdown 中引用到的 assets，返回 id 到上传结果(含大小、耗时与吞吐)的映射。
+
+    所有资源都尝试上传后再报告失败, 错误信息逐个列出失败的资源及原因。
+    """
     asset_map = {str(asset.get("id")): asset for asset in assets or [] if asset.get("id")}
     missing = sorted(referenced_ids - set(asset_map))
     if missing:
         raise ValueError(f"Markdown asset 引用缺少对应资源: {', '.join(missing)}")
-    return {asset_id: upload_rich_text_asset(asset_map[asset_id]) for asset_id in referenced_ids}
+
+    asset_ids = sorted(referenced_ids)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(asset_ids)))) as executor:
+        futures = {
+            asset_id: executor.submit(copy_context().run, _timed_asset_upload, asset_map[asset_id])
+            for asset_id in asset_ids
+        }
+    results: dict[str, dict[str, Any]] = {}
+    failures: list[str] = []
+    for asset_id, future in futures.items():
+        try:
+            results[asset_id] = future.result()
+        except (APIRequestError, OSError, ValueError, requests.RequestException) as exc:
+            failures.append(f"{asset_id}({exc.__class__.__name__}: {exc})")
+    if failures:
+        raise APIRequestError(
+            f"{len(failures)}/{len(asset_ids)} 个资源上传失败: " + "; ".join(failures)
+        )
+    return results
@@ -1,5 +1,8 @@
 import json
 import os
+import sqlite3
+import threading
+import time
 import uuid
 
 import pytest
@@ -8,7 +11,15 @@ from pydantic import ValidationError
 
 from xiaoya_teacher_mcp_server.config import DOWNLOAD_URL
 from xiaoya_teacher_mcp_server.tools.group import query as group_query
-from xiaoya_teacher_mcp_server.tools.questions import create, delete, query, update
+from xiaoya_teacher_mcp_server.tools.questions import (
+    bank,
+    cache,
+    create,
+    delete,
+    normalize,
+    query,
+    update,
+)
 from xiaoya_teacher_mcp_server.tools.questions.normalize import parse_question
 from xiaoya_teacher_mcp_server.tools.resources import (
     create as resource_create,
@@ -684,7 +695,7 @@ def test_batch_create_questions_marks_partial_failure(monkeypatch):
 
     monkeypatch.setattr(create, "_create_choice_question", fake_create_choice_question)
 
-    result = create.batch_create_questions("paper-1", questions)
+    result = create.batch_create_questions("paper-1", questions, prefer_import=False)
 
     assert not result["success"]
     assert result["data"]["success_count"] == 1
@@ -695,6 +706,555 @@ def test_batch_create_questions_marks_partial_failure(monkeypatch):
     ]
 
 
+def test_batch_create_questions_runs_concurrently_and_restores_order(monkeypatch):
+    questions = [
+        ChoiceQuestion(
+            title=f"第{i}题",
+            description="desc",
+            options=[QuestionOption(text=t, answer=t == "A") for t in "ABCD"],
+            score=5,
+        )
+        for i in range(1, 6)
+    ]
+    lock = threading.Lock()
+    state = {"running": 0, "peak": 0}
+
+    def fake_create_choice_question(**kwargs):
+        title = kwargs["question"].title
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        # 前面的题耗时更长, 完成顺序与传入顺序相反
+        time.sleep(0.05 * (6 - int(title[1])))
+        with lock:
+            state["running"] -= 1
+        if title == "第3题":
+            return {"success": False, "message": "模拟失败"}
+        return {"success": True, "data": {"id": f"q{title[1]}"}}
+
+    reorders = []
+    monkeypatch.setattr(create, "_create_choice_question", fake_create_choice_question)
+    monkeypatch.setattr(
+        create,
+        "_fetch_paper_edit_buffer",
+        lambda group_id, paper_id: {"questions": [{"id": "old"}]},
+    )
+    monkeypatch.setattr(
+        create,
+        "update_paper_question_order",
+        lambda paper_id, question_ids: reorders.append(question_ids) or {"success": True},
+    )
+
+    result = create.batch_create_questions(
+        "paper-1", questions, group_id="group-1", prefer_import=False
+    )
+
+    assert state["peak"] > 1
+    assert reorders == [["old", "q1", "q2", "q4", "q5"]]
+    data = result["data"]
+    assert [item["index"] for item in data["success_items"]] == [1, 2, 4, 5]
+    assert data["failed_items"] == [
+        {"index": 3, "type": "单选题", "title": "第3题", "message": "模拟失败"}
+    ]
+    assert data["reordered"] is True
+
+
+def test_choice_question_sub_requests_run_concurrently_and_merge_options(monkeypatch):
+    question = ChoiceQuestion(
+        title="六选一",
+        description="desc",
+        options=[QuestionOption(text=f"选项{i}", answer=i == 5) for i in range(6)],
+        score=5,
+    )
+    lock = threading.Lock()
+    server = {f"item-{i}": {"value": "", "answer": False} for i in range(4)}
+    state = {"running": 0, "peak": 0}
+
+    def track(delay):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(delay)
+        with lock:
+            state["running"] -= 1
+
+    def snapshot():
+        return [
+            {"answer_item_id": item_id, "value": item["value"], "answer": item["answer"]}
+            for item_id, item in server.items()
+        ]
+
+    def fake_create_answer_item(paper_id, question_id):
+        with lock:
+            item_id = f"item-{len(server)}"
+            server[item_id] = {"value": "", "answer": False}
+        return {"id": item_id}
+
+    def fake_update_option(*, question_id, answer_item_id, option_text, is_answer, **kwargs):
+        # 先提交的选项更新更晚完成, 最后完成的响应里后面的选项还是旧值
+        track(0.01 * (6 - int(answer_item_id[-1])))
+        with lock:
+            server[answer_item_id] = {"value": option_text, "answer": is_answer}
+            return {"success": True, "data": snapshot()}
+
+    monkeypatch.setattr(
+        create,
+        "create_question_data",
+        lambda *args: {"id": "q1", "options": [{"answer_item_id": item_id} for item_id in server]},
+    )
+    monkeypatch.setattr(
+        create,
+        "update_question_base",
+        lambda **kwargs: track(0.05) or {"id": "q1", "title": "六选一"},
+    )
+    monkeypatch.setattr(create, "create_answer_item_data", fake_create_answer_item)
+    monkeypatch.setattr(create, "update_question_options", fake_update_option)
+
+    result = create.create_single_choice_question("paper-1", question, need_detail=True)
+
+    assert result["success"], result
+    assert state["peak"] > 1
+    assert result["data"]["options"] == [
+        {"answer_item_id": f"item-{i}", "value": f"选项{i}", "answer": i == 5} for i in range(6)
+    ]
+
+
+def test_batch_create_questions_routes_plain_questions_through_one_import(monkeypatch):
+    plain_options = [QuestionOption(text=t, answer=t == "B") for t in "ABCD"]
+    questions = [
+        ChoiceQuestion(title="纯文本单选", description="d", options=plain_options, score=5),
+        ChoiceQuestion(title_md="**加粗**单选", description="d", options=plain_options, score=5),
+        TrueFalseQuestion(title="纯文本判断", description="d", answer=False, score=2),
+        FillBlankQuestion(
+            title="1+1=____",
+            description="d",
+            options=[FillBlankAnswer(text="2")],
+            automatic_type=AutoScoreType.EXACT_ORDERED,
+            score=2,
+        ),
+        CodeQuestion(
+            title="两数之和",
+            description="d",
+            program_setting=ProgramSettingAllNeed(
+                language=[ProgrammingLanguage.PYTHON3], in_cases=[{"in": "1 2"}]
+            ),
+        ),
+    ]
+    imports, singles, reorders = [], [], []
+
+    def fake_post_json(url, *, payload=None, timeout=20, allow_http_error=False):
+        assert url.endswith("/survey/question/import")
+        imports.append(payload["questions"])
+        raw = []
+        for position, question in enumerate(payload["questions"]):
+            answers = {answer["standard_answer"] for answer in question["standard_answers"]}
+            items = [
+                {
+                    "id": f"i{position}{item['seqno']}",
+                    "seqno": item["seqno"],
+                    "value": item.get("context") or "",
+                    "answer": answer["standard_answer"],
+                    "answer_checked": 2 if item["seqno"] in answers else 1,
+                }
+                for item, answer in zip(
+                    question["answer_items"],
+                    question["standard_answers"] * len(question["answer_items"]),
+                    strict=False,
+                )
+            ]
+            raw.append(
+                {
+                    "id": f"imported-{position}",
+                    "type": question["type"],
+                    "title": question["title"],
+                    "description": question["description"],
+                    "score": question["score"],
+                    "required": 2,
+                    "answer_items_sort": "",
+                    "answer_items": items,
+                    "is_split_answer": False,
+                    "automatic_type": question.get("automatic_type", 1),
+                    "automatic_stat": 1,
+                }
+            )
+        return {"success": True, "data": raw}
+
+    def fake_single(paper_id, question, need_detail, need_parse):
+        singles.append(question.type)
+        return {"success": True, "data": {"id": f"single-{question.type}"}}
+
+    monkeypatch.setattr(create, "post_json", fake_post_json)
+    monkeypatch.setitem(create.QUESTION_HANDLERS, create.QuestionType.SINGLE_CHOICE, fake_single)
+    monkeypatch.setitem(create.QUESTION_HANDLERS, create.QuestionType.CODE, fake_single)
+    monkeypatch.setattr(
+        create, "_fetch_paper_edit_buffer", lambda group_id, paper_id: {"questions": []}
+    )
+    monkeypatch.setattr(
+        create,
+        "update_paper_question_order",
+        lambda paper_id, question_ids: reorders.append(question_ids) or {"success": True},
+    )
+    parsed = []
+    monkeypatch.setattr(create, "parse_question", lambda raw, parse_mode: parsed.append(raw))
+
+    result = create.batch_create_questions("paper-1", questions, group_id="group-1")
+
+    assert result["success"], result
+    assert parsed == [] and "questions" not in result["data"]
+    assert len(imports) == 1
+    assert [question["title"] for question in imports[0]] == [
+        "纯文本单选",
+        "纯文本判断",
+        "1+1=____",
+    ]
+    assert imports[0][0]["standard_answers"] == [{"seqno": "B", "standard_answer": "B"}]
+    assert imports[0][1]["standard_answers"] == [{"seqno": "A", "standard_answer": "B"}]
+    assert sorted(singles) == [1, 10]
+    assert result["data"]["imported_count"] == 3
+    assert reorders == [["imported-0", "single-1", "imported-1", "imported-2", "single-10"]]
+
+
+def test_import_batch_questions_falls_back_when_rollback_fails(monkeypatch):
+    entries = [
+        (1, TrueFalseQuestion(title="判断一", description="d", answer=True, score=2), None),
+        (2, TrueFalseQuestion(title="判断二", description="d", answer=False, score=2), None),
+    ]
+    monkeypatch.setattr(
+        create,
+        "import_office_questions",
+        lambda paper_id, questions: ([{"id": "q1"}, {"id": "q2"}], ["第2题答案不一致"]),
+    )
+    warnings = []
+    monkeypatch.setattr(
+        create.LOGGER, "warning", lambda message, *args: warnings.append(message % args)
+    )
+
+    def failing_delete(paper_id, question_ids):
+        raise create.APIRequestError("删除请求失败")
+
+    monkeypatch.setattr(create, "delete_questions", failing_delete)
+    assert create._import_batch_questions("paper-1", entries, False) is None
+    assert "q1, q2" in warnings[-1]
+
+    monkeypatch.setattr(
+        create,
+        "delete_questions",
+        lambda paper_id, question_ids: {
+            "success": False,
+            "data": {"failed_items": [{"question_id": "q2", "message": "失败"}]},
+        },
+    )
+    assert create._import_batch_questions("paper-1", entries, False) is None
+    assert warnings[-1].endswith(": q2")
+
+
+def test_clone_paper_questions_imports_plain_questions_and_reuses_quote_ids(monkeypatch):
+    image_title = {
+        "blocks": [
+            {"key": "a", "text": "看图作答", "type": "unstyled", "inlineStyleRanges": []},
+            {
+                "key": "b",
+                "text": " ",
+                "type": "atomic",
+                "data": {"type": "IMAGE", "src": f"{DOWNLOAD_URL}/cloud/file_access/quote-9"},
+            },
+        ],
+        "entityMap": {},
+    }
+    source = {
+        "random": 1,
+        "question_random": 1,
+        "id": "src",
+        "paper_id": "src",
+        "title": "源试卷",
+        "updated_at": "2026-03-09T00:00:00Z",
+        "questions": [
+            {
+                "id": "q1",
+                "type": 1,
+                "title": '{"blocks":[{"text":"纯文本单选"}],"entityMap":{}}',
+                "description": "",
+                "score": 5,
+                "required": 2,
+                "answer_items": [
+                    {"id": f"q1{seqno}", "value": seqno, "answer_checked": 2 if seqno == "C" else 1}
+                    for seqno in "ABCD"
+                ],
+            },
+            {
+                "id": "q2",
+                "type": 5,
+                "title": "判断",
+                "description": "d",
+                "score": 2,
+                "required": 2,
+                "answer_items": [
+                    {"id": "q2a", "seqno": "A", "answer_checked": 1},
+                    {"id": "q2b", "seqno": "B", "answer_checked": 2},
+                ],
+            },
+            {
+                "id": "q3",
+                "type": 6,
+                "title": json.dumps(image_title, ensure_ascii=False),
+                "description": "d",
+                "score": 10,
+                "required": 2,
+                "answer_items": [{"id": "q3a", "answer": "参考答案"}],
+            },
+            {
+                "id": "q4",
+                "type": 10,
+                "title": "两数之和",
+                "description": "d",
+                "score": 10,
+                "required": 2,
+                "answer_items": [
+                    {"id": "q4a", "answer": '[{"id": "use_case_0", "in": "1 2", "out": "3"}]'}
+                ],
+                "program_setting": {
+                    "id": "ps",
+                    "language": ["python3"],
+                    "example_language": "python3",
+                    "example_code": "print(sum(map(int, input().split())))",
+                    "max_memory": 5000,
+                },
+            },
+        ],
+    }
+    monkeypatch.setattr(
+        query, "get_json", lambda *args, **kwargs: {"success": True, "data": source}
+    )
+    imports, singles = [], []
+
+    def fake_post_json(url, *, payload=None, timeout=20, allow_http_error=False):
+        assert url.endswith("/survey/question/import")
+        imports.append(payload)
+        imported = []
+        for position, question in enumerate(payload["questions"]):
+            answers = {answer["standard_answer"] for answer in question["standard_answers"]}
+            items = [
+                {
+                    "id": f"i{item['seqno']}",
+                    "seqno": item["seqno"],
+                    "answer_checked": 2 if item["seqno"] in answers else 1,
+                }
+                for item in question["answer_items"]
+            ]
+            imported.append(
+                {"id": f"new-{position}", "type": question["type"], "answer_items": items}
+            )
+        return {"success": True, "data": imported}
+
+    def fake_single(paper_id, question, need_detail, need_parse):
+        singles.append(question)
+        return {"success": True, "data": {"id": f"single-{question.type}"}}
+
+    monkeypatch.setattr(create, "post_json", fake_post_json)
+    monkeypatch.setitem(create.QUESTION_HANDLERS, create.QuestionType.SHORT_ANSWER, fake_single)
+    monkeypatch.setitem(create.QUESTION_HANDLERS, create.QuestionType.CODE, fake_single)
+
+    result = create.clone_paper_questions("group-1", "src", "target")
+
+    assert result["success"], result
+    assert result["data"]["imported_count"] == 2
+    assert len(imports) == 1 and imports[0]["paper_id"] == "target"
+    single, true_false = imports[0]["questions"]
+    assert single["title"] == "纯文本单选" and single["description"] == ""
+    assert single["standard_answers"] == [{"seqno": "C", "standard_answer": "C"}]
+    assert true_false["standard_answers"] == [{"seqno": "A", "standard_answer": "B"}]
+    short_answer, code = singles
+    assert short_answer.title_raw == image_title
+    assert short_answer.answer == "参考答案"
+    assert code.program_setting.code_answer.startswith("print")
+    assert code.program_setting.in_cases == [{"in": "1 2"}]
+    assert [item["question_id"] for item in result["data"]["success_items"]] == [
+        "new-0",
+        "new-1",
+        "single-6",
+        "single-10",
+    ]
+
+
+def test_clone_paper_questions_keeps_three_option_choice_questions(monkeypatch):
+    bold = {
+        "blocks": [
+            {
+                "key": "a",
+                "text": "加粗",
+                "type": "unstyled",
+                "inlineStyleRanges": [{"offset": 0, "length": 2, "style": "BOLD"}],
+            }
+        ],
+        "entityMap": {},
+    }
+
+    def choice(question_id, values):
+        return {
+            "id": question_id,
+            "type": 1,
+            "title": f"三选一{question_id}",
+            "description": "",
+            "score": 5,
+            "required": 2,
+            "answer_items": [
+                {"id": f"{question_id}{index}", "value": value, "answer_checked": 2 - (index > 0)}
+                for index, value in enumerate(values)
+            ],
+        }
+
+    source = {
+        "id": "src",
+        "paper_id": "src",
+        "questions": [
+            choice("q1", ["甲", "乙", "丙"]),
+            choice("q2", [json.dumps(bold, ensure_ascii=False), "乙", "丙"]),
+        ],
+    }
+    monkeypatch.setattr(
+        query, "get_json", lambda *args, **kwargs: {"success": True, "data": source}
+    )
+    imports, deleted = [], []
+
+    def fake_post_json(url, *, payload=None, timeout=20, allow_http_error=False):
+        imports.append(payload)
+        return {
+            "success": True,
+            "data": [
+                {
+                    "id": "new-q1",
+                    "type": 1,
+                    "answer_items": [
+                        {"id": f"i{seqno}", "seqno": seqno, "answer_checked": 2 - (seqno != "A")}
+                        for seqno in "ABC"
+                    ],
+                }
+            ],
+        }
+
+    monkeypatch.setattr(create, "post_json", fake_post_json)
+    monkeypatch.setattr(
+        create,
+        "create_question_data",
+        lambda *args: {"id": "new-q2", "options": [{"answer_item_id": f"d{i}"} for i in range(4)]},
+    )
+    monkeypatch.setattr(create, "update_question_base", lambda **kwargs: {"id": "new-q2"})
+    monkeypatch.setattr(
+        create,
+        "update_question_options",
+        lambda *, answer_item_id, **kwargs: {
+            "success": True,
+            "data": [{"answer_item_id": f"d{i}"} for i in range(4)],
+        },
+    )
+    monkeypatch.setattr(
+        create,
+        "delete_answer_item_data",
+        lambda paper_id, question_id, item_id: deleted.append((question_id, item_id)),
+    )
+
+    result = create.clone_paper_questions("group-1", "src", "target")
+
+    assert result["success"], result
+    imported = imports[0]["questions"]
+    assert len(imported) == 1 and len(imported[0]["answer_items"]) == 3
+    assert imported[0]["description"] == ""
+    # 带格式的三选项题逐题创建, 删去新题多出来的第 4 个默认选项
+    assert deleted == [("new-q2", "d3")]
+
+
+def test_question_bank_indexes_papers_incrementally_and_searches(monkeypatch, tmp_path):
+    def choice(question_id, title, options, question_type=1):
+        return {
+            "id": question_id,
+            "type": question_type,
+            "title": title,
+            "description": "",
+            "score": 5,
+            "required": 2,
+            "answer_items_sort": "",
+            "answer_items": [
+                {"id": f"{question_id}{index}", "value": text, "answer_checked": 1}
+                for index, text in enumerate(options)
+            ],
+        }
+
+    items = [
+        {"id": "f1", "parent_id": "g1", "name": "第一章", "type": 1, "updated_at": "t1"},
+        {"id": "a1", "parent_id": "f1", "name": "作业一", "type": 7, "quote_id": "p1"},
+        {"id": "a2", "parent_id": "f1", "name": "作业二", "type": 7, "quote_id": "p2"},
+        {"id": "r1", "parent_id": "f1", "name": "讲义.pdf", "type": 6, "quote_id": "p9"},
+    ]
+    for item in items[1:]:
+        item["updated_at"] = "t1"
+    papers = {
+        "p1": [choice("q1", "二叉树的前序遍历顺序是", ["根左右", "左根右"])],
+        "p2": [
+            choice("q2", "Python 中 list.sort() 的时间复杂度", ["O(n log n)", "O(n)"]),
+            choice("q3", "下列属于线性结构的是", ["栈", "二叉树"], question_type=2),
+        ],
+    }
+    fetched = []
+
+    def fake_get_json(url, params=None, **kwargs):
+        fetched.append(params["paper_id"])
+        return {
+            "success": True,
+            "data": {
+                "updated_at": f"edited-{len(fetched)}",
+                "questions": papers[params["paper_id"]],
+            },
+        }
+
+    monkeypatch.setenv("XIAOYA_MIRROR_DIR", str(tmp_path))
+    monkeypatch.delenv("XIAOYA_OFFLINE", raising=False)
+    monkeypatch.setattr(
+        resource_query,
+        "_fetch_course_resources_response",
+        lambda group_id: {"success": True, "data": [dict(item) for item in items]},
+    )
+    monkeypatch.setattr(query, "get_json", fake_get_json)
+    # 开启试卷缓存: 建索引必须绕过缓存拉取最新题目
+    cache.PAPER_CACHE.clear()
+    monkeypatch.setattr(cache, "auth_scope", lambda: "account-a")
+
+    assert bank.search_question_bank("g1", "二叉树")["success"] is False
+    first = bank.index_question_bank("g1")
+    assert first["success"], first
+    assert sorted(fetched) == ["p1", "p2"]
+    assert first["data"]["question_count"] == 3
+
+    hits = bank.search_question_bank("g1", "二叉树")["data"]
+    assert [hit["question_id"] for hit in hits] == ["q1", "q3"]
+    assert hits[0]["paper_name"] == "作业一" and hits[0]["file_path"] == "第一章/作业一"
+    assert hits[0]["options"] == ["根左右", "左根右"]
+    assert hits[0]["paper_updated_at"].startswith("edited-")
+    assert [hit["question_id"] for hit in bank.search_question_bank("g1", "sor")["data"]] == ["q2"]
+    multiple = bank.search_question_bank("g1", "二叉树", question_type=2)["data"]
+    assert [hit["question_id"] for hit in multiple] == ["q3"]
+
+    fetched.clear()
+    items[1]["updated_at"] = "t2"
+    papers["p1"] = [choice("q1", "图的深度优先遍历", ["栈", "队列"])]
+    del items[2]
+    second = bank.index_question_bank("g1")["data"]
+
+    assert fetched == ["p1"]
+    assert (second["indexed_count"], second["skipped_count"], second["removed_count"]) == (1, 0, 1)
+    assert bank.search_question_bank("g1", "二叉树")["data"] == []
+    hits = bank.search_question_bank("g1", "栈")["data"]
+    assert [hit["question_id"] for hit in hits] == ["q1"]
+    assert hits[0]["paper_updated_at"] == "edited-1"
+
+    def broken_count(self):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(bank.QuestionBankDB, "question_count", broken_count)
+    failed = bank.index_question_bank("g1")
+    assert failed["success"] is False and "database is locked" in failed["message"]
+    cache.PAPER_CACHE.clear()
+
+
 def test_delete_questions_returns_failed_items(monkeypatch):
     def fake_post_json(url, *, payload=None, timeout=20, allow_http_error=False):
         if payload["question_id"] == "q1":
@@ -878,6 +1438,165 @@ def test_query_paper_defaults_to_summary(monkeypatch):
     }
 
 
+def test_query_paper_full_renders_each_rich_text_field_once(monkeypatch):
+    questions = [
+        {
+            "id": f"question-{index}",
+            "title": f"题目{index}",
+            "description": "",
+            "type": question_type,
+            "score": score,
+            "required": 1,
+            "answer_items_sort": "",
+            "answer_items": [
+                {"id": f"q{index}-a", "value": "A", "answer_checked": 2},
+                {"id": f"q{index}-b", "value": "B", "answer_checked": 1},
+            ],
+        }
+        for index, question_type, score in [(1, 1, 5), (2, 2, 3)]
+    ]
+    paper = {
+        "random": 1,
+        "question_random": 1,
+        "id": "paper-id",
+        "paper_id": "paper-id",
+        "title": "练习",
+        "updated_at": "2026-03-09T00:00:00Z",
+        "questions": questions,
+    }
+    monkeypatch.setattr(query, "get_json", lambda *args, **kwargs: {"success": True, "data": paper})
+    rendered = []
+    original = normalize.render_rich_text_output
+    monkeypatch.setattr(
+        normalize,
+        "render_rich_text_output",
+        lambda value, parse_mode: rendered.append(value) or original(value, parse_mode),
+    )
+
+    result = query.query_paper("group-1", "paper-1", detail_level="full")
+
+    assert result["success"]
+    assert sorted(rendered) == sorted(["题目1", "题目2", "A", "B", "A", "B"])
+    assert result["data"]["question_count"] == 2
+    assert result["data"]["total_score"] == 8
+    assert result["data"]["type_counts"] == {"单选题": 1, "多选题": 1}
+    assert [question["title"] for question in result["data"]["questions"]] == ["题目1", "题目2"]
+    assert result["data"]["questions"][0]["options"][0]["answer_item_id"] == "q1-a"
+
+
+def test_query_paper_serves_cached_copy_updated_by_mutation_tools(monkeypatch):
+    def raw_question(question_id, checked):
+        return {
+            "id": question_id,
+            "title": f"题目{question_id[-1]}",
+            "description": "",
+            "type": 1,
+            "score": 5,
+            "required": 1,
+            "answer_items_sort": "",
+            "answer_items": [
+                {"id": f"{question_id}-a", "value": "A", "answer_checked": checked},
+                {"id": f"{question_id}-b", "value": "B", "answer_checked": 3 - checked},
+            ],
+        }
+
+    fetches = []
+    account = {"scope": "account-a"}
+
+    def fake_get_json(url, params=None, **kwargs):
+        fetches.append((account["scope"], params["paper_id"]))
+        return {
+            "success": True,
+            "data": {
+                "random": 1,
+                "question_random": 1,
+                "id": "paper-1",
+                "paper_id": "paper-1",
+                "title": "练习",
+                "updated_at": "2026-03-09T00:00:00Z",
+                "questions": [raw_question("question-1", 2), raw_question("question-2", 2)],
+            },
+        }
+
+    def fake_update_post_json(url, payload=None, **kwargs):
+        if url.endswith("/survey/updateQuestion"):
+            return {"success": True, "data": {**raw_question("question-1", 2), "score": 8}}
+        if url.endswith("/survey/updateAnswerItem"):
+            return {"success": True, "data": raw_question("question-1", 1)["answer_items"]}
+        if url.endswith("/survey/moveQuestion"):
+            return {
+                "success": True,
+                "data": {
+                    "id": "paper-1",
+                    "updated_at": "2026-03-10T00:00:00Z",
+                    "questions_sort": ",".join(payload["question_ids"]),
+                },
+            }
+        raise AssertionError(url)
+
+    cache.PAPER_CACHE.clear()
+    monkeypatch.setattr(cache, "auth_scope", lambda: account["scope"])
+    monkeypatch.setattr(query, "get_json", fake_get_json)
+    monkeypatch.setattr(update, "post_json", fake_update_post_json)
+    monkeypatch.setattr(delete, "post_json", lambda *args, **kwargs: {"success": True})
+
+    assert query.query_paper_summary("group-1", "paper-1")["data"]["question_count"] == 2
+    assert update.update_question("question-1", score=8)["success"]
+    assert update.update_question_options("question-1", "question-1-b", is_answer=True)["success"]
+    assert update.update_paper_question_order("paper-1", ["question-2", "question-1"])["success"]
+
+    paper = query.query_paper("group-1", "paper-1", detail_level="full")["data"]
+    assert fetches == [("account-a", "paper-1")]
+    assert [question["id"] for question in paper["questions"]] == ["question-2", "question-1"]
+    assert paper["questions"][1]["score"] == 8
+    assert [option["answer"] for option in paper["questions"][1]["options"]] == ["错误", "正确"]
+
+    assert delete.delete_questions("paper-1", ["question-2"])["success"]
+    assert query.query_paper_summary("group-1", "paper-1")["data"]["question_count"] == 1
+    assert len(fetches) == 1
+
+    account["scope"] = "account-b"
+    assert query.query_paper_summary("group-1", "paper-1")["data"]["question_count"] == 2
+    account["scope"] = "account-a"
+    assert query.query_paper_summary("group-1", "paper-1", refresh=True)["success"]
+    assert fetches[1:] == [("account-b", "paper-1"), ("account-a", "paper-1")]
+
+    # 服务端返回的题目集合与缓存对不上时丢弃缓存, 下次查询重新拉取
+    order = ["question-3", "question-2", "question-1"]
+    assert update.update_paper_question_order("paper-1", order)["success"]
+    query.query_paper_summary("group-1", "paper-1")
+    assert len(fetches) == 4
+    cache.PAPER_CACHE.clear()
+
+
+@pytest.mark.parametrize(
+    "mutate",
+    [
+        lambda paper_cache: paper_cache.apply_question({"id": "q9", "paper_id": "paper-1"}),
+        lambda paper_cache: paper_cache.apply_answer_items("q9", []),
+        lambda paper_cache: paper_cache.invalidate_question("q9"),
+        lambda paper_cache: paper_cache.apply_question_order("paper-1", ["q1"]),
+        lambda paper_cache: paper_cache.remove_questions("paper-1", ["q1"]),
+    ],
+)
+def test_paper_cache_skips_fetch_overlapping_write_to_uncached_paper(monkeypatch, mutate):
+    paper_cache = cache.PaperCache()
+    monkeypatch.setattr(cache, "auth_scope", lambda: "account-a")
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        if len(fetches) == 1:
+            # 拉取进行中, 另一工具修改了这份(尚未缓存的)试卷
+            mutate(paper_cache)
+        return {"questions": [{"id": "q1"}], "version": len(fetches)}
+
+    assert paper_cache.load("paper-1", fetch)["version"] == 1
+    assert paper_cache.load("paper-1", fetch)["version"] == 2
+    assert paper_cache.load("paper-1", fetch)["version"] == 2
+    assert len(fetches) == 2
+
+
 def test_configure_paper_basics_updates_required_and_randomization(monkeypatch):
     captured = {}
 
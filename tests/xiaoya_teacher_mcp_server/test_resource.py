@@ -1,5 +1,10 @@
+import hashlib
+import json
 import os
+import threading
+import time
 import uuid
+from types import SimpleNamespace
 
 import pytest
 from dotenv import find_dotenv, load_dotenv
@@ -11,12 +16,17 @@ from xiaoya_teacher_mcp_server.tools.resources import (
 from xiaoya_teacher_mcp_server.tools.resources import (
     delete as resource_delete,
 )
+from xiaoya_teacher_mcp_server.tools.resources import layout as resource_layout
+from xiaoya_teacher_mcp_server.tools.resources import markdown as resource_markdown
 from xiaoya_teacher_mcp_server.tools.resources import (
     query as resource_query,
 )
+from xiaoya_teacher_mcp_server.tools.resources import search as resource_search
+from xiaoya_teacher_mcp_server.tools.resources import sync as resource_sync
 from xiaoya_teacher_mcp_server.tools.resources import (
     update as resource_update,
 )
+from xiaoya_teacher_mcp_server.tools.resources.normalize import CourseResourceIndex
 from xiaoya_teacher_mcp_server.types import ResourceType
 
 load_dotenv(find_dotenv())
@@ -293,6 +303,432 @@ def test_fetch_download_response_does_not_send_app_authorization(monkeypatch):
     assert captured["headers"] == {"User-Agent": resource_query.HEADERS["User-Agent"]}
 
 
+class StreamingResponse:
+    def __init__(self, body, status_code=200, fail_after=None, headers=None):
+        self.body = body
+        self.status_code = status_code
+        self.fail_after = fail_after
+        self.headers = {"Content-Type": "video/mp4", **(headers or {})}
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), 4):
+            if self.fail_after is not None and start >= self.fail_after:
+                raise resource_query.requests.ConnectionError("reset")
+            yield self.body[start : start + 4]
+
+    def close(self):
+        return None
+
+
+def test_download_file_streams_to_part_file_and_resumes(monkeypatch, tmp_path):
+    body = b"0123456789abcdefghij"
+    target = tmp_path / "lecture.mp4"
+    calls = []
+
+    def fake_fetch(paper_id, filename, *, stream, range_start=0, if_range=None):
+        calls.append((range_start, if_range))
+        if len(calls) == 1:
+            return StreamingResponse(body, fail_after=8, headers={"ETag": '"v1"'})
+        return StreamingResponse(
+            body[range_start:],
+            status_code=206,
+            headers={"Content-Range": f"bytes {range_start}-{len(body) - 1}/{len(body)}"},
+        )
+
+    monkeypatch.setattr(resource_query, "_fetch_download_response", fake_fetch)
+
+    first = resource_query.download_file("paper-1", "lecture.mp4", str(target))
+    assert first["success"] is False
+    assert not target.exists()
+    assert (tmp_path / "lecture.mp4.part").read_bytes() == body[:8]
+
+    second = resource_query.download_file("paper-1", "lecture.mp4", str(target))
+    assert second["success"] is True
+    assert calls == [(0, None), (8, '"v1"')]
+    assert target.read_bytes() == body
+    assert not (tmp_path / "lecture.mp4.part").exists()
+    assert not (tmp_path / "lecture.mp4.part.validator").exists()
+    assert second["data"]["resumed_from"] == 8
+    assert second["data"]["size"] == len(body)
+    assert second["data"]["sha256"] == hashlib.sha256(body).hexdigest()
+    assert "throughput_bytes_per_second" in second["data"]
+
+
+def test_download_file_restarts_when_server_ignores_range(monkeypatch, tmp_path):
+    body = b"fresh-content"
+    (tmp_path / "slides.pdf.part").write_bytes(b"stale")
+    monkeypatch.setattr(
+        resource_query,
+        "_fetch_download_response",
+        lambda paper_id, filename, *, stream, range_start=0, if_range=None: StreamingResponse(body),
+    )
+
+    response = resource_query.download_file("paper-1", "slides.pdf", str(tmp_path))
+
+    assert response["success"] is True
+    assert (tmp_path / "slides.pdf").read_bytes() == body
+    assert response["data"]["resumed_from"] == 0
+    assert response["data"]["sha256"] == hashlib.sha256(body).hexdigest()
+
+
+@pytest.mark.parametrize(
+    "resume_response",
+    [
+        # 服务端文件已变化, If-Range 不匹配时返回完整新内容
+        lambda body: StreamingResponse(body, headers={"ETag": '"v2"'}),
+        # 返回的区间起点与已写入字节数不符
+        lambda body: StreamingResponse(
+            body[2:], status_code=206, headers={"Content-Range": f"bytes 2-12/{len(body)}"}
+        ),
+    ],
+)
+def test_download_file_restarts_when_upstream_changed(monkeypatch, tmp_path, resume_response):
+    body = b"new-content"
+    (tmp_path / "slides.pdf.part").write_bytes(b"old-c")
+    (tmp_path / "slides.pdf.part.validator").write_text('"v1"', encoding="utf-8")
+    calls = []
+
+    def fake_fetch(paper_id, filename, *, stream, range_start=0, if_range=None):
+        calls.append((range_start, if_range))
+        if range_start:
+            return resume_response(body)
+        return StreamingResponse(body, headers={"ETag": '"v2"'})
+
+    monkeypatch.setattr(resource_query, "_fetch_download_response", fake_fetch)
+
+    response = resource_query.download_file("paper-1", "slides.pdf", str(tmp_path))
+
+    assert response["success"] is True
+    assert calls[0] == (5, '"v1"')
+    assert (tmp_path / "slides.pdf").read_bytes() == body
+    assert response["data"]["resumed_from"] == 0
+    assert response["data"]["sha256"] == hashlib.sha256(body).hexdigest()
+
+
+def test_download_resource_folder_mirrors_tree_and_skips_unchanged(monkeypatch, tmp_path):
+    items = [
+        {"id": "f1", "parent_id": "g1", "name": "第一章", "type": 1},
+        {"id": "f2", "parent_id": "f1", "name": "实验", "type": 1},
+        {"id": "r1", "parent_id": "f1", "name": "讲义.pdf", "type": 6, "quote_id": "p1"},
+        {"id": "r2", "parent_id": "f1", "name": "讲义.pdf", "type": 6, "quote_id": "p2"},
+        {"id": "r3", "parent_id": "f2", "name": "a/b.mp4", "type": 9, "quote_id": "p3"},
+        {"id": "n1", "parent_id": "f1", "name": "笔记", "type": 2},
+        {"id": "r4", "parent_id": "g1", "name": "课外.pdf", "type": 6, "quote_id": "p4"},
+    ]
+    for item in items:
+        item["updated_at"] = "2026-01-01"
+    fetched = []
+
+    def fake_fetch(paper_id, filename, *, stream, range_start=0, if_range=None):
+        fetched.append(paper_id)
+        return StreamingResponse(f"{paper_id}:{filename}".encode())
+
+    monkeypatch.setattr(
+        resource_query, "_load_course_resource_index", lambda group_id: CourseResourceIndex(items)
+    )
+    monkeypatch.setattr(resource_query, "_fetch_download_response", fake_fetch)
+
+    first = resource_query.download_resource_folder("g1", "f1", str(tmp_path))
+
+    assert first["success"] is True
+    assert sorted(fetched) == ["p1", "p2", "p3"]
+    assert (tmp_path / "讲义.pdf").read_bytes() == "p1:讲义.pdf".encode()
+    assert (tmp_path / "讲义_r2.pdf").read_bytes() == "p2:讲义.pdf".encode()
+    assert (tmp_path / "实验" / "a_b.mp4").exists()
+    assert first["data"]["downloaded_count"] == 3
+
+    fetched.clear()
+    items[2]["updated_at"] = "2026-02-01"
+    second = resource_query.download_resource_folder("g1", "f1", str(tmp_path))
+
+    assert second["success"] is True
+    assert fetched == ["p1"]
+    assert second["data"]["skipped_count"] == 2
+    assert second["data"]["downloaded"] == [
+        {"relative_path": "讲义.pdf", "size": len("p1:讲义.pdf".encode())}
+    ]
+
+
+class CountingConverter:
+    def __init__(self):
+        self.paths = []
+
+    def convert(self, path):
+        self.paths.append(path)
+        return SimpleNamespace(text_content=f"# {path.read_bytes().decode()}")
+
+
+def test_read_file_by_markdown_reuses_cache_for_local_and_course_files(monkeypatch, tmp_path):
+    converter = CountingConverter()
+    cache = resource_markdown.MarkdownCache(tmp_path / "cache", "markitdown-test")
+    monkeypatch.setattr(resource_markdown, "get_converter", lambda: converter)
+    monkeypatch.setattr(resource_query, "default_markdown_cache", lambda: cache)
+    fetched = []
+
+    def fake_fetch(paper_id, filename, *, stream, range_start=0, if_range=None):
+        fetched.append(paper_id)
+        return StreamingResponse(b"slides")
+
+    monkeypatch.setattr(resource_query, "_fetch_download_response", fake_fetch)
+    local = tmp_path / "slides.pptx"
+    local.write_bytes(b"slides")
+
+    first = resource_query.read_file_by_markdown(file_path=str(local))
+    second = resource_query.read_file_by_markdown(file_path=str(local))
+    remote = resource_query.read_file_by_markdown(paper_id="p1", filename="slides.pptx")
+    remote_again = resource_query.read_file_by_markdown(paper_id="p1", filename="slides.pptx")
+
+    assert first["data"] == {
+        "content": "# slides",
+        "sha256": hashlib.sha256(b"slides").hexdigest(),
+        "cached": False,
+    }
+    assert second["data"]["cached"] is True
+    assert remote["data"]["cached"] is True
+    assert remote_again["data"]["content"] == "# slides"
+    assert len(converter.paths) == 1
+    assert fetched == ["p1"]
+    assert not list((cache.dir / "downloads").iterdir())
+
+    local.write_bytes(b"changed")
+    changed = resource_query.read_file_by_markdown(file_path=str(local))
+    assert changed["data"] == {
+        "content": "# changed",
+        "sha256": hashlib.sha256(b"changed").hexdigest(),
+        "cached": False,
+    }
+
+
+def test_markdown_download_path_keeps_extension_of_cjk_filenames(tmp_path):
+    cache = resource_markdown.MarkdownCache(tmp_path / "cache", "markitdown-test")
+
+    first = cache.download_path("p1\n讲义.pdf", "讲义.pdf")
+    second = cache.download_path("p1\n作业.pdf", "作业.pdf")
+
+    assert first.suffix == ".pdf" and second.suffix == ".pdf"
+    assert first != second
+    assert cache.download_path("p1\n讲义.pdf", "讲义.pdf") != first
+    assert cache.download_path("p2\n数据", "数据").suffix == ""
+
+
+class ThreadConversionWorker:
+    """用线程代替转换子进程, 让测试里的 monkeypatch 转换器生效。"""
+
+    killed = []
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.outcome = None
+
+    def send(self, file_path):
+        def run():
+            try:
+                self.outcome = ("ok", resource_markdown.convert_path_to_markdown(file_path))
+            except Exception as exc:
+                self.outcome = ("error", f"{type(exc).__name__}: {exc}")
+            self.done.set()
+
+        self.done.clear()
+        threading.Thread(target=run, daemon=True).start()
+
+    def wait(self, timeout):
+        return self.done.wait(timeout)
+
+    def receive(self):
+        if self.outcome == ("ok", "# crash"):
+            raise EOFError
+        return self.outcome
+
+    def kill(self):
+        self.killed.append(self)
+
+
+def test_batch_read_files_by_markdown_times_out_single_file(monkeypatch, tmp_path):
+    release = threading.Event()
+
+    class BlockingConverter(CountingConverter):
+        def convert(self, path):
+            if path.read_bytes() == b"broken":
+                release.wait(5)
+            return super().convert(path)
+
+    cache = resource_markdown.MarkdownCache(tmp_path / "cache", "markitdown-test")
+    monkeypatch.setattr(resource_markdown, "get_converter", lambda: BlockingConverter())
+    monkeypatch.setattr(resource_markdown, "ConversionWorker", ThreadConversionWorker)
+    monkeypatch.setattr(resource_markdown, "_CONVERSION_SLOTS", threading.BoundedSemaphore(2))
+    monkeypatch.setattr(resource_markdown, "_IDLE_WORKERS", [])
+    monkeypatch.setattr(ThreadConversionWorker, "killed", [])
+    monkeypatch.setattr(resource_query, "default_markdown_cache", lambda: cache)
+    monkeypatch.setattr(
+        resource_query,
+        "_fetch_download_response",
+        lambda paper_id, filename, *, stream, range_start=0, if_range=None: StreamingResponse(
+            paper_id.encode()
+        ),
+    )
+    local = tmp_path / "notes.docx"
+    local.write_bytes(b"notes")
+
+    try:
+        response = resource_query.batch_read_files_by_markdown(
+            [
+                resource_query.MarkdownSource(paper_id="broken", filename="broken.pdf"),
+                resource_query.MarkdownSource(file_path=str(local)),
+                resource_query.MarkdownSource(paper_id="crash", filename="crash.pdf"),
+                resource_query.MarkdownSource(paper_id="p2", filename="deck.pptx"),
+            ],
+            timeout_seconds=0.3,
+        )
+    finally:
+        release.set()
+
+    assert response["success"] is False
+    data = response["data"]
+    assert data["success_count"] == 2
+    assert data["partial_success"] is True
+    assert [item.get("content") for item in data["results"]] == [None, "# notes", None, "# p2"]
+    failures = {item["paper_id"]: item["message"] for item in data["failed_items"]}
+    assert "转换超时" in failures["broken"]
+    assert "子进程意外退出" in failures["crash"]
+    assert not list((cache.dir / "downloads").iterdir())
+    # 只终止超时和退出的两个子进程, 其余子进程回到空闲列表供下一批复用
+    assert len(ThreadConversionWorker.killed) == 2
+    assert not set(map(id, ThreadConversionWorker.killed)) & set(
+        map(id, resource_markdown._IDLE_WORKERS)
+    )
+
+    again = resource_query.batch_read_files_by_markdown(
+        [resource_query.MarkdownSource(paper_id="p3", filename="next.pdf")]
+    )
+    assert again["success"] is True
+    assert again["data"]["results"][0]["content"] == "# p3"
+
+
+def test_batch_read_files_by_markdown_downloads_and_converts_duplicates_once(monkeypatch, tmp_path):
+    converter = CountingConverter()
+    cache = resource_markdown.MarkdownCache(tmp_path / "cache", "markitdown-test")
+    monkeypatch.setattr(resource_markdown, "get_converter", lambda: converter)
+    monkeypatch.setattr(resource_markdown, "ConversionWorker", ThreadConversionWorker)
+    monkeypatch.setattr(resource_markdown, "_IDLE_WORKERS", [])
+    monkeypatch.setattr(resource_query, "default_markdown_cache", lambda: cache)
+    fetched = []
+    lock = threading.Lock()
+
+    def fake_fetch(paper_id, filename, *, stream, range_start=0, if_range=None):
+        with lock:
+            fetched.append(paper_id)
+        return StreamingResponse(b"slides")
+
+    monkeypatch.setattr(resource_query, "_fetch_download_response", fake_fetch)
+    sources = [
+        resource_query.MarkdownSource(paper_id="p1", filename="slides.pptx"),
+        resource_query.MarkdownSource(paper_id="p1", filename="slides.pptx"),
+        resource_query.MarkdownSource(paper_id="p2", filename="copy.pptx"),
+    ]
+
+    response = resource_query.batch_read_files_by_markdown(sources)
+
+    assert response["success"] is True
+    assert [item["content"] for item in response["data"]["results"]] == ["# slides"] * 3
+    assert sorted(fetched) == ["p1", "p2"]
+    assert len(converter.paths) == 1
+    assert not list((cache.dir / "downloads").iterdir())
+    again = resource_query.batch_read_files_by_markdown([sources[2]])
+    assert again["data"]["results"][0]["cached"] is True
+
+
+def test_batch_read_files_by_markdown_fails_only_items_whose_cache_write_fails(
+    monkeypatch, tmp_path
+):
+    cache = resource_markdown.MarkdownCache(tmp_path / "cache", "markitdown-test")
+    cache.put(hashlib.sha256(b"slides").hexdigest(), "# slides")
+    original_link = cache.link
+
+    def flaky_link(ref_key, content_hash):
+        if ref_key.startswith("p1\n"):
+            raise OSError("磁盘已满")
+        original_link(ref_key, content_hash)
+
+    monkeypatch.setattr(cache, "link", flaky_link)
+    monkeypatch.setattr(resource_query, "default_markdown_cache", lambda: cache)
+    monkeypatch.setattr(
+        resource_query,
+        "_fetch_download_response",
+        lambda paper_id, filename, *, stream, range_start=0, if_range=None: StreamingResponse(
+            b"slides"
+        ),
+    )
+
+    response = resource_query.batch_read_files_by_markdown(
+        [
+            resource_query.MarkdownSource(paper_id="p1", filename="a.pptx"),
+            resource_query.MarkdownSource(paper_id="p2", filename="b.pptx"),
+        ]
+    )
+
+    results = response["data"]["results"]
+    assert [item["success"] for item in results] == [False, True]
+    assert results[0]["message"] == "磁盘已满"
+    assert results[1]["cached"] is True
+
+
+def test_markdown_cache_writes_bytes_matching_outline_offsets(tmp_path):
+    cache = resource_markdown.MarkdownCache(tmp_path / "cache", "markitdown-test")
+    text = "引言\r\n\n# 第一章\n正文\n"
+    cache.put("hash", text)
+
+    assert cache.entry_path("hash").read_bytes() == text.encode("utf-8")
+    assert cache.get("hash") == text
+    outline = cache.outline("hash")
+    assert outline["size"] == len(text.encode("utf-8"))
+    offset = outline["headings"][0]["offset"]
+    assert cache.entry_path("hash").read_bytes()[offset:].startswith("# 第一章".encode())
+
+
+def test_read_file_by_markdown_serves_outline_pages_sections_and_ranges(monkeypatch, tmp_path):
+    document = (
+        "# 第一章 绪论\n\n引言内容\n\n## 1.1 背景\n\n背景内容\n```\n# 不是标题\n```\n\f"
+        "# 第二章 方法\n\n方法内容\n\f"
+    )
+
+    class DocumentConverter:
+        def convert(self, path):
+            return SimpleNamespace(text_content=document)
+
+    cache = resource_markdown.MarkdownCache(tmp_path / "cache", "markitdown-test")
+    monkeypatch.setattr(resource_markdown, "get_converter", lambda: DocumentConverter())
+    monkeypatch.setattr(resource_query, "default_markdown_cache", lambda: cache)
+    local = tmp_path / "book.pdf"
+    local.write_bytes(b"%PDF")
+
+    outline = resource_query.read_file_by_markdown(file_path=str(local), view="outline")["data"]
+    assert "content" not in outline
+    assert outline["page_count"] == 2
+    assert [(item["title"], item["level"], item["page"]) for item in outline["outline"]] == [
+        ("第一章 绪论", 1, 1),
+        ("1.1 背景", 2, 1),
+        ("第二章 方法", 1, 2),
+    ]
+
+    page = resource_query.read_file_by_markdown(file_path=str(local), view="page", page=2)
+    assert page["data"]["content"] == "# 第二章 方法\n\n方法内容\n\f"
+    assert page["data"]["next_offset"] is None
+
+    section = resource_query.read_file_by_markdown(file_path=str(local), view="section", section=0)
+    assert section["data"]["content"].startswith("# 第一章 绪论")
+    assert "第二章" not in section["data"]["content"]
+
+    first = resource_query.read_file_by_markdown(
+        file_path=str(local), view="range", offset=3, length=256
+    )["data"]
+    assert first["offset"] == 2
+    assert first["content"] == document[2 : 2 + len(first["content"])]
+    assert first["next_offset"] is None
+
+    invalid = resource_query.read_file_by_markdown(file_path=str(local), view="page", page=3)
+    assert invalid["success"] is False
+
+
 def test_query_course_resources_defaults_to_summary(monkeypatch):
     monkeypatch.setattr(
         resource_query,
@@ -329,44 +765,46 @@ def test_query_course_resources_defaults_to_summary(monkeypatch):
 def test_query_resource_folder_snapshot(monkeypatch):
     monkeypatch.setattr(
         resource_query,
-        "_load_course_resource_map",
-        lambda *args, **kwargs: {
-            "folder-1": {
-                "id": "folder-1",
-                "parent_id": "root",
-                "name": "课堂作业",
-                "type_name": "文件夹",
-                "sort_position": 0,
-                "public": 2,
-                "download": 1,
-                "published": 1,
-                "finish_teaching": 0,
-            },
-            "node-1": {
-                "id": "node-1",
-                "parent_id": "folder-1",
-                "paper_id": "paper-1",
-                "name": "练习1",
-                "type_name": "作业",
-                "sort_position": 2,
-                "public": 2,
-                "download": 2,
-                "published": 1,
-                "finish_teaching": 0,
-            },
-            "node-2": {
-                "id": "node-2",
-                "parent_id": "folder-1",
-                "paper_id": None,
-                "name": "讲义",
-                "type_name": "文件",
-                "sort_position": 1,
-                "public": 1,
-                "download": 1,
-                "published": 1,
-                "finish_teaching": 1,
-            },
-        },
+        "_load_course_resource_index",
+        lambda *args, **kwargs: CourseResourceIndex(
+            [
+                {
+                    "id": "folder-1",
+                    "parent_id": "root",
+                    "name": "课堂作业",
+                    "type": 1,
+                    "sort_position": 0,
+                    "public": 2,
+                    "download": 1,
+                    "published": 1,
+                    "finish_teaching": 0,
+                },
+                {
+                    "id": "node-1",
+                    "parent_id": "folder-1",
+                    "quote_id": "paper-1",
+                    "name": "练习1",
+                    "type": 7,
+                    "sort_position": 2,
+                    "public": 2,
+                    "download": 2,
+                    "published": 1,
+                    "finish_teaching": 0,
+                },
+                {
+                    "id": "node-2",
+                    "parent_id": "folder-1",
+                    "quote_id": None,
+                    "name": "讲义",
+                    "type": 6,
+                    "sort_position": 1,
+                    "public": 1,
+                    "download": 1,
+                    "published": 1,
+                    "finish_teaching": 1,
+                },
+            ]
+        ),
     )
 
     result = resource_query.query_resource_folder_snapshot("group-1", "folder-1")
@@ -376,6 +814,77 @@ def test_query_resource_folder_snapshot(monkeypatch):
     assert [item["id"] for item in result["data"]["children"]] == ["node-2", "node-1"]
 
 
+def _synthetic_course(folder_count: int, files_per_folder: int) -> list[dict]:
+    items = [{"id": "root", "parent_id": "group-1", "name": "root", "type": 1, "sort_position": 0}]
+    for folder_index in range(folder_count):
+        folder_id = f"folder-{folder_index}"
+        items.append(
+            {
+                "id": folder_id,
+                "parent_id": "root",
+                "name": f"第{folder_index}周",
+                "type": 1,
+                "sort_position": folder_count - folder_index,
+            }
+        )
+        items.extend(
+            {
+                "id": f"{folder_id}-file-{file_index}",
+                "parent_id": folder_id,
+                "name": f"课件{file_index}.pdf",
+                "type": 6 if file_index % 2 else 7,
+                "sort_position": file_index,
+            }
+            for file_index in range(files_per_folder)
+        )
+    return items
+
+
+def test_course_resource_index_paths_children_and_types_on_large_course():
+    items = _synthetic_course(folder_count=100, files_per_folder=100)
+    index = CourseResourceIndex(items)
+
+    assert len(index) == 10101
+    assert index.file_path("folder-7-file-3") == "root/第7周/课件3.pdf"
+    assert [child["id"] for child in index.children("root")][:2] == ["folder-99", "folder-98"]
+    assert len(index.of_type(7, detail_level="summary")) == 5000
+    assert index.resource_map()["folder-0-file-0"]["file_path"] == "root/第0周/课件0.pdf"
+
+    tree = index.tree()
+    assert [node["id"] for node in tree] == ["root"]
+    assert len(tree[0]["children"]) == 100
+    assert len(tree[0]["children"][0]["children"]) == 100
+
+
+def test_course_resource_index_on_50k_node_course():
+    items = _synthetic_course(folder_count=250, files_per_folder=200)
+    index = CourseResourceIndex(items)
+
+    assert len(index) == 50251
+    assert index.file_path("folder-249-file-199") == "root/第249周/课件199.pdf"
+    assert len(index.children("folder-3")) == 200
+    assert len(index.of_type(6, detail_level="summary")) == 25000
+    paths = index.resource_map()
+    assert len(paths) == 50251
+    assert paths["folder-0-file-1"]["file_path"] == "root/第0周/课件1.pdf"
+
+
+def test_course_resource_index_handles_deep_chains_and_cycles():
+    depth = 5000
+    items = [
+        {"id": f"n{i}", "parent_id": f"n{i - 1}" if i else "group-1", "name": "d", "type": 1}
+        for i in range(depth)
+    ]
+    items += [
+        {"id": "a", "parent_id": "b", "name": "a", "type": 1},
+        {"id": "b", "parent_id": "a", "name": "b", "type": 1},
+    ]
+    index = CourseResourceIndex(items)
+
+    assert index.file_path(f"n{depth - 1}").count("/") == depth - 1
+    assert index.file_path("a") == "b/a"
+
+
 def test_batch_update_resource_download_returns_failed_items(monkeypatch):
     def fake_post_json(url, *, payload=None, timeout=20, allow_http_error=False):
         if payload["node_id"] == "node-1":
@@ -392,3 +901,346 @@ def test_batch_update_resource_download_returns_failed_items(monkeypatch):
     assert result["data"]["partial_success"] is True
     assert result["data"]["success_ids"] == ["node-1"]
     assert result["data"]["failed_items"] == [{"node_id": "node-2", "message": "无权限"}]
+
+
+def test_batch_update_resource_visibility_sends_one_id_per_request(monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def fake_post_json(url, *, payload=None, timeout=20, allow_http_error=False):
+        with lock:
+            calls.append(payload["activity_node_ids"])
+        if payload["activity_node_ids"] == "node-7":
+            return {"success": False, "msg": "资源不存在"}
+        return {"success": True, "data": None}
+
+    monkeypatch.setattr(resource_update, "post_json", fake_post_json)
+    node_ids = [f"node-{index}" for index in range(10)]
+
+    result = resource_update.batch_update_resource_visibility("group-1", node_ids, 2)
+
+    assert result["data"]["success_ids"] == [node_id for node_id in node_ids if node_id != "node-7"]
+    assert result["data"]["failed_items"] == [{"node_id": "node-7", "message": "资源不存在"}]
+    assert sorted(calls) == sorted(node_ids)
+
+
+def test_create_resource_tree_creates_levels_and_sorts_each_folder_once(monkeypatch):
+    created = []
+    sorts = {}
+    lock = threading.Lock()
+
+    def fake_post_json(url, *, payload=None, timeout=20, allow_http_error=False):
+        if url.endswith("/resource/sortNode"):
+            order = [item["node_id"] for item in json.loads(payload["sort_content"])]
+            with lock:
+                sorts[order[-1]] = order
+            return {"success": True, "data": []}
+        if payload["name"] == "坏文件夹":
+            return {"success": False, "msg": "名称重复"}
+        # 各请求耗时不同, 打乱完成顺序
+        time.sleep(0.01 * (5 - len(created) % 5))
+        node_id = f"{payload['parent_id']}/{payload['name']}"
+        with lock:
+            created.append(payload)
+        return {"success": True, "data": {"id": node_id, "name": payload["name"], "type": 1}}
+
+    monkeypatch.setattr(resource_create, "post_json", fake_post_json)
+    monkeypatch.setattr(resource_update, "post_json", fake_post_json)
+    monkeypatch.setattr(
+        resource_create,
+        "_load_course_resource_index",
+        lambda group_id: CourseResourceIndex([{"id": "old", "parent_id": "root", "name": "x"}]),
+    )
+    tree = [
+        resource_create.ResourceTreeNode(
+            name=f"第{week}周",
+            children=[
+                resource_create.ResourceTreeNode(name="讲义"),
+                resource_create.ResourceTreeNode(name="作业", type=ResourceType.ASSIGNMENT),
+            ],
+        )
+        for week in (1, 2)
+    ] + [
+        resource_create.ResourceTreeNode(
+            name="坏文件夹", children=[resource_create.ResourceTreeNode(name="不会创建")]
+        )
+    ]
+
+    result = resource_create.create_resource_tree("group-1", "root", tree)
+
+    assert result["success"] is False
+    data = result["data"]
+    assert data["created_count"] == 6
+    assert data["failed_items"] == [{"path": "坏文件夹", "message": "名称重复"}]
+    assert [node["name"] for node in data["tree"]] == ["第1周", "第2周"]
+    assert [node["name"] for node in data["tree"][0]["children"]] == ["讲义", "作业"]
+    assert {payload["parent_id"] for payload in created} == {"root", "root/第1周", "root/第2周"}
+    assert sorts == {
+        "root/第2周": ["old", "root/第1周", "root/第2周"],
+        "root/第1周/作业": ["root/第1周/讲义", "root/第1周/作业"],
+        "root/第2周/作业": ["root/第2周/讲义", "root/第2周/作业"],
+    }
+
+
+@pytest.mark.parametrize(
+    ("parent_id", "message"), [("missing", "父资源不存在"), ("l1", "父资源不是文件夹")]
+)
+def test_apply_resource_layout_rejects_invalid_parent_before_planning(
+    monkeypatch, parent_id, message
+):
+    items = [
+        {"id": "w1", "parent_id": "g1", "name": "第1周", "type": 1},
+        {"id": "l1", "parent_id": "w1", "name": "讲义", "type": 6},
+    ]
+    monkeypatch.setattr(
+        resource_layout, "_load_course_resource_index", lambda group_id: CourseResourceIndex(items)
+    )
+    monkeypatch.setattr(
+        resource_layout,
+        "_add_resource",
+        lambda *args, **kwargs: pytest.fail("计划阶段就应拒绝, 不应发送请求"),
+    )
+
+    result = resource_layout.apply_resource_layout(
+        "g1", parent_id, [resource_layout.ResourceLayoutNode(name="实验")], dry_run=False
+    )
+
+    assert result["success"] is False
+    assert message in result["message"]
+
+
+def test_apply_resource_layout_plans_minimal_operations_and_applies_in_order(monkeypatch):
+    items = [
+        {"id": "w1", "parent_id": "g1", "name": "第1周", "type": 1, "sort_position": 0},
+        {"id": "m1", "parent_id": "g1", "name": "杂项", "type": 1, "sort_position": 1},
+        {"id": "l1", "parent_id": "w1", "name": "讲义", "type": 6, "public": 1},
+        {"id": "h1", "parent_id": "w1", "name": "旧作业", "type": 7, "sort_position": 1},
+        {"id": "x1", "parent_id": "m1", "name": "习题.pdf", "type": 6},
+    ]
+    monkeypatch.setattr(
+        resource_layout, "_load_course_resource_index", lambda group_id: CourseResourceIndex(items)
+    )
+    layout = [
+        resource_layout.ResourceLayoutNode(
+            name="第1周",
+            children=[
+                resource_layout.ResourceLayoutNode(name="讲义", type=ResourceType.FILE, public=2),
+                resource_layout.ResourceLayoutNode(id="x1", name="习题集.pdf", type=6),
+                resource_layout.ResourceLayoutNode(
+                    name="实验", children=[resource_layout.ResourceLayoutNode(name="实验一")]
+                ),
+            ],
+        ),
+        resource_layout.ResourceLayoutNode(id="m1", name="杂项"),
+    ]
+
+    plan = resource_layout.apply_resource_layout("g1", "g1", layout, delete_missing=True)["data"]
+
+    assert plan["dry_run"] is True
+    operations = plan["operations"]
+    assert [(item["path"], item["depth"]) for item in operations["create"]] == [
+        ("第1周/实验", 0),
+        ("第1周/实验/实验一", 1),
+    ]
+    assert operations["rename"] == [
+        {"node_id": "x1", "name": "习题集.pdf", "path": "第1周/习题集.pdf"}
+    ]
+    assert operations["move"] == [{"node_ids": ["x1"], "from_parent_id": "m1", "parent_id": "w1"}]
+    assert operations["visibility"] == [{"pub": 2, "node_ids": ["l1"]}]
+    assert [item["parent_id"] for item in operations["sort"]] == ["w1"]
+    assert operations["delete"] == [{"node_id": "h1", "path": "第1周/旧作业", "moved_out_ids": []}]
+    assert plan["request_count"] == 7
+    assert plan["rounds"] == 5
+
+    calls = []
+    lock = threading.Lock()
+
+    def fake_post_json(url, *, payload=None, timeout=20, allow_http_error=False):
+        endpoint = url.rsplit("/resource/", 1)[1]
+        with lock:
+            calls.append((endpoint, payload))
+        if endpoint == "addResource":
+            return {"success": True, "data": {"id": f"id-{payload['name']}", "type": 1}}
+        return {"success": True, "data": []}
+
+    for module in (resource_create, resource_update, resource_delete):
+        monkeypatch.setattr(module, "post_json", fake_post_json)
+
+    result = resource_layout.apply_resource_layout(
+        "g1", "g1", layout, dry_run=False, delete_missing=True
+    )
+
+    assert result["success"] is True
+    assert result["data"]["success_counts"]["create"] == 2
+    endpoints = [endpoint for endpoint, _ in calls]
+    assert endpoints[:2] == ["addResource", "addResource"]
+    assert calls[1][1]["parent_id"] == "id-实验"
+    assert endpoints[-2:] == ["sortNode", "delResource"]
+    sort_payload = json.loads(calls[-2][1]["sort_content"])
+    assert [item["node_id"] for item in sort_payload] == ["l1", "x1", "id-实验"]
+
+
+def test_apply_resource_layout_keeps_folder_when_claimed_child_not_moved(monkeypatch):
+    items = [
+        {"id": "o1", "parent_id": "g1", "name": "旧目录", "type": 1},
+        {"id": "f1", "parent_id": "o1", "name": "讲义.pdf", "type": 6},
+    ]
+    monkeypatch.setattr(
+        resource_layout, "_load_course_resource_index", lambda group_id: CourseResourceIndex(items)
+    )
+    layout = [
+        resource_layout.ResourceLayoutNode(
+            name="新目录",
+            children=[resource_layout.ResourceLayoutNode(id="f1", name="讲义.pdf", type=6)],
+        )
+    ]
+    calls = []
+
+    def fake_post_json(url, *, payload=None, timeout=20, allow_http_error=False):
+        endpoint = url.rsplit("/resource/", 1)[1]
+        calls.append(endpoint)
+        if endpoint == "addResource":
+            return {"success": False, "message": "创建失败"}
+        return {"success": True, "data": []}
+
+    for module in (resource_create, resource_update, resource_delete):
+        monkeypatch.setattr(module, "post_json", fake_post_json)
+
+    result = resource_layout.apply_resource_layout(
+        "g1", "g1", layout, dry_run=False, delete_missing=True
+    )
+
+    assert result["success"] is False
+    assert "delResource" not in calls
+    failed = {item["op"]: item for item in result["data"]["failed_items"]}
+    assert failed["move"]["node_ids"] == ["f1"]
+    assert failed["delete"]["node_id"] == "o1"
+    assert "f1" in failed["delete"]["message"]
+
+
+def test_sync_course_resources_reports_changes_and_serves_offline(monkeypatch, tmp_path):
+    items = [
+        {"id": "f1", "parent_id": "g1", "name": "第一章", "type": 1, "updated_at": "t1"},
+        {"id": "r1", "parent_id": "f1", "name": "讲义.pdf", "type": 6, "quote_id": "p1"},
+        {"id": "r2", "parent_id": "f1", "name": "旧资料.pdf", "type": 6, "quote_id": "p2"},
+    ]
+    items[1]["updated_at"] = items[2]["updated_at"] = "t1"
+    bodies = {"p1": b"v1", "p2": b"old"}
+    fetched = []
+
+    def fake_fetch(paper_id, filename, *, stream, range_start=0, if_range=None):
+        fetched.append(paper_id)
+        return StreamingResponse(bodies[paper_id])
+
+    monkeypatch.setenv("XIAOYA_MIRROR_DIR", str(tmp_path))
+    monkeypatch.delenv("XIAOYA_OFFLINE", raising=False)
+    monkeypatch.setattr(
+        resource_query,
+        "_fetch_course_resources_response",
+        lambda group_id: {"success": True, "data": [dict(item) for item in items]},
+    )
+    monkeypatch.setattr(resource_query, "_fetch_download_response", fake_fetch)
+
+    first = resource_sync.sync_course_resources("g1")["data"]
+    assert [item["id"] for item in first["added"]] == ["f1", "r1", "r2"]
+    chapter_dir = tmp_path / "g1" / "files" / "第一章"
+    assert (chapter_dir / "旧资料.pdf").read_bytes() == b"old"
+
+    fetched.clear()
+    items[1].update(name="讲义v2.pdf", updated_at="t2")
+    bodies["p1"] = b"v2"
+    del items[2]
+    second = resource_sync.sync_course_resources("g1")["data"]
+
+    assert fetched == ["p1"]
+    assert second["added"] == []
+    assert second["changed"] == [
+        {
+            "id": "r1",
+            "name": "讲义v2.pdf",
+            "type": "文件",
+            "file_path": "第一章/讲义v2.pdf",
+            "fields": ["file_path", "name", "updated_at"],
+        }
+    ]
+    assert [item["id"] for item in second["removed"]] == ["r2"]
+    assert [item["id"] for item in second["content_changed"]] == ["r1"]
+    assert [path.name for path in chapter_dir.iterdir()] == ["讲义v2.pdf"]
+
+    def offline_fetch(group_id):
+        raise AssertionError("offline mode must not call the API")
+
+    monkeypatch.setenv("XIAOYA_OFFLINE", "1")
+    monkeypatch.setattr(resource_query, "_fetch_course_resources_response", offline_fetch)
+    offline = resource_query.query_resource_attributes("g1", "r1")
+    assert offline["data"]["file_path"] == "第一章/讲义v2.pdf"
+    assert resource_sync.sync_course_resources("g1")["success"] is False
+
+    # 写操作即使在离线模式下也按线上资源树做规划, 不读可能过期的镜像
+    items.append({"id": "f2", "parent_id": "g1", "name": "第二章", "type": 1})
+    monkeypatch.setattr(
+        resource_query,
+        "_fetch_course_resources_response",
+        lambda group_id: {"success": True, "data": [dict(item) for item in items]},
+    )
+    plan = resource_layout.apply_resource_layout(
+        "g1",
+        "g1",
+        [
+            resource_layout.ResourceLayoutNode(name="第一章"),
+            resource_layout.ResourceLayoutNode(name="第二章"),
+        ],
+    )["data"]
+    assert plan["operations"]["create"] == []
+
+
+def test_search_course_resources_matches_cjk_prefix_and_fuzzy(monkeypatch):
+    items = [
+        {"id": "root", "parent_id": "group-1", "name": "root", "type": 1, "sort_position": 0},
+        {"id": "week-1", "parent_id": "root", "name": "第一周", "type": 1, "sort_position": 0},
+        {"id": "deck", "parent_id": "week-1", "name": "Linux实验课件.pptx", "type": 6},
+        {"id": "quiz", "parent_id": "week-1", "name": "课堂测验", "type": 7, "quote_id": "p-1"},
+        {"id": "notes", "parent_id": "root", "name": "Python 笔记", "type": 2},
+    ]
+    monkeypatch.setattr(
+        resource_query,
+        "_fetch_course_resources_response",
+        lambda group_id: {"success": True, "data": items},
+    )
+    monkeypatch.setattr(resource_search, "_SEARCH_INDEXES", {})
+
+    result = resource_query.search_course_resources("group-1", "实验课件")
+    assert result["success"]
+    assert result["data"][0]["id"] == "deck"
+    assert result["data"][0]["file_path"] == "root/第一周/Linux实验课件.pptx"
+
+    assert [
+        item["id"] for item in resource_query.search_course_resources("group-1", "第一周")["data"]
+    ][:1] == ["week-1"]
+    assert resource_query.search_course_resources("group-1", "lin")["data"][0]["id"] == "deck"
+    assert resource_query.search_course_resources("group-1", "pyhton")["data"][0]["id"] == "notes"
+    quizzes = resource_query.search_course_resources("group-1", "课", type_val=7)["data"]
+    assert [item["id"] for item in quizzes] == ["quiz"]
+
+
+def test_resource_search_index_updates_only_changed_nodes():
+    items = [
+        {"id": "root", "parent_id": "group-1", "name": "root", "type": 1},
+        {"id": "week-1", "parent_id": "root", "name": "第一周", "type": 1},
+        {"id": "deck", "parent_id": "week-1", "name": "课件.pptx", "type": 6},
+        {"id": "old", "parent_id": "root", "name": "旧资料", "type": 6},
+    ]
+    search_index = resource_search.ResourceSearchIndex()
+    assert search_index.update(CourseResourceIndex(items)) == {
+        "added": 4,
+        "changed": 0,
+        "removed": 0,
+    }
+
+    renamed = [dict(item) for item in items[:3]]
+    renamed[1]["name"] = "第二周"
+    stats = search_index.update(CourseResourceIndex(renamed))
+
+    assert stats == {"added": 0, "changed": 2, "removed": 1}
+    assert search_index.search("旧资料") == []
+    assert search_index.search("第二周 课件")[0]["file_path"] == "root/第二周/课件.pptx"
@@ -0,0 +1,104 @@
+import os
+import time
+
+import pytest
+
+from xiaoya_teacher_mcp_server.utils import rich_text
+
+requires_benchmark = pytest.mark.skipif(
+    not os.getenv("XIAOYA_BENCHMARK"), reason="设置 XIAOYA_BENCHMARK=1 运行富文本微基准"
+)
+
+STYLED_LINE = "已知 **函数** `f(x)=x²` 在 *区间* [0, 1] 上 <u>单调递增</u>, 求 __最值__ 😀; "
+CODE_LINE = "调用 `list.sort()` 与 `sorted(items, key=len)` 的区别, 以及 `*args`/`**kwargs`; "
+UNMATCHED_LINE = "a*b_c`d**e__f<u>g * 2 ** 3 _ x "
+
+
+def _question_corpus(count: int) -> list[str]:
+    """模拟常见题面: 带样式的中文题干、行内代码、代码块、列表选项和很长的单行。"""
+    corpus = []
+    for index in range(count):
+        corpus.append(
+            "\n".join(
+                [
+                    f"## 第{index}题",
+                    STYLED_LINE * 3,
+                    CODE_LINE * 2,
+                    "```python",
+                    "def solve(items):",
+                    "    return sorted(items, key=lambda item: (-item[1], item[0]))",
+                    "```",
+                    "- 选项 **A**: `O(n)`",
+                    "- 选项 *B*: `O(n log n)`",
+                    "> 提示: <u>注意稳定性</u>",
+                    STYLED_LINE * 40,
+                ]
+            )
+        )
+    return corpus
+
+
+def _best_of(runs: int, func, *args) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+@requires_benchmark
+@pytest.mark.parametrize("line", [STYLED_LINE, CODE_LINE, UNMATCHED_LINE])
+def test_inline_markdown_parser_scales_linearly(line):
+    short = _best_of(5, rich_text._parse_inline_markdown, line * 100)
+    long = _best_of(5, rich_text._parse_inline_markdown, line * 1600)
+    print(f"\n{line[:12]!r}: x100 {short * 1e3:.2f}ms, x1600 {long * 1e3:.2f}ms")
+    assert long < short * 16 * 3
+
+
+@requires_benchmark
+def test_markdown_to_rich_text_raw_question_corpus_throughput():
+    corpus = _question_corpus(200)
+    size = sum(len(markdown) for markdown in corpus)
+    elapsed = _best_of(3, lambda: [rich_text.markdown_to_rich_text_raw(md) for md in corpus])
+    print(f"\n{len(corpus)} 题 / {size} 字符: {elapsed * 1e3:.1f}ms, {size / elapsed:,.0f} 字符/秒")
+
+
+def _styled_block(repeat: int) -> dict:
+    text, ranges = rich_text._parse_inline_markdown(STYLED_LINE * repeat)
+    return {"type": "unstyled", "text": text, "inlineStyleRanges": ranges}
+
+
+@requires_benchmark
+def test_apply_inline_markdown_scales_linearly_with_ranges():
+    short_block, long_block = _styled_block(100), _styled_block(1600)
+    short = _best_of(5, rich_text._markdown_for_text_block, short_block)
+    long = _best_of(5, rich_text._markdown_for_text_block, long_block)
+    print(
+        f"\n{len(short_block['inlineStyleRanges'])} 个区间 {short * 1e3:.2f}ms, "
+        f"{len(long_block['inlineStyleRanges'])} 个区间 {long * 1e3:.2f}ms"
+    )
+    assert long < short * 16 * 3
+
+
+@requires_benchmark
+def test_rich_text_to_markdown_question_corpus_throughput():
+    documents = [rich_text.markdown_to_rich_text_raw(md) for md in _question_corpus(200)]
+    elapsed = _best_of(3, lambda: [rich_text.rich_text_to_markdown_document(d) for d in documents])
+    print(f"\n{len(documents)} 题 Draft.js -> Markdown: {elapsed * 1e3:.1f}ms")
+
+
+@requires_benchmark
+def test_class_preview_renders_each_distinct_document_once():
+    documents = [rich_text.markdown_to_rich_text_raw(md) for md in _question_corpus(20)]
+    rich_text._render_memoized.cache_clear()
+
+    def preview_class(students: int) -> None:
+        for _ in range(students):
+            for document in documents:
+                rich_text.render_rich_text_output(document, "markdown")
+
+    elapsed = _best_of(1, preview_class, 50)
+    stats = rich_text.rich_text_memo_stats()
+    print(f"\n50 名学生 x {len(documents)} 题: {elapsed * 1e3:.1f}ms, 命中率 {stats['hit_rate']}")
+    assert stats["misses"] == len(documents)
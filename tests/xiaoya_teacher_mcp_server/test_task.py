@@ -8,6 +8,7 @@ from dotenv import find_dotenv, load_dotenv
 
 from xiaoya_teacher_mcp_server.config import DOWNLOAD_URL
 from xiaoya_teacher_mcp_server.tools.group import query as group_query
+from xiaoya_teacher_mcp_server.tools.resources.normalize import CourseResourceIndex
 from xiaoya_teacher_mcp_server.tools.task import grade as task_grade
 from xiaoya_teacher_mcp_server.tools.task import query as task_query
 
@@ -102,23 +103,31 @@ def test_query_group_discussion_task_detail(monkeypatch):
 def test_query_group_tasks_defaults_to_summary(monkeypatch):
     monkeypatch.setattr(
         task_query,
-        "_load_course_resource_map",
-        lambda *args, **kwargs: {
-            "node-1": {
-                "id": "node-1",
-                "name": "课堂作业",
-                "type": 7,
-                "paper_id": "paper-1",
-                "link_tasks": [
-                    {
-                        "task_id": "task-1",
-                        "publish_id": "publish-1",
-                        "start_time": "2026-03-09 08:00:00",
-                        "end_time": "2026-03-09 10:00:00",
-                    }
-                ],
-            }
-        },
+        "_load_course_resource_index",
+        lambda *args, **kwargs: CourseResourceIndex(
+            [
+                {
+                    "id": "folder-1",
+                    "name": "资料",
+                    "type": 1,
+                },
+                {
+                    "id": "node-1",
+                    "parent_id": "folder-1",
+                    "name": "课堂作业",
+                    "type": 7,
+                    "quote_id": "paper-1",
+                    "link_tasks": [
+                        {
+                            "task_id": "task-1",
+                            "paper_publish_id": "publish-1",
+                            "start_time": "2026-03-09 08:00:00",
+                            "end_time": "2026-03-09 10:00:00",
+                        }
+                    ],
+                },
+            ]
+        ),
     )
 
     result = task_query.query_group_tasks("group-1")
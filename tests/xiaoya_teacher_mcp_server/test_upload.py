@@ -1,9 +1,12 @@
+import threading
 from pathlib import Path
 
 import pytest
+import requests
 
 from xiaoya_teacher_mcp_server.config import DOWNLOAD_URL
 from xiaoya_teacher_mcp_server.utils import upload
+from xiaoya_teacher_mcp_server.utils.client import APIRequestError
 
 
 class DummyUploadResponse:
@@ -81,6 +84,88 @@ def test_upload_rich_text_asset_uses_xiaoya_web_flow(monkeypatch, tmp_path):
     }
 
 
+def test_large_upload_retries_from_file_start_after_connection_error(monkeypatch, tmp_path):
+    source = tmp_path / "video.mp4"
+    source.write_bytes(b"0123456789" * 5)
+    bodies = []
+
+    def fake_post(url, *, data=None, headers=None, timeout=None):
+        bodies.append(data.read())
+        if len(bodies) == 1:
+            raise requests.ConnectionError("connection reset")
+        return DummyUploadResponse({"id": "quote-big"})
+
+    monkeypatch.setattr(upload, "STREAM_UPLOAD_THRESHOLD", 0)
+    monkeypatch.setattr(upload.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(
+        upload,
+        "post_json",
+        lambda url, *, payload=None: {"success": True, "data": {"multipart": {"x:id": "q"}}},
+    )
+    monkeypatch.setattr(upload.requests, "post", fake_post)
+
+    result = upload.upload_file_to_oss(source, "video.mp4", bucket_url="https://oss.test")
+
+    assert result["quote_id"] == "quote-big"
+    assert result["attempts"] == 2
+    assert len(bodies) == 2 and len(bodies[0]) == len(bodies[1])
+    assert all(b"0123456789" * 5 in body for body in bodies)
+
+    rejected = requests.Response()
+    rejected.status_code = 403
+    bodies.clear()
+
+    def forbidden_post(url, *, data=None, headers=None, timeout=None):
+        bodies.append(data.read())
+        raise requests.HTTPError(response=rejected)
+
+    monkeypatch.setattr(upload.requests, "post", forbidden_post)
+    with pytest.raises(requests.HTTPError):
+        upload.upload_file_to_oss(source, "video.mp4", bucket_url="https://oss.test")
+    assert len(bodies) == 1
+
+
+def test_upload_rich_text_asset_reuses_cached_quote_per_account(monkeypatch, tmp_path):
+    first = tmp_path / "diagram.png"
+    copy = tmp_path / "diagram-copy.png"
+    first.write_bytes(b"png-bytes")
+    copy.write_bytes(b"png-bytes")
+    account = {"scope": "account-a"}
+    uploads = []
+
+    def fake_upload_file_to_oss(file_path, filename, *, upload_id=None):
+        uploads.append((account["scope"], filename))
+        return {"quote_id": f"quote-{len(uploads)}", "size": 9, "mimetype": "image/png"}
+
+    monkeypatch.setattr(upload, "auth_scope", lambda: account["scope"])
+    monkeypatch.setattr(upload, "_asset_cache_path", lambda: tmp_path / "assets.json")
+    monkeypatch.setattr(upload, "upload_file_to_oss", fake_upload_file_to_oss)
+
+    def upload_asset(path):
+        return upload.upload_rich_text_asset(
+            {"id": "img", "type": "image", "name": path.name, "file_path": str(path)}
+        )
+
+    assert upload_asset(first)["quote_id"] == "quote-1"
+    reused = upload_asset(copy)
+    assert reused["quote_id"] == "quote-1"
+    assert reused["name"] == "diagram-copy.png"
+    assert uploads == [("account-a", "diagram.png")]
+
+    account["scope"] = "account-b"
+    assert upload_asset(copy)["quote_id"] == "quote-2"
+
+    monkeypatch.setenv(upload.ASSET_CACHE_VERIFY_ENV, "1")
+    monkeypatch.setattr(
+        upload, "get_json", lambda url, **kwargs: {"success": False, "message": "文件不存在"}
+    )
+    account["scope"] = "account-a"
+    assert upload_asset(first)["quote_id"] == "quote-3"
+    assert upload.load_asset_cache()[f"account-a:{upload.file_sha256(first)}"]["quote_id"] == (
+        "quote-3"
+    )
+
+
 def test_upload_rich_text_assets_uploads_only_referenced_assets(monkeypatch, tmp_path):
     source = tmp_path / "diagram.png"
     source.write_bytes(b"png")
@@ -111,6 +196,52 @@ def test_upload_rich_text_assets_uploads_only_referenced_assets(monkeypatch, tmp
     assert "unused" not in result
 
 
+def test_upload_rich_text_assets_runs_concurrently_and_reports_each_failure(monkeypatch, tmp_path):
+    barriers = [threading.Barrier(2, timeout=5)]
+    assets = []
+    for name in ("a", "b", "c"):
+        source = tmp_path / f"{name}.png"
+        source.write_bytes(name.encode() * 10)
+        assets.append({"id": name, "type": "image", "name": source.name, "file_path": str(source)})
+
+    def fake_upload(asset):
+        barriers[-1].wait()
+        if asset["id"] == "b":
+            raise APIRequestError("HTTP 请求失败: 500")
+        return {"id": asset["id"], "name": asset["name"], "quote_id": f"quote-{asset['id']}"}
+
+    monkeypatch.setattr(upload, "upload_rich_text_asset", fake_upload)
+
+    result = upload.upload_rich_text_assets(assets, {"a", "c"})
+    assert result["a"]["quote_id"] == "quote-a"
+    assert result["c"]["size"] == 10
+    assert "throughput_bytes_per_second" in result["c"]
+
+    barriers.append(threading.Barrier(3, timeout=5))
+    with pytest.raises(APIRequestError, match=r"1/3 个资源上传失败: b\(APIRequestError"):
+        upload.upload_rich_text_assets(assets, {"a", "b", "c"})
+
+
+def test_bucket_url_is_cached_per_account_until_upload_fails(monkeypatch):
+    account = {"scope": "account-a"}
+    calls = []
+
+    def fake_get_json(url):
+        calls.append(account["scope"])
+        return {"success": True, "data": {"aliyun_oss_host": f"https://{account['scope']}.oss"}}
+
+    monkeypatch.setattr(upload, "_BUCKET_URLS", {})
+    monkeypatch.setattr(upload, "auth_scope", lambda: account["scope"])
+    monkeypatch.setattr(upload, "get_json", fake_get_json)
+
+    assert upload._get_bucket_url() == upload._get_bucket_url() == "https://account-a.oss"
+    account["scope"] = "account-b"
+    assert upload._get_bucket_url() == "https://account-b.oss"
+    upload._forget_bucket_url("https://account-b.oss")
+    upload._get_bucket_url()
+    assert calls == ["account-a", "account-b", "account-b"]
+
+
 def test_upload_rich_text_assets_rejects_missing_references(tmp_path):
     source = tmp_path / "diagram.png"
     source.write_bytes(b"png")
@@ -189,6 +189,57 @@ def test_markdown_to_rich_text_raw_uses_utf16_offsets_for_inline_styles():
     ]
 
 
+def test_inline_markdown_keeps_unclosed_markers_literal_and_offsets_running():
+    text, ranges = rich_text._parse_inline_markdown("😀<u>下</u>`c`**粗** 5*2 <u>")
+
+    assert text == "😀下c粗 5*2 <u>"
+    assert ranges == [
+        {"offset": 2, "length": 1, "style": "UNDERLINE"},
+        {"offset": 3, "length": 1, "style": "CODE"},
+        {"offset": 4, "length": 1, "style": "BOLD"},
+    ]
+    line = "😀**粗**" * 1000
+    text, ranges = rich_text._parse_inline_markdown(line)
+    assert len(ranges) == 1000
+    assert ranges[-1] == {"offset": 3 * 999 + 2, "length": 1, "style": "BOLD"}
+
+
+def test_apply_inline_markdown_nests_overlapping_ranges_in_one_pass():
+    text = "A😀bcdefgh"
+    ranges = [
+        {"offset": 3, "length": 6, "style": "BOLD"},
+        {"offset": 5, "length": 2, "style": "ITALIC"},
+        {"offset": 1, "length": 2, "style": "CODE"},
+        {"offset": 3, "length": 6, "style": "UNDERLINE"},
+    ]
+
+    assert rich_text._apply_inline_markdown(text, ranges) == "A`😀`**<u>bc*de*fg</u>**h"
+
+
+def test_render_rich_text_output_memoizes_identical_documents():
+    rich_text._render_memoized.cache_clear()
+    raw = json.dumps(
+        {
+            "blocks": [
+                {"type": "unstyled", "text": "题干", "inlineStyleRanges": []},
+                {"type": "atomic", "text": "", "data": {"type": "IMAGE", "src": "https://x/y.png"}},
+            ],
+            "entityMap": {},
+        },
+        ensure_ascii=False,
+    )
+
+    first = rich_text.render_rich_text_output(raw, "markdown")
+    first["assets"][0]["name"] = "changed"
+    second = rich_text.render_rich_text_output(str(raw), "markdown")
+    assert second["assets"][0]["name"] == "image_1"
+    assert rich_text.render_rich_text_output(raw, "plain") == "题干\n"
+    assert rich_text.render_rich_text_output(raw, "plain") == "题干\n"
+
+    stats = rich_text.rich_text_memo_stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (2, 2, 0.5)
+
+
 def test_normalize_rich_text_input_accepts_markdown():
     raw = json.loads(rich_text.normalize_rich_text_input(markdown="## 小节\n\n`code`"))
 